@@ -1,6 +1,13 @@
 import pygame
 import math
 import os
+from settings import ABILITIES_DATA
+from support import load_image, load_sound, sound_file, scaled_image
+
+ATTACK_IMAGE_SIZE = (300, 300)
+ATTACK_CHANNELS = 2  # Mixer channels reserved for attack sounds, so music/UI sounds never cut them off
+
+_attack_bank = None
 
 class Animation:
     def __init__(self):
@@ -34,18 +41,14 @@ class Animation:
         attack_types = ['fire', 'ice', 'scratch', 'explosion', 'green', 'splash']
         for attack in attack_types:
             try:
-                img_path = os.path.join('images', 'attacks', f'{attack}.png')
-                self.attack_sprites[attack] = pygame.image.load(img_path).convert_alpha()
+                self.attack_sprites[attack] = load_image('images', 'attacks', f'{attack}.png')
             except Exception as e:
                 print(f"Failed to load attack sprite {attack}: {e}")
                 
         # Load attack sounds
         for attack in attack_types:
             try:
-                sound_path = os.path.join('audio', f'{attack}.wav')
-                if not os.path.exists(sound_path):
-                    sound_path = os.path.join('audio', f'{attack}.mp3')
-                self.attack_sounds[attack] = pygame.mixer.Sound(sound_path)
+                self.attack_sounds[attack] = load_sound(sound_file('audio', attack))
             except Exception as e:
                 print(f"Failed to load attack sound {attack}: {e}")
     
@@ -123,8 +126,70 @@ class Animation:
         if self.damage_flash.should_flash():
             screen.fill((255, 0, 0), special_flags=pygame.BLEND_ADD)
         
-class AttackAnimation:
+class AttackBank:
+    """Decoded attack sounds and 300x300 attack images, indexed by the ABILITIES_DATA 'animation' field.
+
+    Everything is loaded when the bank is built, so playing an attack never touches the disk.
+    """
     def __init__(self):
+        self.images = {}
+        self.sounds = {}
+        for attack_name, ability_data in ABILITIES_DATA.items():
+            animation_name = ability_data.get('animation', attack_name)
+            if animation_name not in self.images:
+                image_path = f'images/attacks/{animation_name}.png'
+                if os.path.exists(image_path):
+                    # Scale image to be clearly visible
+                    self.images[animation_name] = scaled_image(load_image(image_path), ATTACK_IMAGE_SIZE)
+                else:
+                    print(f"Attack image not found: {image_path}")
+                    self.images[animation_name] = None
+
+            # Attack sound (the same .wav-first file the battle screen preloads), for the animation and then the move itself
+            if self.sounds.get(animation_name) is None:
+                self.sounds[animation_name] = None
+                for audio_path in [sound_file('audio', animation_name), sound_file('audio', attack_name)]:
+                    if os.path.exists(audio_path):
+                        try:
+                            self.sounds[animation_name] = load_sound(audio_path)
+                            break
+                        except Exception as e:
+                            print(f"Could not load sound {audio_path}: {e}")
+
+        # Reserve the first mixer channels for attacks; Sound.play() never picks reserved channels
+        self.channels = []
+        if pygame.mixer.get_init():
+            pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), ATTACK_CHANNELS + 8))
+            pygame.mixer.set_reserved(ATTACK_CHANNELS)
+            self.channels = [pygame.mixer.Channel(i) for i in range(ATTACK_CHANNELS)]
+        self.next_channel = 0
+
+    def play(self, animation_name):
+        """Play an attack's sound on one of the reserved channels"""
+        sound = self.sounds.get(animation_name)
+        if sound is None:
+            return
+        if not self.channels:
+            sound.play()
+            return
+        # Prefer an idle reserved channel, else take over the one used longest ago
+        for channel in self.channels:
+            if not channel.get_busy():
+                channel.play(sound)
+                return
+        self.channels[self.next_channel].play(sound)
+        self.next_channel = (self.next_channel + 1) % len(self.channels)
+
+def attack_bank():
+    """The shared AttackBank, built on first use"""
+    global _attack_bank
+    if _attack_bank is None:
+        _attack_bank = AttackBank()
+    return _attack_bank
+
+class AttackAnimation:
+    def __init__(self, bank=None):
+        self.bank = bank or attack_bank()
         self.active = False
         self.attack_name = None
         self.image = None
@@ -139,36 +204,10 @@ class AttackAnimation:
         self.duration = 0
         self.alpha = 255
         
-        # Use the animation field from ability data for image filename
+        # Use the animation field from ability data to pick the preloaded image and sound
         animation_name = ability_data.get('animation', attack_name)
-        
-        # Load attack image
-        image_path = f'images/attacks/{animation_name}.png'
-        if os.path.exists(image_path):
-            self.image = pygame.image.load(image_path).convert_alpha()
-            # Scale image to be clearly visible
-            self.image = pygame.transform.smoothscale(self.image, (300, 300))
-        else:
-            print(f"Attack image not found: {image_path}")
-            self.image = None
-            
-        # Play attack sound - try both mp3 and wav
-        audio_paths = [
-            f'audio/{animation_name}.mp3',
-            f'audio/{animation_name}.wav',
-            f'audio/{attack_name}.mp3',
-            f'audio/{attack_name}.wav'
-        ]
-        
-        for audio_path in audio_paths:
-            if os.path.exists(audio_path):
-                try:
-                    sound = pygame.mixer.Sound(audio_path)
-                    sound.play()
-                    break
-                except Exception as e:
-                    print(f"Could not play sound {audio_path}: {e}")
-                    continue
+        self.image = self.bank.images.get(animation_name)
+        self.bank.play(animation_name)
     
     def update(self, dt):
         """Update animation"""
@@ -196,8 +235,13 @@ class AttackAnimation:
         temp_surface.set_alpha(self.alpha)
         
         # Center the image on screen
-        rect = temp_surface.get_rect(center=(surface.get_width() // 2, surface.get_height() // 2))
-        surface.blit(temp_surface, rect)
+        surface.blit(temp_surface, self.get_rect(surface.get_rect()))
+
+    def get_rect(self, screen_rect):
+        """Where the animation is drawn on a screen of screen_rect, or None when nothing is shown"""
+        if not self.active or not self.image:
+            return None
+        return self.image.get_rect(center=screen_rect.center)
 
 class DamageFlash:
     def __init__(self):
@@ -0,0 +1,363 @@
+"""
+Balance report: round-robin tournaments over every MONSTER_DATA pairing.
+
+Each pairing is played from both seats, so player 1's first-move advantage
+cancels out, and the matchups are spread over a process pool. Games where both
+sides use the random or greedy policy run through the vectorized batch_sim;
+games involving the solver policy are played move by move with the solved
+optimal strategies from battle_solver. They come from the policy table when it
+is built and up to date; matchups it lacks (all of them right after an edit to
+the battle data in settings.py) are solved once, in parallel, before the
+tournament starts. That takes seconds to a couple of minutes per matchup, so
+without a table the solver policy needs --monsters to pick a few monsters;
+for the full roster, rebuild the table with python code/battle_solver.py.
+The random and greedy policies need numpy (see requirements.txt).
+
+Written to the output directory:
+  win_rates.csv      row monster's win rate against the column monster
+  turns_to_ko.csv    average turns until a knockout
+  element_pairs.csv  win rate and turns to KO per attacking/defending element
+  ability_usage.csv  how often each monster played each of its abilities
+  report.html        all of the above on one page
+
+Example:
+  python code/balance_report.py --policy greedy --vs random --games 2000
+  python code/balance_report.py --policy solver --monsters Atrox,Jacana,Pouch
+"""
+
+import os
+import sys
+import csv
+import html
+import time
+import random
+import tempfile
+import multiprocessing
+from settings import MONSTER_DATA
+import battle_rules
+import battle_solver
+from battle_ai import state_of, pack_state
+
+POLICIES = ('random', 'greedy', 'solver')
+MAX_TURNS = 200  # Battles still running after this many turns count as unfinished
+BASE_DIR = os.path.dirname(__file__)
+OUTPUT_DIR = os.path.normpath(os.path.join(BASE_DIR, '..', 'reports'))
+
+_policy_tables = []  # Solver policy tables (the built table, matchups solved for this run), loaded once per worker
+
+
+def _init_worker(paths):
+    global _policy_tables
+    _policy_tables = [battle_solver.PolicyTable(path) for path in paths]
+
+
+class MatchupResult:
+    """Totals for one (row monster, column monster) pairing, played from both seats"""
+
+    def __init__(self, name, opponent):
+        self.name = name
+        self.opponent = opponent
+        self.games = 0
+        self.wins = 0  # Won by the row monster
+        self.knockouts = 0
+        self.ko_turns = 0  # Turns summed over the games that ended in a knockout
+        self.usage = {}  # (monster, ability) -> times played
+
+
+def greedy_move(fighter, opponent):
+    """Most damaging available ability, first on ties (same choice as batch_sim's greedy policy)"""
+    def damage(move):
+        if battle_rules.is_special(move) and move != 'burning_fury':
+            return 0  # Shield and heal deal no damage
+        return battle_rules.calculate_damage(fighter.name, opponent.name, move)
+    return max(battle_rules.available_abilities(fighter), key=damage)
+
+
+def solver_matchup(name1, name2):
+    """Solved strategies for a matchup, from the worker's policy tables or, failing that, solved here"""
+    for table in _policy_tables:
+        matchup = table.matchup(name1, name2)
+        if matchup is not None:
+            return matchup
+    _, _, _, keys, probabilities = battle_solver.solve_pairing(name1, name2, battle_solver.move_slots())
+    return keys, probabilities
+
+
+def play_games(name1, name2, policy1, policy2, games, rng, result, row_seat):
+    """Play games move by move, adding them to result; the row monster sits in row_seat"""
+    policies = (policy1, policy2)
+    slots = battle_solver.move_slots()
+    matchup = solver_matchup(name1, name2) if 'solver' in policies else None
+    for _ in range(games):
+        fighters = (battle_rules.Fighter(name1), battle_rules.Fighter(name2))
+        winner = 0
+        for turn in range(1, MAX_TURNS + 1):
+            moves = []
+            for player, policy in enumerate(policies, 1):
+                fighter, opponent = fighters[player - 1], fighters[2 - player]
+                if policy == 'random':
+                    move = rng.choice(battle_rules.available_abilities(fighter))
+                elif policy == 'greedy':
+                    move = greedy_move(fighter, opponent)
+                else:
+                    keys, probabilities = matchup
+                    row = battle_solver.find_position(keys, pack_state(state_of(*fighters, turn)))
+                    start = (2 * row + player - 1) * slots
+                    move = rng.choices(fighter.abilities, probabilities[start:start + len(fighter.abilities)])[0]
+                moves.append(move)
+                key = (fighter.name, move)
+                result.usage[key] = result.usage.get(key, 0) + 1
+            winner = battle_rules.run_turn(fighters[0], fighters[1], moves[0], moves[1], turn)
+            if winner:
+                break
+        result.games += 1
+        result.wins += winner == row_seat
+        if winner:
+            result.knockouts += 1
+            result.ko_turns += turn
+
+
+def simulate_games(name1, name2, policy1, policy2, games, seed, result, row_seat):
+    """Play games through the vectorized batch simulator, adding them to result"""
+    import batch_sim
+    import numpy as np
+    tables = batch_sim.get_tables()
+    seeds = (np.uint64(seed) << np.uint64(20)) + np.arange(games, dtype=np.uint64)
+    batch = batch_sim.simulate(name1, name2, batch_sim.POLICIES[policy1], batch_sim.POLICIES[policy2],
+                               seeds, MAX_TURNS)
+    knocked_out = batch.winner != 0
+    result.games += games
+    result.wins += int((batch.winner == row_seat).sum())
+    result.knockouts += int(knocked_out.sum())
+    result.ko_turns += int(batch.turns[knocked_out].sum())
+    for name in dict.fromkeys((name1, name2)):  # Once for a mirror match
+        index = tables.index[name]
+        for slot, move in enumerate(tables.abilities[index]):
+            count = int(batch.usage[index * tables.slots + slot])
+            if count:
+                key = (name, move)
+                result.usage[key] = result.usage.get(key, 0) + count
+
+
+def run_matchup(job):
+    """Play one pairing from both seats: the row monster uses policy, the column monster opponent_policy"""
+    name, opponent, policy, opponent_policy, games, seed = job
+    result = MatchupResult(name, opponent)
+    rng = random.Random(seed)
+    half = max(1, games // 2)
+    for row_seat, seats in ((1, (name, opponent, policy, opponent_policy)), (2, (opponent, name, opponent_policy, policy))):
+        name1, name2, policy1, policy2 = seats
+        if 'solver' in (policy1, policy2):
+            play_games(name1, name2, policy1, policy2, half, rng, result, row_seat)
+        else:
+            simulate_games(name1, name2, policy1, policy2, half, seed * 2 + row_seat, result, row_seat)
+    return result
+
+
+def run_tournament(policy='greedy', opponent_policy=None, games=1000, processes=None, seed=0, names=None):
+    """Round-robin over every pairing of names (all of MONSTER_DATA by default).
+
+    Returns {(name, opponent): MatchupResult}, in round-robin order.
+    """
+    opponent_policy = opponent_policy or policy
+    names = names or list(MONSTER_DATA)
+    jobs = [(name, opponent, policy, opponent_policy, games, seed * len(names) ** 2 + i * len(names) + j)
+            for i, name in enumerate(names) for j, opponent in enumerate(names)]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        table_paths = []
+        if 'solver' in (policy, opponent_policy):
+            table_paths = solver_tables(names, processes, tmp_dir)
+        with multiprocessing.Pool(processes, initializer=_init_worker, initargs=(table_paths,)) as pool:
+            results = pool.map(run_matchup, jobs,
+                               chunksize=max(1, len(jobs) // (4 * (processes or os.cpu_count() or 1))))
+    return {(result.name, result.opponent): result for result in results}
+
+
+def solver_tables(names, processes, tmp_dir):
+    """Policy table paths covering every ordered pairing of names.
+
+    Matchups the built table lacks (all of them without an up-to-date table) are solved
+    once each on a process pool and written to an extra table in tmp_dir, so the jobs
+    playing (a, b) and (b, a) share them instead of both solving them again.
+    """
+    table = battle_solver.load_policy()
+    paths = [battle_solver.POLICY_PATH] if table is not None else []
+    missing = [(name1, name2) for name1 in names for name2 in names
+               if table is None or (name1, name2) not in table.index]
+    if missing:
+        print(f"Solving {len(missing)} matchups missing from the policy table...")
+        slots = battle_solver.move_slots()
+        with multiprocessing.Pool(processes) as pool:
+            solved = [(name1, name2, keys, probabilities) for name1, name2, _, keys, probabilities
+                      in pool.starmap(battle_solver.solve_pairing, [pair + (slots,) for pair in missing])]
+        path = os.path.join(tmp_dir, 'missing.policy')
+        battle_solver.write_policy(path, solved, slots, battle_solver.data_hash())
+        paths.append(path)
+    return paths
+
+
+def monsters_in(results):
+    """Monster names in the order they were played"""
+    return list(dict.fromkeys(name for name, _ in results))
+
+
+def element_pairs(results):
+    """{(element, opponent element): (games, wins, knockouts, ko turns)} over pairings of different monsters"""
+    pairs = {}
+    for (name, opponent), result in results.items():
+        if name == opponent:
+            continue  # Mirror matches say nothing about the elements
+        key = (MONSTER_DATA[name]['element'], MONSTER_DATA[opponent]['element'])
+        games, wins, knockouts, ko_turns = pairs.get(key, (0, 0, 0, 0))
+        pairs[key] = (games + result.games, wins + result.wins,
+                      knockouts + result.knockouts, ko_turns + result.ko_turns)
+    return pairs
+
+
+def ability_usage(results):
+    """{monster: {ability: times played}}, counting each game once"""
+    usage = {name: {move: 0 for move in battle_rules.abilities_for(name)} for name in monsters_in(results)}
+    for (name, opponent), result in results.items():
+        for (monster, move), count in result.usage.items():
+            # Every unordered pairing is played as both (a, b) and (b, a); keep the monster's own row
+            if monster == name:
+                usage[monster][move] += count if name != opponent else count // 2
+    return usage
+
+
+def ratio(numerator, denominator):
+    return numerator / denominator if denominator else 0.0
+
+
+def write_csv(out_dir, results):
+    names = monsters_in(results)
+    with open(os.path.join(out_dir, 'win_rates.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['monster'] + names + ['average'])
+        for name in names:
+            rates = [ratio(results[name, opponent].wins, results[name, opponent].games) for opponent in names]
+            writer.writerow([name] + [f"{rate:.4f}" for rate in rates] + [f"{sum(rates) / len(rates):.4f}"])
+
+    with open(os.path.join(out_dir, 'turns_to_ko.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['monster'] + names)
+        for name in names:
+            writer.writerow([name] + [f"{ratio(results[name, opponent].ko_turns, results[name, opponent].knockouts):.2f}"
+                                      for opponent in names])
+
+    with open(os.path.join(out_dir, 'element_pairs.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['element', 'opponent_element', 'games', 'win_rate', 'turns_to_ko'])
+        for (element, opponent_element), (games, wins, knockouts, ko_turns) in sorted(element_pairs(results).items()):
+            writer.writerow([element, opponent_element, games, f"{ratio(wins, games):.4f}",
+                             f"{ratio(ko_turns, knockouts):.2f}"])
+
+    with open(os.path.join(out_dir, 'ability_usage.csv'), 'w', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['monster', 'ability', 'times_played', 'share'])
+        for name, moves in ability_usage(results).items():
+            total = sum(moves.values())
+            for move, count in moves.items():
+                writer.writerow([name, move, count, f"{ratio(count, total):.4f}"])
+
+
+def rate_color(rate):
+    """Red (0) through white (0.5) to green (1) background for a win rate cell"""
+    if rate < 0.5:
+        shade = int(255 * rate * 2)
+        return f"rgb(255,{shade},{shade})"
+    shade = int(255 * (1 - rate) * 2)
+    return f"rgb({shade},255,{shade})"
+
+
+def write_html(out_dir, results, title):
+    names = monsters_in(results)
+    esc = html.escape
+    parts = [f"<!DOCTYPE html><html><head><meta charset='utf-8'><title>{esc(title)}</title>",
+             "<style>body{font-family:sans-serif}table{border-collapse:collapse;margin-bottom:24px}"
+             "td,th{border:1px solid #ccc;padding:3px 6px;text-align:right}th{background:#eee}</style>",
+             f"</head><body><h1>{esc(title)}</h1>"]
+
+    header = ''.join(f"<th>{esc(name)}</th>" for name in names)
+    parts.append(f"<h2>Win rate (row vs column)</h2><table><tr><th></th>{header}<th>average</th></tr>")
+    for name in names:
+        rates = [ratio(results[name, opponent].wins, results[name, opponent].games) for opponent in names]
+        cells = ''.join(f"<td style='background:{rate_color(rate)}'>{rate:.2f}</td>" for rate in rates)
+        parts.append(f"<tr><th>{esc(name)}</th>{cells}<td>{sum(rates) / len(rates):.2f}</td></tr>")
+    parts.append("</table>")
+
+    parts.append(f"<h2>Average turns to KO</h2><table><tr><th></th>{header}</tr>")
+    for name in names:
+        cells = ''.join(f"<td>{ratio(results[name, opponent].ko_turns, results[name, opponent].knockouts):.1f}</td>"
+                        for opponent in names)
+        parts.append(f"<tr><th>{esc(name)}</th>{cells}</tr>")
+    parts.append("</table>")
+
+    parts.append("<h2>Element pairs</h2><table><tr><th>element</th><th>vs</th><th>games</th>"
+                 "<th>win rate</th><th>turns to KO</th></tr>")
+    for (element, opponent_element), (games, wins, knockouts, ko_turns) in sorted(element_pairs(results).items()):
+        rate = ratio(wins, games)
+        parts.append(f"<tr><th>{esc(element)}</th><th>{esc(opponent_element)}</th><td>{games}</td>"
+                     f"<td style='background:{rate_color(rate)}'>{rate:.2f}</td><td>{ratio(ko_turns, knockouts):.1f}</td></tr>")
+    parts.append("</table>")
+
+    parts.append("<h2>Ability usage</h2><table><tr><th>monster</th><th>ability</th><th>times played</th><th>share</th></tr>")
+    for name, moves in ability_usage(results).items():
+        total = sum(moves.values())
+        for move, count in moves.items():
+            parts.append(f"<tr><th>{esc(name)}</th><td>{esc(move)}</td><td>{count}</td><td>{ratio(count, total):.1%}</td></tr>")
+    parts.append("</table></body></html>")
+
+    with open(os.path.join(out_dir, 'report.html'), 'w') as f:
+        f.write('\n'.join(parts))
+
+
+def main():
+    args = sys.argv
+    def option(flag, default):
+        return args[args.index(flag) + 1] if flag in args else default
+
+    policy = option('--policy', 'greedy')
+    opponent_policy = option('--vs', policy)
+    games = int(option('--games', 1000))
+    processes = int(option('--processes', 0)) or None
+    seed = int(option('--seed', 0))
+    out_dir = option('--out', OUTPUT_DIR)
+    formats = option('--format', 'csv,html').split(',')
+    names = option('--monsters', ','.join(MONSTER_DATA)).split(',')
+    for name in (policy, opponent_policy):
+        if name not in POLICIES:
+            sys.exit(f"Unknown policy {name!r}; choose from {', '.join(POLICIES)}")
+    for name in names:
+        if name not in MONSTER_DATA:
+            sys.exit(f"Unknown monster {name!r}")
+    if 'solver' in (policy, opponent_policy):
+        if '--monsters' not in args and battle_solver.load_policy() is None:
+            # Solving the full roster here would take as long as building the table (hours)
+            sys.exit("The solver policy needs an up-to-date policy table for the full roster; build it with "
+                     "python code/battle_solver.py, or pick a few monsters to solve now with --monsters")
+    else:
+        try:
+            import numpy
+        except ImportError:
+            sys.exit("The random and greedy policies need numpy: python -m pip install -r requirements.txt")
+
+    start = time.time()
+    results = run_tournament(policy, opponent_policy, games, processes, seed, names)
+    os.makedirs(out_dir, exist_ok=True)
+    title = f"Balance report: {policy} vs {opponent_policy}, {games} games per pairing"
+    if 'csv' in formats:
+        write_csv(out_dir, results)
+    if 'html' in formats:
+        write_html(out_dir, results, title)
+    elapsed = time.time() - start
+
+    print(f"{title}: {elapsed:.1f}s, written to {out_dir}")
+    averages = {name: sum(ratio(results[name, opponent].wins, results[name, opponent].games) for opponent in names) / len(names)
+                for name in names}
+    for name in sorted(averages, key=averages.get, reverse=True):
+        print(f"  {name:<12} {averages[name]:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,320 @@
+"""
+Vectorized batch battle simulator (requires numpy).
+
+Resolves thousands of independent 1v1 battles in lockstep, one numpy operation per
+rule step across all lanes, using the same rules as battle_rules: burn ticks first,
+alternating first mover, shield reflection, healing, one-shot specials and the
+damage formula from calculate_damage. Every lane has its own seed, and its random
+numbers depend only on (seed, turn, player), so a lane replays identically no
+matter which batch it runs in.
+
+Example:
+  python code/batch_sim.py --games 100000
+"""
+
+import sys
+import time
+try:
+    import numpy as np
+except ImportError:
+    raise ImportError("batch_sim needs numpy: python -m pip install numpy (or pip install -r requirements.txt)") from None
+from settings import MONSTER_DATA, ABILITIES_DATA
+import battle_rules
+
+# Move policies
+RANDOM = 0  # Uniform over the available abilities
+GREEDY = 1  # Highest immediate damage against the current opponent
+POLICIES = {'random': RANDOM, 'greedy': GREEDY}
+
+# Move kinds in the compiled move table
+_NONE, _ATTACK, _SHIELD, _HEAL, _BURN = 0, 1, 2, 3, 4
+
+
+class MoveTables:
+    """MONSTER_DATA/ABILITIES_DATA compiled into flat arrays indexed by monster and ability slot.
+
+    Every per-lane lookup during a batch is a 1D gather into one of these tables.
+    """
+
+    def __init__(self):
+        self.names = list(MONSTER_DATA)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.abilities = [battle_rules.abilities_for(name) for name in self.names]
+        n = len(self.names)
+        slots = max(len(moves) for moves in self.abilities)
+        self.slots = slots
+
+        self.health = np.array([MONSTER_DATA[name]['health'] for name in self.names], dtype=np.int32)
+        valid = np.zeros((n, slots), dtype=bool)
+        special = np.zeros((n, slots), dtype=bool)
+        kind = np.zeros((n, slots), dtype=np.int8)
+        heal = np.zeros((n, slots), dtype=np.int32)
+        damage = np.zeros((n, n, slots), dtype=np.int32)
+
+        for m, moves in enumerate(self.abilities):
+            for s, move in enumerate(moves):
+                valid[m, s] = True
+                special[m, s] = battle_rules.is_special(move)
+                if move == 'reflect_shield':
+                    kind[m, s] = _SHIELD
+                elif move == 'healing_wave':
+                    kind[m, s] = _HEAL
+                    heal[m, s] = abs(ABILITIES_DATA[move]['damage'])
+                else:
+                    kind[m, s] = _BURN if move == 'burning_fury' else _ATTACK
+                    for d, defender in enumerate(self.names):
+                        damage[m, d, s] = battle_rules.calculate_damage(self.names[m], defender, move)
+
+        # [monster * slots + slot]
+        self.special = special.ravel()
+        self.kind = kind.ravel()
+        self.heal = heal.ravel()
+        # [(attacker * n + defender) * slots + slot]
+        self.damage = damage.ravel()
+
+        # Move choice tables, indexed by monster/pair and whether the special is spent
+        available = np.stack([valid, valid & ~special], axis=1)  # [monster, special_used, slot]
+        self.available_count = available.sum(axis=2).ravel().astype(np.int32)
+        # [(monster * 2 + special_used) * slots + k] -> k-th available slot
+        self.available_slot = np.zeros((n, 2, slots), dtype=np.int32)
+        for m in range(n):
+            for used in range(2):
+                open_slots = np.flatnonzero(available[m, used])
+                self.available_slot[m, used, :len(open_slots)] = open_slots
+        self.available_slot = self.available_slot.ravel()
+        # [(attacker * n + defender) * 2 + special_used] -> highest damage slot, first on ties
+        scores = np.where(available[:, None, :, :], damage[:, :, None, :], -1)
+        self.greedy_slot = np.argmax(scores, axis=3).astype(np.int32).ravel()
+
+
+class _Side:
+    """Per-lane state arrays for one player"""
+
+    FIELDS = ('monster', 'pair', 'policy', 'health', 'max_health', 'shield', 'burn', 'special_used')
+
+    def __init__(self, monsters, opponents, policy, tables):
+        self.monster = monsters
+        self.pair = monsters * len(tables.names) + opponents
+        self.policy = policy
+        self.health = tables.health[monsters]
+        self.max_health = self.health.copy()
+        self.shield = np.zeros(len(monsters), dtype=bool)
+        self.burn = np.zeros(len(monsters), dtype=np.int32)
+        self.special_used = np.zeros(len(monsters), dtype=bool)
+
+    def compact(self, keep):
+        """Drop finished lanes so later turns only touch battles still running"""
+        for field in self.FIELDS:
+            setattr(self, field, getattr(self, field)[keep])
+
+
+class BatchResult:
+    """Outcome arrays of a batch: winner (1, 2 or 0 for unfinished) and turns played.
+
+    usage counts the moves played over the whole batch, indexed [monster * slots + slot].
+    """
+
+    def __init__(self, winner, turns, health1, health2, usage):
+        self.winner = winner
+        self.turns = turns
+        self.health1 = health1
+        self.health2 = health2
+        self.usage = usage
+
+
+_tables = None
+
+
+def get_tables():
+    """Compiled move tables, built on first use"""
+    global _tables
+    if _tables is None:
+        _tables = MoveTables()
+    return _tables
+
+
+def _drop_tables():
+    global _tables
+    _tables = None
+
+
+battle_rules.on_tables_invalidated(_drop_tables)
+
+
+def _as_lanes(values, lanes, dtype):
+    """Broadcast a scalar or array argument to one value per lane"""
+    return np.broadcast_to(np.asarray(values, dtype=dtype), (lanes,)).copy()
+
+
+def _uniform(seeds, turn, player):
+    """Per-lane uniform floats in [0, 1) from splitmix64(seed, turn, player)"""
+    with np.errstate(over='ignore'):
+        z = seeds * np.uint64(0x9E3779B97F4A7C15) + np.uint64(turn * 2 + player)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        z = z ^ (z >> np.uint64(31))
+    return (z >> np.uint64(11)).astype(np.float64) * (1.0 / (1 << 53))
+
+
+def _choose(side, seeds, turn, player, tables):
+    """Pick an ability slot per lane according to each lane's policy"""
+    used = side.special_used.astype(np.int32)
+
+    # Random: the k-th available slot for k = floor(u * count)
+    row = side.monster * 2 + used
+    k = (_uniform(seeds, turn, player) * tables.available_count[row]).astype(np.int32)
+    random_slot = tables.available_slot[row * tables.slots + k]
+
+    # Greedy: most damage against this opponent
+    greedy_slot = tables.greedy_slot[side.pair * 2 + used]
+
+    return np.where(side.policy == GREEDY, greedy_slot, random_slot)
+
+
+def _attack(attacker, defender, slot, lanes, tables):
+    """Resolve one move for the masked lanes (mirrors battle_rules.execute_move)"""
+    move = attacker.monster * tables.slots + slot
+    special = tables.special[move]
+    kind = np.where(lanes & ~(special & attacker.special_used), tables.kind[move], _NONE)
+    attacker.special_used |= special & (kind != _NONE)  # A spent special does nothing
+
+    hits = (kind == _ATTACK) | (kind == _BURN)
+    damage = np.where(hits, tables.damage[attacker.pair * tables.slots + slot], 0)
+    reflected = hits & defender.shield & (damage > 0)
+    defender.shield &= ~reflected
+    attacker.health = np.maximum(0, attacker.health - np.where(reflected, damage, 0))
+    defender.health = np.maximum(0, defender.health - np.where(reflected, 0, damage))
+    defender.burn = np.where(kind == _BURN, battle_rules.BURN_TURNS, defender.burn)
+
+    attacker.shield |= kind == _SHIELD
+    heal = np.where(kind == _HEAL, tables.heal[move], 0)
+    attacker.health = np.minimum(attacker.max_health, attacker.health + heal)
+
+
+def _tick_burn(side, lanes):
+    """Start-of-turn burn damage for the masked lanes (mirrors battle_rules.apply_burn)"""
+    burning = lanes & (side.burn > 0)
+    burn_damage = np.maximum(1, side.max_health // 10)
+    side.health = np.where(burning, np.maximum(0, side.health - burn_damage), side.health)
+    side.burn = np.where(burning, side.burn - 1, side.burn)
+    return burning & (side.health <= 0)
+
+
+def simulate(monsters1, monsters2, policy1=RANDOM, policy2=RANDOM, seeds=0, max_turns=200):
+    """Run one battle per lane and return a BatchResult.
+
+    monsters1/monsters2 are monster names or indices into MONSTER_DATA order
+    (scalars or arrays); policies and seeds broadcast the same way.
+    """
+    tables = get_tables()
+    monsters1 = np.atleast_1d(monsters1)
+    monsters2 = np.atleast_1d(monsters2)
+    if monsters1.dtype.kind in 'US':
+        monsters1 = np.array([tables.index[n] for n in monsters1])
+    if monsters2.dtype.kind in 'US':
+        monsters2 = np.array([tables.index[n] for n in monsters2])
+    lanes = max(len(monsters1), len(monsters2), np.size(seeds))
+    monsters1 = _as_lanes(monsters1, lanes, np.int32)
+    monsters2 = _as_lanes(monsters2, lanes, np.int32)
+
+    side1 = _Side(monsters1, monsters2, _as_lanes(policy1, lanes, np.int8), tables)
+    side2 = _Side(monsters2, monsters1, _as_lanes(policy2, lanes, np.int8), tables)
+    seeds = _as_lanes(seeds, lanes, np.uint64)
+    lane_ids = np.arange(lanes)
+
+    winner_out = np.zeros(lanes, dtype=np.int8)
+    turns_out = np.zeros(lanes, dtype=np.int32)
+    health1_out = side1.health.copy()
+    health2_out = side2.health.copy()
+    usage = np.zeros(len(tables.names) * tables.slots, dtype=np.int64)
+
+    winner = np.zeros(lanes, dtype=np.int8)
+    for turn in range(1, max_turns + 1):
+        turns_out[lane_ids] = turn
+
+        winner[_tick_burn(side1, winner == 0)] = 2
+        winner[_tick_burn(side2, winner == 0)] = 1
+        active = winner == 0
+
+        slots = (_choose(side1, seeds, turn, 1, tables), _choose(side2, seeds, turn, 2, tables))
+        for side, slot in zip((side1, side2), slots):
+            usage += np.bincount((side.monster * tables.slots + slot)[active], minlength=len(usage))
+        for attacker_id in battle_rules.turn_order(turn):
+            attacker, defender = (side1, side2) if attacker_id == 1 else (side2, side1)
+            _attack(attacker, defender, slots[attacker_id - 1], active, tables)
+            winner[active & (side1.health <= 0)] = 2
+            winner[active & (side1.health > 0) & (side2.health <= 0)] = 1
+            active = winner == 0
+
+        # Record finished lanes and carry on with the rest only
+        done = ~active
+        if done.any():
+            ids = lane_ids[done]
+            winner_out[ids] = winner[done]
+            health1_out[ids] = side1.health[done]
+            health2_out[ids] = side2.health[done]
+            lane_ids, seeds, winner = lane_ids[active], seeds[active], winner[active]
+            side1.compact(active)
+            side2.compact(active)
+            if not len(lane_ids):
+                break
+
+    # Battles still running after max_turns end without a winner
+    health1_out[lane_ids] = side1.health
+    health2_out[lane_ids] = side2.health
+    return BatchResult(winner_out, turns_out, health1_out, health2_out, usage)
+
+
+def matchup_matrix(games=100000, policy=RANDOM, seed=0, max_lanes=1 << 18):
+    """Win-rate matrix over every MONSTER_DATA pairing.
+
+    Entry [i, j] is the fraction of games monster i wins against monster j, with
+    seats alternated so player 1's first-move advantage cancels out. Returns
+    (names, win_rates, mean_turns).
+    """
+    tables = get_tables()
+    n = len(tables.names)
+    half = max(1, games // 2)
+    pairs = np.array([(i, j) for i in range(n) for j in range(n)], dtype=np.int32)
+    wins_as_p1 = np.zeros(len(pairs), dtype=np.int64)
+    wins_as_p2 = np.zeros(len(pairs), dtype=np.int64)
+    turn_totals = np.zeros(len(pairs), dtype=np.int64)
+
+    pairs_per_chunk = max(1, max_lanes // half)
+    for start in range(0, len(pairs), pairs_per_chunk):
+        chunk = np.arange(start, min(start + pairs_per_chunk, len(pairs)))
+        pair_of_lane = np.repeat(chunk, half)
+        seeds = (np.uint64(seed) << np.uint64(32)) + np.arange(start * half, start * half + len(pair_of_lane), dtype=np.uint64)
+        result = simulate(pairs[pair_of_lane, 0], pairs[pair_of_lane, 1], policy, policy, seeds)
+        wins_as_p1 += np.bincount(pair_of_lane, weights=result.winner == 1, minlength=len(pairs)).astype(np.int64)
+        wins_as_p2 += np.bincount(pair_of_lane, weights=result.winner == 2, minlength=len(pairs)).astype(np.int64)
+        turn_totals += np.bincount(pair_of_lane, weights=result.turns, minlength=len(pairs)).astype(np.int64)
+
+    wins_as_p1 = wins_as_p1.reshape(n, n)
+    wins_as_p2 = wins_as_p2.reshape(n, n)
+    # i beats j as player 1 in (i, j) games, and as player 2 in (j, i) games
+    win_rates = (wins_as_p1 + wins_as_p2.T) / (2.0 * half)
+    mean_turns = (turn_totals.reshape(n, n) + turn_totals.reshape(n, n).T) / (2.0 * half)
+    return tables.names, win_rates, mean_turns
+
+
+def main():
+    games = 100000
+    policy = 'random'
+    if '--games' in sys.argv:
+        games = int(sys.argv[sys.argv.index('--games') + 1])
+    if '--policy' in sys.argv:
+        policy = sys.argv[sys.argv.index('--policy') + 1]
+
+    start = time.time()
+    names, win_rates, _ = matchup_matrix(games, POLICIES[policy])
+    elapsed = time.time() - start
+
+    print(f"{len(names)}x{len(names)} matchups, {games} games each, {policy} policy: {elapsed:.1f}s")
+    print(' ' * 12 + ''.join(f"{name[:6]:>7}" for name in names))
+    for name, row in zip(names, win_rates):
+        print(f"{name:<12}" + ''.join(f"{rate:7.2f}" for rate in row))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+"""
+Search-based opponent for single-player battles.
+
+Both players pick their moves at the same time, so every turn of the game tree
+is a matrix of (player 1 move, player 2 move) pairs. The AI scores each of its
+moves against all the opponent's replies, mixing the worst case (minimax) with
+the average over replies (expectimax against a uniform opponent), and plays the
+best one. Turns are resolved with battle_rules.run_turn, so burn ticks, the
+alternating first mover, one-shot specials and shield reflection behave exactly
+as they do in the real battle.
+
+A position is a compact tuple (see state_of), packed into a single int while
+searching: resolved turns are memoized per matchup and searched positions go in
+a transposition table, both keyed by ints, so the search creates no objects the
+garbage collector has to scan. It deepens one turn at a time until the per-move
+time budget runs out, so the move is always ready within a frame.
+"""
+
+import time
+import random
+from concurrent.futures import Future
+from settings import AI_TIME_BUDGET, AI_MAX_DEPTH
+import battle_rules
+
+WIN_SCORE = 100.0  # Beats any evaluation; remaining depth is added so faster wins score higher
+PESSIMISM = 0.5  # Weight of the opponent's best reply against the average reply
+SPECIAL_BONUS = 0.08  # Value of still holding an unused special move
+SHIELD_BONUS = 0.15  # Value of a raised shield
+BURN_PENALTY = 0.1  # Per pending burn tick (each tick costs 10% of max health)
+TABLE_LIMIT = 50000  # Table entries kept before clearing; growing a huge dict mid-search costs milliseconds
+
+# Packed position layout, lowest bits first: turn parity, special_used2, special_used1,
+# burn2, burn1, shield2, shield1, hp2, hp1
+HP_BITS = 16
+BURN_BITS = 4
+DEPTH_BITS = 6  # AI_MAX_DEPTH must stay below 2 ** DEPTH_BITS
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time budget runs out"""
+
+
+def state_of(fighter1, fighter2, turn_number):
+    """Compact position: (hp1, hp2, shield1, shield2, burn1, burn2, special_used1, special_used2, turn parity)"""
+    return (fighter1.health, fighter2.health,
+            fighter1.shield_active, fighter2.shield_active,
+            fighter1.burn_turns, fighter2.burn_turns,
+            fighter1.special_used, fighter2.special_used,
+            turn_number % 2)
+
+
+def pack_state(state):
+    """Position tuple as one int"""
+    hp1, hp2, shield1, shield2, burn1, burn2, used1, used2, parity = state
+    packed = (hp1 << HP_BITS) | hp2
+    packed = (packed << 2) | (shield1 << 1) | shield2
+    packed = (packed << BURN_BITS) | burn1
+    packed = (packed << BURN_BITS) | burn2
+    return (packed << 3) | (used1 << 2) | (used2 << 1) | parity
+
+
+def unpack_state(packed):
+    """Inverse of pack_state"""
+    burn_mask = (1 << BURN_BITS) - 1
+    parity, used2, used1 = packed & 1, bool(packed & 2), bool(packed & 4)
+    packed >>= 3
+    burn2 = packed & burn_mask
+    packed >>= BURN_BITS
+    burn1 = packed & burn_mask
+    packed >>= BURN_BITS
+    shield2, shield1 = bool(packed & 1), bool(packed & 2)
+    packed >>= 2
+    return (packed >> HP_BITS, packed & ((1 << HP_BITS) - 1), shield1, shield2,
+            burn1, burn2, used1, used2, parity)
+
+
+class Pairing:
+    """Rules for one monster matchup, resolved on demand and memoized by packed position.
+
+    Moves are referred to by their index in the monster's ability list.
+    """
+
+    def __init__(self, name1, name2):
+        self.names = (name1, name2)
+        self.fighters = (battle_rules.Fighter(name1), battle_rules.Fighter(name2))
+        self.max_health = (self.fighters[0].max_health, self.fighters[1].max_health)
+        self.abilities = (self.fighters[0].abilities, self.fighters[1].abilities)
+        # Move indices per player, with and without the special move
+        self.all_moves = tuple(tuple(range(len(abilities))) for abilities in self.abilities)
+        self.basic_moves = tuple(tuple(i for i, move in enumerate(abilities) if not battle_rules.is_special(move))
+                                 for abilities in self.abilities)
+        self.transitions = {}  # (packed position, move1, move2) as an int -> (next packed position, winner) as an int
+
+    def moves(self, packed, player):
+        """Move indices player (1 or 2) can still pick"""
+        special_used = packed & (2 if player == 2 else 4)
+        return self.basic_moves[player - 1] if special_used else self.all_moves[player - 1]
+
+    def step(self, packed, move1, move2):
+        """(winner, next packed position) after both moves, without memoizing; winner is 1, 2 or 0"""
+        fighter1 = self.fighters[0].copy()
+        fighter2 = self.fighters[1].copy()
+        (fighter1.health, fighter2.health, fighter1.shield_active, fighter2.shield_active,
+         fighter1.burn_turns, fighter2.burn_turns, fighter1.special_used, fighter2.special_used,
+         parity) = unpack_state(packed)
+        turn_number = 2 - parity  # Only the parity matters to turn_order
+        winner = battle_rules.run_turn(fighter1, fighter2, self.abilities[0][move1],
+                                       self.abilities[1][move2], turn_number)
+        return winner, pack_state(state_of(fighter1, fighter2, turn_number + 1))
+
+    def resolve(self, packed, move1, move2):
+        """step, memoized"""
+        key = (packed << 6) | (move1 << 3) | move2
+        result = self.transitions.get(key)
+        if result is None:
+            winner, next_packed = self.step(packed, move1, move2)
+            result = (next_packed << 2) | winner
+            self.transitions[key] = result
+        return result & 3, result >> 2
+
+    def evaluate(self, packed, player):
+        """Heuristic value of a non-final position for player, roughly in -1.5..1.5"""
+        state = unpack_state(packed)
+        score = 0.0
+        for side, sign in ((player, 1.0), (3 - player, -1.0)):
+            i = side - 1
+            value = state[i] / self.max_health[i]
+            if state[2 + i]:
+                value += SHIELD_BONUS
+            value -= state[4 + i] * BURN_PENALTY
+            if not state[6 + i]:
+                value += SPECIAL_BONUS
+            score += sign * value
+        return score
+
+
+class SearchAI:
+    """Iterative deepening search over the simultaneous-move turn tree"""
+
+    def __init__(self, time_budget=AI_TIME_BUDGET, max_depth=AI_MAX_DEPTH, pessimism=PESSIMISM):
+        self.time_budget = time_budget
+        self.max_depth = min(max_depth, (1 << DEPTH_BITS) - 1)
+        self.pessimism = pessimism
+        self.pairing = None  # Matchup of the current battle
+        self.table = {}  # (packed position, depth, player) as an int -> value, for the current matchup
+        self.deadline = 0.0
+        self.last_depth = 0  # Deepest fully searched depth of the last choice
+
+    def choose(self, name1, name2, state, player):
+        """Best move for player (1 or 2) in state, found within the time budget"""
+        pairing = self.pairing
+        if pairing is None or pairing.names != (name1, name2):
+            # New battle: nothing searched for the old matchup applies any more
+            pairing = self.pairing = Pairing(name1, name2)
+            self.table.clear()
+        if len(self.table) > TABLE_LIMIT:
+            self.table.clear()
+        if len(pairing.transitions) > TABLE_LIMIT:
+            pairing.transitions.clear()
+
+        packed = pack_state(state)
+        moves = pairing.moves(packed, player)
+        self.deadline = time.perf_counter() + self.time_budget
+        best_move = moves[0]
+        self.last_depth = 0
+        for depth in range(1, self.max_depth + 1):
+            try:
+                scores = [self.move_value(pairing, packed, player, move, depth) for move in moves]
+            except SearchTimeout:
+                break  # Keep the move from the last complete depth
+            best_score = max(scores)
+            best_move = moves[scores.index(best_score)]
+            self.last_depth = depth
+            if abs(best_score) >= WIN_SCORE:
+                break  # Forced result found; searching deeper changes nothing
+        return pairing.abilities[player - 1][best_move]
+
+    def move_value(self, pairing, packed, player, move, depth):
+        """Value of playing move against every reply, blending the worst and the average reply"""
+        values = []
+        for reply in pairing.moves(packed, 3 - player):
+            if player == 1:
+                winner, next_packed = pairing.resolve(packed, move, reply)
+            else:
+                winner, next_packed = pairing.resolve(packed, reply, move)
+            if winner:
+                value = WIN_SCORE + depth
+                values.append(value if winner == player else -value)
+            elif depth > 1:
+                values.append(self.search(pairing, next_packed, player, depth - 1))
+            else:
+                values.append(pairing.evaluate(next_packed, player))
+        worst = min(values)
+        return self.pessimism * worst + (1.0 - self.pessimism) * sum(values) / len(values)
+
+    def search(self, pairing, packed, player, depth):
+        """Value of a position for player with depth turns left to search"""
+        key = (((packed << DEPTH_BITS) | depth) << 1) | (player - 1)
+        value = self.table.get(key)
+        if value is not None:
+            return value
+        if time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        value = max(self.move_value(pairing, packed, player, move, depth)
+                    for move in pairing.moves(packed, player))
+        self.table[key] = value
+        return value
+
+
+class AIController:
+    """Picks the computer player's move.
+
+    Plays the solved optimal strategy when a policy table has been built (see battle_solver)
+    and searches ahead otherwise.
+    """
+
+    def __init__(self, time_budget=AI_TIME_BUDGET, max_depth=AI_MAX_DEPTH, use_policy=True):
+        self.search = SearchAI(time_budget, max_depth)
+        self.policy = None
+        if use_policy:
+            from battle_solver import load_policy  # battle_solver builds on this module
+            self.policy = load_policy()
+
+    def prepare(self, name1, name2):
+        """Load what the battle between name1 and name2 needs before it starts, not on the first move"""
+        if self.policy is not None:
+            self.policy.matchup(name1, name2)
+
+    def choose_move(self, monster, opponent=None, turn_number=1, player=2, rng=random):
+        """Move for monster (player 1 or 2) against opponent on turn turn_number.
+
+        Without an opponent there is nothing to search, so a random available move is picked.
+        Random choices come from rng (a battle's seeded random.Random; the random module by default).
+        """
+        if opponent is None:
+            return rng.choice(battle_rules.available_abilities(monster))
+        fighter1, fighter2 = (monster, opponent) if player == 1 else (opponent, monster)
+        state = state_of(fighter1, fighter2, turn_number)
+        if self.policy is not None:
+            weights = self.policy.strategy(fighter1.name, fighter2.name, state, player)
+            if weights is not None:
+                abilities = battle_rules.abilities_for(monster.name)
+                return rng.choices(abilities, weights[:len(abilities)])[0]
+        return self.search.choose(fighter1.name, fighter2.name, state, player)
+
+    def request_move(self, monster, opponent, turn_number, player=2, rng=random):
+        """choose_move as an already completed Future, for callers that also drive MCTSController"""
+        future = Future()
+        future.set_result(self.choose_move(monster, opponent, turn_number, player, rng))
+        return future
+
+    def close(self):
+        pass
@@ -1,7 +1,10 @@
 import random
 import pygame
 from settings import *
+import battle_rules
+import replay_log
 from animation import AttackAnimation, DamageFlash
+from battle_ai import AIController
 
 class Move:
     def __init__(self, name, damage, element):
@@ -9,16 +12,23 @@ class Move:
         self.damage = damage
         self.element = element
 
-class AIController:
-    def choose_move(self, monster):
-        return random.choice(monster.abilities)
-
 class BattleEngine:
-    def __init__(self, player1_monster, player2_monster, battle_ui):
+    def __init__(self, player1_monster, player2_monster, battle_ui, seed=None, replays=None):
         self.player1_monster = player1_monster
         self.player2_monster = player2_monster
         self.battle_ui = battle_ui
         self.turn_number = 1
+
+        # Randomness in this battle (the computer's choices) comes from its own seeded RNG
+        self.seed = replay_log.new_seed() if seed is None else seed
+        self.rng = random.Random(self.seed)
+
+        # Replay logging: moves of the turn being animated are logged once it finishes
+        self.replays = replays
+        self.battle_id = None
+        if replays is not None:
+            self.battle_id = replays.start_battle(self.seed, player1_monster.name, player2_monster.name)
+        self.turn_moves = None
         
         # Animation systems
         self.attack_animation = AttackAnimation()
@@ -32,40 +42,47 @@ class BattleEngine:
     def run_turn(self, player1_move, player2_move):
         """Execute a turn with animations"""
         print(f"\n--- Turn {self.turn_number} ---")
+        self.turn_moves = (self.turn_number, player1_move, player2_move)
         
         # Apply burn damage at start of turn
         if self.player1_monster.apply_burn():
             print(f"{self.player1_monster.name} fainted from burn!")
+            self.finish_without_moves()
             return self.player2_monster
         if self.player2_monster.apply_burn():
             print(f"{self.player2_monster.name} fainted from burn!")
+            self.finish_without_moves()
             return self.player1_monster
         
         # Determine turn order (alternates each turn)
-        if self.turn_number % 2 == 1:  # Odd turns: Player 1 goes first
-            first_attacker, first_move = self.player1_monster, player1_move
-            second_attacker, second_move = self.player2_monster, player2_move
-        else:  # Even turns: Player 2 goes first
-            first_attacker, first_move = self.player2_monster, player2_move
-            second_attacker, second_move = self.player1_monster, player1_move
+        moves = {1: (self.player1_monster, player1_move), 2: (self.player2_monster, player2_move)}
+        first_id, second_id = battle_rules.turn_order(self.turn_number)
 
         # Queue animations
-        self.animation_queue = [
-            (first_attacker, first_move),
-            (second_attacker, second_move)
-        ]
+        self.animation_queue = [moves[first_id], moves[second_id]]
         
         self.animating = True
         self.turn_number += 1
         
         return None  # Don't check winner until animations complete
 
+    def finish_without_moves(self):
+        """End the turn with no attacks so update_animations reports the winner"""
+        self.battle_ui.update_health_display(self.player1_monster.health, self.player2_monster.health)
+        self.animation_queue = []
+        self.animating = True
+        self.turn_number += 1
+
     def update_animations(self, dt):
         """Update all animations"""
         self.attack_animation.update(dt)
         self.player1_flash.update(dt)
         self.player2_flash.update(dt)
         
+        # A fainted monster doesn't get to attack back
+        if self.animation_queue and self.check_winner() is not None:
+            self.animation_queue.clear()
+            
         # Process animation queue
         if self.animating and not self.attack_animation.active and self.animation_queue:
             attacker, move = self.animation_queue.pop(0)
@@ -76,10 +93,30 @@ class BattleEngine:
             not self.animation_queue and not self.player1_flash.active and not self.player2_flash.active):
             self.animating = False
             # Check for winner after animations
-            return self.check_winner()
+            winner = self.check_winner()
+            self.log_turn(winner)
+            return winner
             
         return None
 
+    def log_turn(self, winner):
+        """Append the finished turn (and the result, once there is a winner) to the replay log"""
+        if self.replays is None or self.battle_id is None or self.turn_moves is None:
+            return
+        turn, player1_move, player2_move = self.turn_moves
+        self.turn_moves = None
+        self.replays.log_turn(self.battle_id, turn, player1_move, player2_move,
+                              replay_log.state_hash(self.player1_monster, self.player2_monster, turn + 1))
+        if winner is not None:
+            self.replays.end_battle(self.battle_id, 1 if winner == self.player1_monster else 2, turn)
+            self.battle_id = None
+
+    def close(self):
+        """Tear down a battle; one quit or restarted before it ended stays unfinished in the replay log"""
+        if self.replays is not None and self.battle_id is not None:
+            self.replays.abandon_battle(self.battle_id)
+            self.battle_id = None
+
     def execute_attack_with_animation(self, attacker, move_name):
         """Execute an attack with full animation"""
         # Determine target
@@ -92,30 +129,36 @@ class BattleEngine:
             target_flash = self.player1_flash
             attacker_flash = self.player2_flash
 
-        # Get move data
-        move_data = ABILITIES_DATA[move_name]
-        
-        # Start attack animation
-        self.attack_animation.start_animation(move_name, move_data)
-        
-        # Handle special moves
-        if move_data.get('type') == 'special':
-            self.execute_special_move(attacker, target, move_name, move_data, target_flash, attacker_flash)
+        # Start attack animation (an unknown move has nothing to animate; the rules reject it below)
+        move_data = ABILITIES_DATA.get(move_name)
+        if move_data is not None:
+            self.attack_animation.start_animation(move_name, move_data)
+        
+        # Resolve the move with the shared rules
+        outcome, amount = battle_rules.execute_move(attacker, target, move_name)
+        
+        if outcome == battle_rules.REFLECTED:
+            print(f"{target.name}'s shield reflects {amount} damage back to {attacker.name}!")
+            attacker_flash.start_flash()
+        elif outcome == battle_rules.HIT:
+            target_flash.start_flash()
+            print(f"{attacker.name} uses {move_name} on {target.name} for {amount} damage!")
+        elif outcome == battle_rules.SHIELDED:
+            print(f"{attacker.name} activates Reflect Shield!")
+        elif outcome == battle_rules.HEALED:
+            print(f"{attacker.name} uses Healing Wave and heals {amount} HP!")
+        elif outcome == battle_rules.SPENT:
+            print(f"{attacker.name} has already used their special move!")
         else:
-            # Regular attack
-            damage = self.calculate_damage(attacker, target, move_data)
-            reflected_damage = target.take_damage(damage)
-            
-            # Handle shield reflection
-            if isinstance(reflected_damage, int) and reflected_damage > 0:
-                print(f"Damage reflected back to {attacker.name}!")
-                attacker.take_damage(reflected_damage)
-                attacker_flash.start_flash()
-            else:
-                target_flash.start_flash()
+            print(f"{attacker.name} can't use {move_name}!")
             
-            print(f"{attacker.name} uses {move_name} on {target.name} for {damage} damage!")
-            print(f"{target.name} health: {target.health}/{target.max_health}")
+        if move_name == 'burning_fury' and outcome in (battle_rules.HIT, battle_rules.REFLECTED):
+            print(f"{target.name} is burned for {battle_rules.BURN_TURNS} turns!")
+        print(f"{target.name} health: {target.health}/{target.max_health}")
+        
+        # Refresh UI buttons to remove used special move
+        if battle_rules.is_special(move_name) and outcome != battle_rules.SPENT:
+            self.battle_ui.refresh_ability_buttons()
         
         # Update UI health display
         self.battle_ui.update_health_display(
@@ -123,75 +166,28 @@ class BattleEngine:
             self.player2_monster.health
         )
 
-    def execute_special_move(self, attacker, target, move_name, move_data, target_flash, attacker_flash):
-        """Execute special move effects"""
-        if not attacker.activate_special_move(move_name):
-            print(f"{attacker.name} has already used their special move!")
-            return
-        
-        # Refresh UI buttons to remove used special move
-        self.battle_ui.refresh_ability_buttons()
-        
-        if move_name == 'reflect_shield':
-            attacker.shield_active = True
-            print(f"{attacker.name} activates Reflect Shield!")
-            
-        elif move_name == 'healing_wave':
-            heal_amount = abs(move_data['damage'])  # Convert negative damage to positive healing
-            attacker.heal(heal_amount)
-            print(f"{attacker.name} uses Healing Wave!")
-            
-        elif move_name == 'burning_fury':
-            # Deal damage + apply burn
-            damage = self.calculate_damage(attacker, target, move_data)
-            reflected_damage = target.take_damage(damage)
-            target.burn_turns = 2  # Apply burn for 2 turns
-            
-            # Handle shield reflection
-            if isinstance(reflected_damage, int) and reflected_damage > 0:
-                print(f"Damage reflected back to {attacker.name}!")
-                attacker.take_damage(reflected_damage)
-                attacker_flash.start_flash()
-            else:
-                target_flash.start_flash()
-                
-            print(f"{attacker.name} uses Burning Fury! {target.name} is burned for 2 turns!")
-            print(f"{target.name} health: {target.health}/{target.max_health}")
-
-    def calculate_damage(self, attacker, target, move_data):
+    def calculate_damage(self, attacker, target, move_name):
         """Calculate damage with type effectiveness"""
-        base_damage = move_data['damage']
-        move_element = move_data['element']
-        
-        # Get type effectiveness
-        effectiveness = 1.0
-        if move_element in ELEMENT_DATA and target.element in ELEMENT_DATA[move_element]:
-            effectiveness = ELEMENT_DATA[move_element][target.element]
-        
-        # Get stats from monster data
-        attacker_data = MONSTER_DATA[attacker.name]
-        target_data = MONSTER_DATA[target.name]
-        
-        attack_stat = attacker_data['attack']
-        defense_stat = target_data['defense']
-        
-        # Calculate final damage with stats
-        damage = int(base_damage * effectiveness * (attack_stat / defense_stat))
-        damage = max(1, damage)  # Minimum 1 damage
-        
-        return damage
+        return battle_rules.calculate_damage(attacker.name, target.name, move_name)
 
     def check_winner(self):
         """Check if there's a winner"""
-        if self.player1_monster.health <= 0:
-            return self.player2_monster
-        elif self.player2_monster.health <= 0:
+        winner = battle_rules.check_winner(self.player1_monster, self.player2_monster)
+        if winner == 1:
             return self.player1_monster
+        elif winner == 2:
+            return self.player2_monster
         return None
 
     def draw_animations(self, surface):
         """Draw all active animations"""
         self.attack_animation.draw(surface)
+
+    def track_dirty_regions(self, renderer):
+        """Report the running attack animation to a DirtyRectRenderer"""
+        rect = self.attack_animation.get_rect(renderer.screen_rect)
+        if rect:
+            renderer.track('attack_animation', rect, (self.attack_animation.attack_name, self.attack_animation.alpha))
         
     def get_monster_flash_state(self, monster):
         """Get flash state for a monster"""
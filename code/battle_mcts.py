@@ -0,0 +1,175 @@
+"""
+Monte Carlo tree search opponent ("hard" difficulty).
+
+Every worker process of a multiprocessing pool grows its own search tree from
+the current position (root parallelization). Both players pick their moves at
+the same time, so each node keeps separate UCB1 statistics per player
+(decoupled UCT) and is expanded by the pair of moves chosen. New nodes are
+scored by random playouts against the headless battle_rules, reusing the
+memoized turn resolution from battle_ai. A worker stops at its share of the
+rollout budget or when the time budget runs out, whichever comes first; the
+root visit counts of all workers are then summed and the most visited move is
+played.
+
+The search never runs on the caller's thread: request_move returns a
+concurrent.futures.Future right away, and the pool's result thread fills it in.
+"""
+
+import os
+import math
+import time
+import random
+import multiprocessing
+from concurrent.futures import Future
+from settings import MCTS_ROLLOUTS, MCTS_TIME_BUDGET
+import battle_rules
+from battle_ai import Pairing, state_of, pack_state, TABLE_LIMIT
+
+EXPLORATION = 1.4  # UCB1 exploration constant, for rewards in 0..1
+MAX_ROLLOUT_TURNS = 100  # Playouts longer than this are scored by health instead
+CHECK_INTERVAL = 64  # Iterations between deadline checks
+
+_pairing = None  # Worker-side memoized rules for the matchup being searched
+
+
+class Node:
+    """Search tree node: per-player move statistics and children keyed by the move pair"""
+
+    __slots__ = ('moves', 'visits', 'wins', 'children')
+
+    def __init__(self, moves1, moves2):
+        self.moves = (moves1, moves2)
+        self.visits = ([0] * len(moves1), [0] * len(moves2))
+        self.wins = ([0.0] * len(moves1), [0.0] * len(moves2))  # Reward of each player for their own move
+        self.children = {}
+
+    def select(self, side, rng):
+        """Index of the move side (0 or 1) should try next, by UCB1; untried moves first"""
+        visits = self.visits[side]
+        untried = [i for i, n in enumerate(visits) if n == 0]
+        if untried:
+            return rng.choice(untried)
+        log_total = math.log(sum(visits))
+        wins = self.wins[side]
+        scores = [wins[i] / n + EXPLORATION * math.sqrt(log_total / n) for i, n in enumerate(visits)]
+        return scores.index(max(scores))
+
+
+def rollout(pairing, packed, rng):
+    """Play random moves from a position; returns player 1's reward (1 win, 0 loss)"""
+    for _ in range(MAX_ROLLOUT_TURNS):
+        winner, packed = pairing.resolve(packed, rng.choice(pairing.moves(packed, 1)),
+                                         rng.choice(pairing.moves(packed, 2)))
+        if winner:
+            return 1.0 if winner == 1 else 0.0
+    score = pairing.evaluate(packed, 1)
+    return 1.0 if score > 0 else 0.0 if score < 0 else 0.5
+
+
+def search_worker(name1, name2, state, rollouts, time_budget, seed):
+    """Run MCTS from state in this process.
+
+    Returns ({move index: visits} for each player at the root, iterations run).
+    """
+    global _pairing
+    deadline = time.perf_counter() + time_budget
+    if _pairing is None or _pairing.names != (name1, name2):
+        _pairing = Pairing(name1, name2)
+    elif len(_pairing.transitions) > TABLE_LIMIT:
+        _pairing.transitions.clear()
+    pairing = _pairing
+    rng = random.Random(seed)
+
+    root_packed = pack_state(state)
+    root = Node(pairing.moves(root_packed, 1), pairing.moves(root_packed, 2))
+    iterations = 0
+    while iterations < rollouts:
+        if iterations % CHECK_INTERVAL == 0 and time.perf_counter() > deadline:
+            break
+        iterations += 1
+
+        # Selection and expansion: descend by each player's own UCB1 choice
+        node, packed, path = root, root_packed, []
+        while True:
+            i1, i2 = node.select(0, rng), node.select(1, rng)
+            path.append((node, i1, i2))
+            move1, move2 = node.moves[0][i1], node.moves[1][i2]
+            winner, packed = pairing.resolve(packed, move1, move2)
+            if winner:
+                reward = 1.0 if winner == 1 else 0.0
+                break
+            child = node.children.get((move1, move2))
+            if child is None:
+                node.children[(move1, move2)] = Node(pairing.moves(packed, 1), pairing.moves(packed, 2))
+                reward = rollout(pairing, packed, rng)  # Simulation
+                break
+            node = child
+
+        # Backpropagation: each player is credited with their own reward
+        for node, i1, i2 in path:
+            node.visits[0][i1] += 1
+            node.wins[0][i1] += reward
+            node.visits[1][i2] += 1
+            node.wins[1][i2] += 1.0 - reward
+
+    root_visits = tuple(dict(zip(root.moves[side], root.visits[side])) for side in (0, 1))
+    return root_visits, iterations
+
+
+class MCTSController:
+    """AIController variant that searches with MCTS on a process pool.
+
+    The rollout budget is split across the pool's processes, so more cores
+    mean more rollouts before the time budget cuts the search off.
+    """
+
+    def __init__(self, rollouts=MCTS_ROLLOUTS, time_budget=MCTS_TIME_BUDGET, processes=None):
+        self.rollouts = rollouts
+        self.time_budget = time_budget
+        self.processes = processes or os.cpu_count() or 1
+        # Spawned rather than forked: the game process has SDL and loader threads running
+        self.pool = multiprocessing.get_context('spawn').Pool(self.processes)
+        self.last_iterations = 0  # Rollouts run for the last move, over all processes
+
+    def prepare(self, name1, name2):
+        """Nothing to load up front; the workers build their rules per matchup"""
+
+    def request_move(self, monster, opponent, turn_number, player=2, rng=random):
+        """Start searching for monster's move (player 1 or 2); returns a Future of the move name.
+
+        The workers' seeds are drawn from rng (a battle's seeded random.Random; the random module by default).
+        """
+        fighter1, fighter2 = (monster, opponent) if player == 1 else (opponent, monster)
+        state = state_of(fighter1, fighter2, turn_number)
+        abilities = battle_rules.abilities_for(monster.name)
+        fallback = battle_rules.available_abilities(monster)
+        per_process = max(1, self.rollouts // self.processes)
+        jobs = [(fighter1.name, fighter2.name, state, per_process, self.time_budget, rng.getrandbits(64))
+                for _ in range(self.processes)]
+        future = Future()
+
+        def finished(results):
+            # Runs on the pool's result thread
+            visits = {}
+            for root_visits, _ in results:
+                for move, count in root_visits[player - 1].items():
+                    visits[move] = visits.get(move, 0) + count
+            self.last_iterations = sum(iterations for _, iterations in results)
+            future.set_result(abilities[max(visits, key=visits.get)])
+
+        fallback_move = rng.choice(fallback)  # Drawn now, so rng is only used on the caller's thread
+
+        def failed(error):
+            print(f"MCTS search failed: {error}; playing a random move")
+            future.set_result(fallback_move)
+
+        self.pool.starmap_async(search_worker, jobs, callback=finished, error_callback=failed)
+        return future
+
+    def choose_move(self, monster, opponent, turn_number=1, player=2, rng=random):
+        """Blocking version of request_move"""
+        return self.request_move(monster, opponent, turn_number, player, rng).result()
+
+    def close(self):
+        self.pool.terminate()
+        self.pool.join()
@@ -0,0 +1,214 @@
+"""
+Headless battle rules shared by local play (BattleEngine) and network play (GameServer).
+
+Nothing in here creates sprites, loads images or prints, so the same code can be
+used to simulate large numbers of turns for balancing and server load testing.
+The functions work on any object exposing the fighter attributes (name, element,
+health, max_health, shield_active, burn_turns, special_used, abilities), which
+covers both the lightweight Fighter below and the pygame Monster sprite.
+"""
+
+from types import MappingProxyType
+from settings import MONSTER_DATA, ABILITIES_DATA, ELEMENT_DATA
+
+# Moves each element learns on top of the basic 'scratch'
+ELEMENT_ABILITIES = {
+    'fire': ['nuke', 'spark', 'burning_fury'],
+    'water': ['shards', 'splash', 'healing_wave'],
+    'plant': ['spiral', 'earthquake', 'reflect_shield'],
+}
+
+BURN_TURNS = 2  # Turns of burn applied by Burning Fury
+
+# Move outcomes returned by execute_move
+HIT = 'hit'
+REFLECTED = 'reflected'
+HEALED = 'healed'
+SHIELDED = 'shielded'
+SPENT = 'spent'  # Special move was already used this battle
+INVALID = 'invalid'  # Unknown move or not one of the attacker's abilities
+
+
+class Fighter:
+    """Plain battle state for one monster, without any pygame resources"""
+
+    __slots__ = ('name', 'element', 'health', 'max_health', 'shield_active',
+                 'burn_turns', 'special_used', 'abilities')
+
+    def __init__(self, name):
+        stats = MONSTER_DATA[name]
+        self.name = name
+        self.element = stats['element']
+        self.health = stats['health']
+        self.max_health = stats['health']
+        self.shield_active = False
+        self.burn_turns = 0
+        self.special_used = False
+        self.abilities = abilities_for(name)
+
+    def copy(self):
+        """Return an independent copy of this fighter's state"""
+        clone = Fighter.__new__(Fighter)
+        for slot in Fighter.__slots__:
+            setattr(clone, slot, getattr(self, slot))
+        return clone
+
+
+def abilities_for(name):
+    """Full ability list for a monster: 'scratch' plus its element moves"""
+    return ['scratch'] + ELEMENT_ABILITIES.get(MONSTER_DATA[name]['element'], [])
+
+
+def is_special(move_name):
+    """True if the move is a one-time special move"""
+    return ABILITIES_DATA.get(move_name, {}).get('type') == 'special'
+
+
+def available_abilities(fighter):
+    """Abilities the fighter can still pick (excludes a spent special move)"""
+    return [move for move in fighter.abilities
+            if not (fighter.special_used and is_special(move))]
+
+
+def compute_damage(attacker_name, defender_name, move_name):
+    """Damage dealt by a move: base x type effectiveness x attack/defense, minimum 1"""
+    move_data = ABILITIES_DATA[move_name]
+    defender_data = MONSTER_DATA[defender_name]
+
+    effectiveness = ELEMENT_DATA.get(move_data['element'], {}).get(defender_data['element'], 1.0)
+    attack_stat = MONSTER_DATA[attacker_name]['attack']
+    defense_stat = defender_data['defense']
+
+    damage = int(move_data['damage'] * effectiveness * (attack_stat / defense_stat))
+    return max(1, damage)
+
+
+def build_damage_table():
+    """Read-only {(attacker, defender, move): damage} for every monster pair and ability"""
+    return MappingProxyType({
+        (attacker, defender, move): compute_damage(attacker, defender, move)
+        for attacker in MONSTER_DATA
+        for defender in MONSTER_DATA
+        for move in ABILITIES_DATA
+    })
+
+
+# Compiled once at import; call invalidate_tables() after editing the settings data
+DAMAGE_TABLE = build_damage_table()
+_invalidation_callbacks = []
+
+
+def on_tables_invalidated(callback):
+    """Register a callback run after invalidate_tables() (e.g. to drop derived caches)"""
+    _invalidation_callbacks.append(callback)
+
+
+def invalidate_tables():
+    """Rebuild the damage table after MONSTER_DATA/ABILITIES_DATA/ELEMENT_DATA changed"""
+    global DAMAGE_TABLE
+    DAMAGE_TABLE = build_damage_table()
+    for callback in _invalidation_callbacks:
+        callback()
+
+
+def calculate_damage(attacker_name, defender_name, move_name):
+    """Damage dealt by a move, read from the precomputed damage table"""
+    return DAMAGE_TABLE[(attacker_name, defender_name, move_name)]
+
+
+def apply_burn(fighter):
+    """Apply start-of-turn burn damage; returns the damage dealt (0 if not burning)"""
+    if fighter.burn_turns <= 0:
+        return 0
+    burn_damage = max(1, fighter.max_health // 10)  # 10% of max health
+    fighter.health = max(0, fighter.health - burn_damage)
+    fighter.burn_turns -= 1
+    return burn_damage
+
+
+def deal_damage(attacker, defender, damage):
+    """Apply damage to the defender; an active shield reflects it onto the attacker.
+
+    Returns True if the damage was reflected.
+    """
+    if defender.shield_active and damage > 0:
+        defender.shield_active = False  # Shield is consumed after one use
+        attacker.health = max(0, attacker.health - damage)
+        return True
+    defender.health = max(0, defender.health - damage)
+    return False
+
+
+def heal(fighter, amount):
+    """Heal up to max health; returns the amount actually healed"""
+    old_health = fighter.health
+    fighter.health = min(fighter.max_health, fighter.health + amount)
+    return fighter.health - old_health
+
+
+def execute_move(attacker, defender, move_name):
+    """Resolve one move. Returns an (outcome, amount) tuple.
+
+    amount is the damage dealt for HIT/REFLECTED, the HP restored for HEALED
+    and 0 otherwise.
+    """
+    if move_name not in ABILITIES_DATA or move_name not in attacker.abilities:
+        return INVALID, 0
+
+    if is_special(move_name):
+        if attacker.special_used:
+            return SPENT, 0
+        attacker.special_used = True
+
+        if move_name == 'reflect_shield':
+            attacker.shield_active = True
+            return SHIELDED, 0
+        if move_name == 'healing_wave':
+            # Negative damage in ABILITIES_DATA means healing
+            return HEALED, heal(attacker, abs(ABILITIES_DATA[move_name]['damage']))
+        if move_name == 'burning_fury':
+            damage = DAMAGE_TABLE[(attacker.name, defender.name, move_name)]
+            reflected = deal_damage(attacker, defender, damage)
+            defender.burn_turns = BURN_TURNS
+            return (REFLECTED if reflected else HIT), damage
+
+    damage = DAMAGE_TABLE[(attacker.name, defender.name, move_name)]
+    reflected = deal_damage(attacker, defender, damage)
+    return (REFLECTED if reflected else HIT), damage
+
+
+def turn_order(turn_number):
+    """Player numbers in attack order; player 1 goes first on odd turns"""
+    return (1, 2) if turn_number % 2 == 1 else (2, 1)
+
+
+def check_winner(fighter1, fighter2):
+    """Return 1 or 2 for the winning player, or 0 while both are standing"""
+    if fighter1.health <= 0:
+        return 2
+    if fighter2.health <= 0:
+        return 1
+    return 0
+
+
+def run_turn(fighter1, fighter2, move1, move2, turn_number):
+    """Resolve a whole turn without animations.
+
+    Burn ticks first, then both moves in alternating order; the turn stops as
+    soon as a monster faints. Returns the winning player number or 0.
+    """
+    if apply_burn(fighter1) and fighter1.health <= 0:
+        return 2
+    if apply_burn(fighter2) and fighter2.health <= 0:
+        return 1
+
+    fighters = {1: fighter1, 2: fighter2}
+    moves = {1: move1, 2: move2}
+    for attacker_id in turn_order(turn_number):
+        if moves[attacker_id] is None:
+            continue
+        execute_move(fighters[attacker_id], fighters[3 - attacker_id], moves[attacker_id])
+        winner = check_winner(fighter1, fighter2)
+        if winner:
+            return winner
+    return 0
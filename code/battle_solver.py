@@ -0,0 +1,306 @@
+"""
+Exact offline solver for every 1v1 matchup, and the policy table it produces.
+
+A battle is a finite zero-sum game: every turn either deals damage or spends a
+one-shot special move, so positions can never repeat. Working back from the
+knockouts, each position's value (player 1's chance to win under optimal play)
+is the value of the matrix game formed by both players' moves, whose entries
+are the values of the positions they lead to. Since the moves are simultaneous,
+the optimal strategies are mixed; each matrix game is solved exactly with a
+small simplex (or directly when it has a saddle point).
+
+Positions are the packed (hp1, hp2, shield, burn, special_used, turn parity)
+ints from battle_ai. Every position reachable from the start is solved, one
+matchup per worker process, and the optimal strategies of both players are
+written to a compact policy file: per matchup, a zlib-compressed block of
+sorted position keys plus one byte per move probability. PolicyTable loads a
+matchup's block on first use and then finds positions by binary search on its keys.
+
+The header records a hash of the battle data in settings, so a table built
+before a balance change is detected as stale and ignored.
+
+Build the table:
+  python code/battle_solver.py [--processes N] [Pouch:Jacana ...]
+"""
+
+import os
+import sys
+import time
+import zlib
+import struct
+import hashlib
+import bisect
+import multiprocessing
+from array import array
+from settings import MONSTER_DATA, ABILITIES_DATA, ELEMENT_DATA
+import battle_rules
+from battle_ai import Pairing, state_of, pack_state
+
+MAGIC = b'MBPT'
+VERSION = 1
+# magic, version, move slots per player, matchup count, hash of the battle data
+HEADER = struct.Struct('!4sHHI32s')
+# monster 1, monster 2, block offset, block length, position count
+INDEX_ENTRY = struct.Struct('!16s16sQII')
+
+BASE_DIR = os.path.dirname(__file__)
+POLICY_PATH = os.path.normpath(os.path.join(BASE_DIR, '..', 'data', 'matchups.policy'))
+
+EPSILON = 1e-12
+PROBABILITY_SCALE = 255  # Probabilities are stored as bytes
+
+
+def data_hash():
+    """SHA-256 of everything in settings that affects the rules"""
+    data = repr((sorted(MONSTER_DATA.items()), sorted(ABILITIES_DATA.items()),
+                 sorted(ELEMENT_DATA.items()), battle_rules.BURN_TURNS))
+    return hashlib.sha256(data.encode()).digest()
+
+
+def move_slots():
+    """Largest ability count of any monster; every position stores this many probabilities per player"""
+    return max(len(battle_rules.abilities_for(name)) for name in MONSTER_DATA)
+
+
+def solve_matrix_game(payoff):
+    """Solve a zero-sum matrix game where the row player maximizes.
+
+    Returns (value, row strategy, column strategy).
+    """
+    rows, cols = len(payoff), len(payoff[0])
+
+    # Saddle point: both players have a pure optimal strategy
+    row_mins = [min(row) for row in payoff]
+    col_maxes = [max(payoff[i][j] for i in range(rows)) for j in range(cols)]
+    lower, upper = max(row_mins), min(col_maxes)
+    if upper - lower <= EPSILON:
+        row_strategy = [0.0] * rows
+        col_strategy = [0.0] * cols
+        row_strategy[row_mins.index(lower)] = 1.0
+        col_strategy[col_maxes.index(upper)] = 1.0
+        return lower, row_strategy, col_strategy
+
+    # Column player's LP on the payoffs shifted to >= 1: maximize sum(y) subject to A y <= 1, y >= 0.
+    # Then value = 1 / sum(y) - shift, the column strategy is y scaled to sum 1 and the row
+    # strategy comes from the dual values left on the slack columns of the objective row.
+    shift = 1.0 - min(row_mins)
+    tableau = [[payoff[i][j] + shift for j in range(cols)] + [1.0 if k == i else 0.0 for k in range(rows)] + [1.0]
+               for i in range(rows)]
+    objective = [-1.0] * cols + [0.0] * (rows + 1)
+    basis = [cols + i for i in range(rows)]
+    width = cols + rows + 1
+
+    while True:
+        # Bland's rule: lowest entering and leaving indices, so the simplex can't cycle
+        entering = next((j for j in range(cols + rows) if objective[j] < -EPSILON), None)
+        if entering is None:
+            break
+        leaving, best_ratio = None, None
+        for i in range(rows):
+            if tableau[i][entering] > EPSILON:
+                ratio = tableau[i][-1] / tableau[i][entering]
+                if (best_ratio is None or ratio < best_ratio - EPSILON
+                        or (ratio <= best_ratio + EPSILON and basis[i] < basis[leaving])):
+                    leaving, best_ratio = i, ratio
+
+        pivot_row = tableau[leaving]
+        pivot = pivot_row[entering]
+        for k in range(width):
+            pivot_row[k] /= pivot
+        for row in tableau + [objective]:
+            if row is not pivot_row:
+                factor = row[entering]
+                if factor:
+                    for k in range(width):
+                        row[k] -= factor * pivot_row[k]
+        basis[leaving] = entering
+
+    total = objective[-1]
+    col_strategy = [0.0] * cols
+    for i, variable in enumerate(basis):
+        if variable < cols:
+            col_strategy[variable] = tableau[i][-1] / total
+    row_strategy = [objective[cols + i] / total for i in range(rows)]
+    return 1.0 / total - shift, row_strategy, col_strategy
+
+
+def quantize(strategy, moves, slots):
+    """Byte probabilities for each ability slot, from a strategy over the available move indices"""
+    weights = [0] * slots
+    for move, probability in zip(moves, strategy):
+        weights[move] = round(max(0.0, probability) * PROBABILITY_SCALE)
+    if not any(weights):
+        weights[moves[max(range(len(moves)), key=strategy.__getitem__)]] = 1  # Keep at least one move playable
+    return weights
+
+
+def solve_pairing(name1, name2, slots):
+    """Solve every position of a matchup reachable from the start.
+
+    Returns (name1, name2, player 1's winning chance at the start, sorted position keys
+    as an array, strategy bytes with 2 * slots probabilities per position).
+    """
+    pairing = Pairing(name1, name2)
+    start = pack_state(state_of(pairing.fighters[0], pairing.fighters[1], 1))
+    values = {}
+    strategies = {}
+    outcomes = {}  # Move pair outcomes of the positions waiting on the stack for their successors
+
+    # Depth-first, finishing a position after all its successors; an explicit stack because
+    # battles between tanky monsters run far deeper than the recursion limit
+    stack = [start]
+    while stack:
+        packed = stack[-1]
+        if packed in values:
+            stack.pop()
+            continue
+        matrix = outcomes.get(packed)
+        if matrix is None:
+            moves1, moves2 = pairing.moves(packed, 1), pairing.moves(packed, 2)
+            matrix = outcomes[packed] = [[pairing.step(packed, move1, move2) for move2 in moves2] for move1 in moves1]
+            stack.extend(next_packed for row in matrix for winner, next_packed in row
+                         if not winner and next_packed not in values)
+            continue
+
+        del outcomes[packed]
+        stack.pop()
+        payoff = [[(1.0 if winner == 1 else 0.0) if winner else values[next_packed] for winner, next_packed in row]
+                  for row in matrix]
+        values[packed], strategy1, strategy2 = solve_matrix_game(payoff)
+        strategies[packed] = (quantize(strategy1, pairing.moves(packed, 1), slots) +
+                              quantize(strategy2, pairing.moves(packed, 2), slots))
+
+    keys = array('Q', sorted(strategies))
+    probabilities = bytes(weight for key in keys for weight in strategies[key])
+    return name1, name2, values[start], keys, probabilities
+
+
+def _solve_job(job):
+    return solve_pairing(*job)
+
+
+def encode_block(keys, probabilities):
+    """Compressed policy block: little-endian uint64 keys, then the strategy bytes"""
+    keys = array('Q', keys)
+    if sys.byteorder == 'big':
+        keys.byteswap()
+    return zlib.compress(keys.tobytes() + probabilities, 9)
+
+
+def write_policy(path, results, slots, digest):
+    """Write solved matchups [(name1, name2, keys, probabilities)] to a policy file"""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    blocks = [(name1, name2, encode_block(keys, probabilities), len(keys))
+              for name1, name2, keys, probabilities in results]
+    offset = HEADER.size + INDEX_ENTRY.size * len(blocks)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, slots, len(blocks), digest))
+        for name1, name2, block, count in blocks:
+            f.write(INDEX_ENTRY.pack(name1.encode(), name2.encode(), offset, len(block), count))
+            offset += len(block)
+        for _, _, block, _ in blocks:
+            f.write(block)
+    os.replace(tmp_path, path)  # Never leave a half-written table behind
+
+
+def find_position(keys, packed):
+    """Row of a packed position in a matchup's sorted keys, or None if it isn't there"""
+    row = bisect.bisect_left(keys, packed)
+    return row if row < len(keys) and keys[row] == packed else None
+
+
+class PolicyTable:
+    """Optimal mixed strategies for every solved matchup, loaded one matchup at a time"""
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self.data = f.read()
+        magic, version, self.slots, count, self.digest = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{path} is not a version {VERSION} policy table")
+        self.index = {}
+        for i in range(count):
+            name1, name2, offset, length, positions = INDEX_ENTRY.unpack_from(self.data, HEADER.size + i * INDEX_ENTRY.size)
+            self.index[(name1.rstrip(b'\0').decode(), name2.rstrip(b'\0').decode())] = (offset, length, positions)
+        self.loaded = {}  # (name1, name2) -> (sorted packed positions, strategy bytes)
+
+    def matchup(self, name1, name2):
+        """Decompressed keys and strategies of a matchup, or None if it wasn't solved.
+
+        Decompressing a big matchup takes tens of milliseconds; callers on the game loop
+        should load it before the battle starts (AIController.prepare).
+        """
+        key = (name1, name2)
+        if key not in self.loaded:
+            entry = self.index.get(key)
+            if entry is None:
+                return None
+            offset, length, positions = entry
+            raw = zlib.decompress(self.data[offset:offset + length])
+            keys = array('Q')
+            keys.frombytes(raw[:8 * positions])
+            if sys.byteorder == 'big':
+                keys.byteswap()
+            self.loaded[key] = (keys, raw[8 * positions:])
+        return self.loaded[key]
+
+    def strategy(self, name1, name2, state, player):
+        """Byte weights over player's ability slots in state (a state_of tuple), or None if unknown"""
+        matchup = self.matchup(name1, name2)
+        if matchup is None:
+            return None
+        keys, probabilities = matchup
+        row = find_position(keys, pack_state(state))
+        if row is None:
+            return None
+        start = (2 * row + player - 1) * self.slots
+        return probabilities[start:start + self.slots]
+
+
+def load_policy(path=POLICY_PATH):
+    """Open the policy table if it exists and was built from the current battle data.
+
+    Returns a PolicyTable, or None (with the reason printed) so the caller can search instead.
+    """
+    if not os.path.exists(path):
+        return None
+    try:
+        table = PolicyTable(path)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"Ignoring policy table {path}: {e}")
+        return None
+    if table.digest != data_hash() or table.slots != move_slots():
+        print(f"Policy table {path} is stale (battle data changed); rebuild with python code/battle_solver.py")
+        return None
+    return table
+
+
+def build_policy(pairs=None, path=POLICY_PATH, processes=None):
+    """Solve the given (name1, name2) matchups (all by default) in parallel and write the table"""
+    if pairs is None:
+        pairs = [(name1, name2) for name1 in MONSTER_DATA for name2 in MONSTER_DATA]
+    slots = move_slots()
+    results = []
+    with multiprocessing.Pool(processes) as pool:
+        for name1, name2, value, keys, probabilities in pool.imap_unordered(
+                _solve_job, [(name1, name2, slots) for name1, name2 in pairs]):
+            print(f"{name1} vs {name2}: {len(keys)} positions, player 1 wins {value:.1%} with optimal play")
+            results.append((name1, name2, keys, probabilities))
+    results.sort(key=lambda result: (result[0], result[1]))
+    write_policy(path, results, slots, data_hash())
+    return len(results)
+
+
+if __name__ == '__main__':
+    args = sys.argv[1:]
+    processes = None
+    if '--processes' in args:
+        i = args.index('--processes')
+        processes = int(args[i + 1])
+        del args[i:i + 2]
+    pairs = [tuple(arg.split(':')) for arg in args] or None
+    start = time.perf_counter()
+    count = build_policy(pairs, processes=processes)
+    print(f"Wrote {count} matchups to {POLICY_PATH} ({os.path.getsize(POLICY_PATH) / (1 << 20):.1f} MiB) "
+          f"in {time.perf_counter() - start:.0f}s")
@@ -0,0 +1,98 @@
+"""
+Dirty rectangle rendering for the battle screen.
+
+Every frame the screen reports its dynamic elements (monsters, embers, buttons,
+health bars, animations) as (key, rect, state) regions. Comparing them with the
+previous frame gives the rectangles that changed; only those are redrawn (with
+the surface clipped to them) and passed to pygame.display.update. A frame in
+which nothing moved costs no drawing and no display update at all.
+
+With DIRTY_RECT_RENDERING off, or after invalidate(), the whole frame is drawn
+and flipped as before.
+"""
+
+import pygame
+from settings import *
+
+MAX_CLIP_PASSES = 8  # More merged rects than this are drawn in one pass clipped to their union
+FULL_FRAME_RATIO = 0.6  # Dirty area (fraction of the screen) above which a full frame is cheaper
+
+
+class DirtyRectRenderer:
+    """Tracks which regions of the screen changed and redraws only those"""
+
+    def __init__(self, enabled=DIRTY_RECT_RENDERING):
+        self.enabled = enabled
+        self.screen_rect = pygame.Rect(0, 0, WINDOW_WIDTH, WINDOW_HEIGHT)
+        self.regions = {}  # {key: (rect, state)} as drawn in the last frame
+        self.frame = {}  # Regions reported for the frame being built
+        self.full_redraw = True
+
+    def invalidate(self):
+        """Redraw the whole screen next frame (new scene, window exposed, ...)"""
+        self.full_redraw = True
+
+    def track(self, key, rect, state=None):
+        """Report a dynamic element for this frame; it is redrawn when rect or state change"""
+        self.frame[key] = (pygame.Rect(rect), state)
+
+    def collect(self):
+        """Rects that need redrawing this frame, merged where they overlap"""
+        dirty = []
+        for key, region in self.frame.items():
+            previous = self.regions.get(key)
+            if previous != region:
+                dirty.append(region[0])
+                if previous is not None:
+                    dirty.append(previous[0])
+        for key, (rect, _) in self.regions.items():
+            if key not in self.frame:
+                dirty.append(rect)  # Element disappeared: uncover what was under it
+        self.regions, self.frame = self.frame, {}
+
+        if self.full_redraw or not self.enabled:
+            self.full_redraw = False
+            return [self.screen_rect.copy()]
+
+        merged = []
+        for rect in dirty:
+            rect = rect.clip(self.screen_rect)
+            if not rect.width or not rect.height:
+                continue
+            index = rect.collidelist(merged)
+            while index != -1:
+                rect.union_ip(merged.pop(index))
+                index = rect.collidelist(merged)
+            merged.append(rect)
+
+        area = sum(rect.width * rect.height for rect in merged)
+        if area > self.screen_rect.width * self.screen_rect.height * FULL_FRAME_RATIO:
+            return [self.screen_rect.copy()]
+        return merged
+
+    def render(self, surface, draw_scene):
+        """Draw the dirty parts of the scene with draw_scene(surface) and update the display.
+
+        draw_scene may be called more than once per frame (once per clip rect),
+        so it must only draw, never advance animation state.
+        Returns the rects that were updated.
+        """
+        rects = self.collect()
+        if not rects:
+            return rects
+
+        if rects[0] == self.screen_rect:
+            draw_scene(surface)
+            pygame.display.update()
+            return rects
+
+        if len(rects) <= MAX_CLIP_PASSES:
+            for rect in rects:
+                surface.set_clip(rect)
+                draw_scene(surface)
+        else:
+            surface.set_clip(rects[0].unionall(rects[1:]))
+            draw_scene(surface)
+        surface.set_clip(None)
+        pygame.display.update(rects)
+        return rects
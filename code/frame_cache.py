@@ -0,0 +1,150 @@
+"""
+Pre-transcoded frame cache for the menu background video.
+
+Decoding theomachy-bg.mp4 with moviepy costs seconds at startup and CPU on
+every frame. This module converts the clip once, offline, into a raw RGB frame
+file at display resolution; at runtime the file is memory-mapped and each
+frame is wrapped straight into a Surface, with no decoding or scaling.
+
+The header records the SHA-256 of the source video, so a cache built from an
+older clip is detected as stale and ignored.
+
+Build the cache (needs moviepy):
+  python code/frame_cache.py [--fps 24]
+"""
+
+import os
+import sys
+import mmap
+import struct
+import hashlib
+import pygame
+
+MAGIC = b'MBFC'
+VERSION = 1
+# magic, version, width, height, fps, frame count, SHA-256 of the source video
+HEADER = struct.Struct('!4sHHHfI32s')
+
+BASE_DIR = os.path.dirname(__file__)
+VIDEO_PATH = os.path.normpath(os.path.join(BASE_DIR, '..', 'background', 'theomachy-bg.mp4'))
+CACHE_PATH = os.path.normpath(os.path.join(BASE_DIR, '..', 'background', 'theomachy-bg.frames'))
+DISPLAY_SIZE = (800, 600)  # menu.py window size
+
+
+def file_hash(path):
+    """SHA-256 digest of a file's contents"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def write_frame_cache(path, frames, size, fps, source_hash):
+    """Write frames (RGB arrays or Surfaces, any size) scaled to size; returns the frame count"""
+    from video_stream import frame_to_surface
+    count = 0
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(HEADER.pack(MAGIC, VERSION, size[0], size[1], fps, 0, source_hash))
+        for frame in frames:
+            surf = frame if isinstance(frame, pygame.Surface) else frame_to_surface(frame)
+            if surf.get_size() != tuple(size):
+                surf = pygame.transform.scale(surf, size)
+            f.write(pygame.image.tostring(surf, 'RGB'))
+            count += 1
+        f.seek(0)
+        f.write(HEADER.pack(MAGIC, VERSION, size[0], size[1], fps, count, source_hash))
+    os.replace(tmp_path, path)  # Never leave a half-written cache behind
+    return count
+
+
+def build_frame_cache(video_path=VIDEO_PATH, cache_path=CACHE_PATH, size=DISPLAY_SIZE, fps=None):
+    """Decode video_path with moviepy and write its frame cache"""
+    try:
+        from moviepy.editor import VideoFileClip
+    except Exception:
+        from moviepy.video.io.VideoFileClip import VideoFileClip
+    clip = VideoFileClip(video_path)
+    fps = fps or clip.fps
+    count = write_frame_cache(cache_path, clip.iter_frames(fps=fps, dtype='uint8'), size, fps, file_hash(video_path))
+    clip.close()
+    return count
+
+
+class FrameCache:
+    """Memory-mapped frame file; get_frame pages a frame into a Surface without copying"""
+
+    def __init__(self, path):
+        self.file = open(path, 'rb')
+        self.map = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        magic, version, width, height, fps, count, self.source_hash = HEADER.unpack_from(self.map)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{path} is not a version {VERSION} frame cache")
+        self.size = (width, height)
+        self.fps = fps
+        self.frame_count = count
+        self.frame_bytes = width * height * 3
+        if count == 0 or len(self.map) < HEADER.size + count * self.frame_bytes:
+            self.close()
+            raise ValueError(f"{path} is truncated")
+        self.duration = count / fps
+        self.error = None  # Same interface as VideoDecoder; a mapped file can't fail mid-playback
+        self.index = None
+        self.current = None
+
+    def get_frame(self, elapsed):
+        """Frame due at elapsed seconds (looping), as a Surface over the mapped file"""
+        index = int(elapsed * self.fps) % self.frame_count
+        if index != self.index:
+            start = HEADER.size + index * self.frame_bytes
+            self.current = pygame.image.frombuffer(self.view[start:start + self.frame_bytes], self.size, 'RGB')
+            self.index = index
+        return self.current
+
+    def stop(self):
+        self.close()
+
+    def close(self):
+        self.current = None
+        self.view.release()
+        try:
+            self.map.close()
+        except BufferError:
+            pass  # A Surface still points into the map; it is unmapped once that is freed
+        self.file.close()
+
+
+def open_frame_cache(cache_path=CACHE_PATH, video_path=VIDEO_PATH, size=DISPLAY_SIZE):
+    """Open the frame cache if it exists, matches size and was built from video_path's current contents.
+
+    Returns a FrameCache, or None (with the reason printed) so the caller can decode the video instead.
+    """
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        cache = FrameCache(cache_path)
+    except (OSError, ValueError, struct.error) as e:
+        print(f"Ignoring frame cache {cache_path}: {e}")
+        return None
+    if cache.size != tuple(size):
+        print(f"Ignoring frame cache {cache_path}: built for {cache.size}, need {tuple(size)}")
+        cache.close()
+        return None
+    if os.path.exists(video_path) and file_hash(video_path) != cache.source_hash:
+        print(f"Frame cache {cache_path} is stale (video changed); rebuild with python code/frame_cache.py")
+        cache.close()
+        return None
+    return cache
+
+
+if __name__ == '__main__':
+    fps = None
+    if '--fps' in sys.argv:
+        fps = float(sys.argv[sys.argv.index('--fps') + 1])
+    pygame.init()
+    print(f"Transcoding {VIDEO_PATH} to {CACHE_PATH} at {DISPLAY_SIZE[0]}x{DISPLAY_SIZE[1]}...")
+    count = build_frame_cache(fps=fps)
+    print(f"Wrote {count} frames ({os.path.getsize(CACHE_PATH) / (1 << 20):.1f} MiB)")
@@ -0,0 +1,124 @@
+"""
+Incremental message framing shared by the game server and NetworkClient.
+
+TCP delivers a byte stream, not messages: one recv can hold several messages
+or only part of one. FrameDecoder keeps a persistent receive buffer and hands
+back complete frames as they arrive. Two framings can be mixed on one stream:
+
+- text frames: a JSON document terminated by a newline (the original protocol)
+- length-prefixed frames: FRAME_MARKER, a 4-byte big-endian length, then the payload
+
+FRAME_MARKER can never start a UTF-8 JSON document, so the decoder tells the
+two apart by the first byte of each frame.
+"""
+
+import json
+import struct
+
+TEXT = 'text'
+PREFIXED = 'prefixed'
+
+FRAME_MARKER = 0xB1  # A UTF-8 continuation byte, never the first byte of a text frame
+FRAME_HEADER = struct.Struct('!BI')  # marker, payload length
+MAX_FRAME_SIZE = 64 * 1024  # Larger frames mean a corrupt or hostile stream
+RECV_SIZE = 4096
+COMPACT_THRESHOLD = 16 * 1024  # Consumed bytes kept before the buffer is shifted
+
+
+class FrameError(ValueError):
+    """The stream can't be framed (oversized frame); the connection should be dropped"""
+
+
+def text_frame(payload):
+    """Frame bytes as a newline-terminated text frame"""
+    return payload + b'\n'
+
+
+def prefixed_frame(payload):
+    """Frame bytes as a length-prefixed frame"""
+    return FRAME_HEADER.pack(FRAME_MARKER, len(payload)) + payload
+
+
+def encode_json(message):
+    """Encode a message dict as a JSON text frame"""
+    return text_frame(json.dumps(message).encode('utf-8'))
+
+
+class FrameDecoder:
+    """Splits a byte stream into frames, keeping partial frames between reads"""
+
+    def __init__(self, max_frame_size=MAX_FRAME_SIZE):
+        self.max_frame_size = max_frame_size
+        self.buffer = bytearray()
+        self.start = 0  # Offset of the first unconsumed byte in buffer
+
+        # Reused by read_from so each recv doesn't allocate a new bytes object
+        self.chunk = bytearray(RECV_SIZE)
+        self.chunk_view = memoryview(self.chunk)
+
+    def feed(self, data):
+        """Add received bytes; returns a list of complete (kind, payload) frames"""
+        self.buffer += data
+        return self.drain()
+
+    def read_from(self, sock):
+        """recv from a blocking socket into the buffer.
+
+        Returns the list of complete frames, or None when the peer closed the connection.
+        """
+        received = sock.recv_into(self.chunk)
+        if not received:
+            return None
+        self.buffer += self.chunk_view[:received]
+        return self.drain()
+
+    def drain(self):
+        """Pull every complete frame out of the buffer"""
+        frames = []
+        buffer = self.buffer
+        view = memoryview(buffer)
+        try:
+            while self.start < len(buffer):
+                if buffer[self.start] == FRAME_MARKER:
+                    if len(buffer) - self.start < FRAME_HEADER.size:
+                        break
+                    _, length = FRAME_HEADER.unpack_from(buffer, self.start)
+                    if length > self.max_frame_size:
+                        raise FrameError(f"frame of {length} bytes exceeds {self.max_frame_size}")
+                    end = self.start + FRAME_HEADER.size + length
+                    if end > len(buffer):
+                        break
+                    frames.append((PREFIXED, bytes(view[self.start + FRAME_HEADER.size:end])))
+                    self.start = end
+                else:
+                    end = buffer.find(b'\n', self.start)
+                    if end < 0:
+                        if len(buffer) - self.start > self.max_frame_size:
+                            raise FrameError(f"text frame exceeds {self.max_frame_size} bytes")
+                        break
+                    line = bytes(view[self.start:end])
+                    self.start = end + 1
+                    if line.strip():
+                        frames.append((TEXT, line))
+        finally:
+            view.release()  # A bytearray can't be resized while a view is exported
+
+        self.compact()
+        return frames
+
+    def compact(self):
+        """Drop consumed bytes once they are all consumed or enough have piled up"""
+        if self.start == len(self.buffer):
+            self.buffer.clear()
+            self.start = 0
+        elif self.start >= COMPACT_THRESHOLD:
+            del self.buffer[:self.start]
+            self.start = 0
+
+
+def decode_json(payload):
+    """Decode a text frame; returns None if it isn't valid JSON"""
+    try:
+        return json.loads(payload)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        return None
@@ -3,25 +3,44 @@ import math
 from settings import *
 from support import *
 from monster import Monster
-from ui import BattleUI
-from battle_engine import BattleEngine
+from ui import BattleUI, battle_asset_requests
+from battle_engine import BattleEngine, AIController
+from battle_mcts import MCTSController
+from replay_log import ReplayLog, new_seed
+from dirty_rects import DirtyRectRenderer
 from selection_screen import SelectionScreen  # Add this import
 
 class LoadingScreen:
-    def __init__(self, player1_monster, player2_monster):
+    def __init__(self, player1_monster, player2_monster, loader=None):
         self.player1_monster = player1_monster
         self.player2_monster = player2_monster
+        self.loader = loader  # AssetLoader decoding the battle assets meanwhile (None = nothing to wait for)
         self.alpha = 0
         self.fade_speed = 2
         self.music_playing = False
         self.timer = 0
-        self.duration = 3000  # 3 seconds
+        self.duration = 3000  # 3 seconds minimum, longer if loading isn't finished
+        self.clock = pygame.time.Clock()
+        self.font = pygame.font.Font(None, 48)
+
+        # Scale the fading monster sprites once
+        scale = 0.8
+        p1_img = self.player1_monster.back_sprite
+        p2_img = self.player2_monster.front_sprite
+        self.p1_scaled = pygame.transform.smoothscale(p1_img, (int(p1_img.get_width() * scale), int(p1_img.get_height() * scale)))
+        self.p2_scaled = pygame.transform.smoothscale(p2_img, (int(p2_img.get_width() * scale), int(p2_img.get_height() * scale)))
+        self.p1_rect = self.p1_scaled.get_rect(center=(WINDOW_WIDTH // 4, WINDOW_HEIGHT // 2))
+        self.p2_rect = self.p2_scaled.get_rect(center=(3 * WINDOW_WIDTH // 4, WINDOW_HEIGHT // 2))
+
         # Load audio
         try:
             pygame.mixer.music.load('audio/halloween-spooky-music-413648.mp3')
         except Exception as e:
             print(f"Could not load loading music: {e}")
 
+    def loading_done(self):
+        return self.loader is None or self.loader.done
+
     def run(self, surface):
         # Start music if not playing
         if not self.music_playing:
@@ -32,7 +51,7 @@ class LoadingScreen:
                 print(f"Could not play loading music: {e}")
 
         # Update timer
-        self.timer += 16  # Approximate 60 FPS
+        self.timer += self.clock.tick(60)
 
         # Fade in/out effect
         self.alpha += self.fade_speed
@@ -45,38 +64,27 @@ class LoadingScreen:
         surface.fill((0, 0, 0))
 
         # Draw fading monster sprites
-        p1_img = self.player1_monster.back_sprite
-        p2_img = self.player2_monster.front_sprite
-
-        # Scale and position
-        scale = 0.8
-        p1_scaled = pygame.transform.smoothscale(p1_img, (int(p1_img.get_width() * scale), int(p1_img.get_height() * scale)))
-        p2_scaled = pygame.transform.smoothscale(p2_img, (int(p2_img.get_width() * scale), int(p2_img.get_height() * scale)))
-
-        p1_rect = p1_scaled.get_rect(center=(WINDOW_WIDTH // 4, WINDOW_HEIGHT // 2))
-        p2_rect = p2_scaled.get_rect(center=(3 * WINDOW_WIDTH // 4, WINDOW_HEIGHT // 2))
-
-        # Apply alpha
-        p1_surf = pygame.Surface(p1_scaled.get_size(), pygame.SRCALPHA)
-        p1_surf.blit(p1_scaled, (0, 0))
-        p1_surf.set_alpha(self.alpha)
-        surface.blit(p1_surf, p1_rect)
-
-        p2_surf = pygame.Surface(p2_scaled.get_size(), pygame.SRCALPHA)
-        p2_surf.blit(p2_scaled, (0, 0))
-        p2_surf.set_alpha(self.alpha)
-        surface.blit(p2_surf, p2_rect)
-
-        # Draw loading text
-        font = pygame.font.Font(None, 48)
-        text = font.render("Loading Battle...", True, (255, 255, 255))
+        self.p1_scaled.set_alpha(self.alpha)
+        self.p2_scaled.set_alpha(self.alpha)
+        surface.blit(self.p1_scaled, self.p1_rect)
+        surface.blit(self.p2_scaled, self.p2_rect)
+
+        # Draw loading text and the real loading progress (images the workers decoded are converted here)
+        if self.loader:
+            self.loader.poll()
+        progress = self.loader.progress if self.loader else 1.0
+        text = render_text(self.font, f"Loading Battle... {int(progress * 100)}%", (255, 255, 255))
         text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT - 100))
         surface.blit(text, text_rect)
+        bar_rect = pygame.Rect(0, 0, 400, 12)
+        bar_rect.midtop = (WINDOW_WIDTH // 2, text_rect.bottom + 12)
+        pygame.draw.rect(surface, (60, 40, 30), bar_rect, border_radius=6)
+        pygame.draw.rect(surface, (255, 140, 0), (bar_rect.x, bar_rect.y, int(bar_rect.width * progress), bar_rect.height), border_radius=6)
 
         pygame.display.update()
 
-        # Check if duration has passed
-        if self.timer >= self.duration:
+        # Check if duration has passed and everything is loaded
+        if self.timer >= self.duration and self.loading_done():
             pygame.mixer.music.stop()
             return True
 
@@ -85,8 +93,8 @@ class LoadingScreen:
             if event.type == pygame.QUIT:
                 return False
             if event.type == pygame.KEYDOWN and event.key == pygame.K_SPACE:
-                pygame.mixer.music.stop()
-                return True
+                # Skip the rest of the animation, but not the loading
+                self.timer = self.duration
 
         return None  # Continue loading
 
@@ -110,6 +118,12 @@ class Game:
         self.display_surface = pygame.display.set_mode((WINDOW_WIDTH, WINDOW_HEIGHT))
         pygame.display.set_caption('Monster Battle')
         self.clock = pygame.time.Clock()
+        self.renderer = DirtyRectRenderer()
+        self.ai = None  # Computer plays player 2
+        if PLAYER2_AI:
+            self.ai = MCTSController() if AI_DIFFICULTY == 'hard' else AIController()
+        self.ai_move = None  # Future of the computer's move for the current turn
+        self.replays = ReplayLog() if REPLAY_LOGGING else None
         self.running = True
         self.battle_ended = False
         self.winner_name = None
@@ -121,8 +135,8 @@ class Game:
         self.player1_monster = Monster(player1_choice, (200, 470), is_player=True)
         self.player2_monster = Monster(player2_choice, (1000, 200), is_player=False)
 
-        # Run loading screen
-        loading = LoadingScreen(self.player1_monster, self.player2_monster)
+        # Run loading screen while the battle assets are decoded on worker threads
+        loading = LoadingScreen(self.player1_monster, self.player2_monster, AssetLoader(battle_asset_requests()))
         loading_result = None
         while loading_result is None:
             loading_result = loading.run(self.display_surface)
@@ -132,8 +146,8 @@ class Game:
 
         # Load background and floor
         try:
-            self.background = pygame.image.load('images/other/bg.png').convert()
-            self.floor = pygame.image.load('images/other/floor.png').convert_alpha()
+            self.background = load_image('images/other/bg.png', mode='opaque')
+            self.floor = load_image('images/other/floor.png')
         except Exception as e:
             print(f"Error loading background assets: {e}")
             self.background = None
@@ -149,10 +163,15 @@ class Game:
             self.all_sprites.add(self.monster_group)
 
             # Create UI with both players first
-            self.battle_ui = BattleUI(self.player1_monster, self.player2_monster)
+            # Every battle gets its own seed, shared by the UI effects and the engine's RNG
+            self.seed = new_seed()
+            self.battle_ui = BattleUI(self.player1_monster, self.player2_monster, seed=self.seed)
             
             # Create battle engine with both players and UI reference
-            self.battle_engine = BattleEngine(self.player1_monster, self.player2_monster, self.battle_ui)
+            self.battle_engine = BattleEngine(self.player1_monster, self.player2_monster, self.battle_ui,
+                                              seed=self.seed, replays=self.replays)
+            if self.ai is not None:
+                self.ai.prepare(self.player1_monster.name, self.player2_monster.name)
             # Position monsters relative to UI floor if available so they sit on the platforms
             try:
                 # Dynamic scaling and positioning for monsters
@@ -228,6 +247,16 @@ class Game:
 
         # Get moves from both players
         selected_action = self.battle_ui.handle_input(mouse_pos, mouse_click)
+        if self.ai is not None:
+            # The computer thinks while player 1 picks (off this thread for MCTS), without seeing their move;
+            # the turn starts once player 1 has locked in and the computer's move is ready
+            if self.ai_move is None:
+                self.ai_move = self.ai.request_move(self.player2_monster, self.player1_monster,
+                                                    self.battle_engine.turn_number, rng=self.battle_engine.rng)
+            selected_action = None
+            if self.battle_ui.player1_selection and self.ai_move.done():
+                selected_action = (self.battle_ui.player1_selection, self.ai_move.result())
+                self.ai_move = None
 
         if isinstance(selected_action, tuple):  # Only process when we have both moves
             player1_move, player2_move = selected_action
@@ -245,6 +274,7 @@ class Game:
         """Restart the game by running selection screen again"""
         # Stop any current music
         pygame.mixer.music.stop()
+        self.battle_engine.close()  # A battle left before it ended is logged as unfinished
         
         # Run selection screen again
         selection = SelectionScreen()
@@ -262,13 +292,14 @@ class Game:
         self.battle_ended = False
         self.winner_name = None
         self.game_state = 'selecting'
+        self.ai_move = None  # A move still being searched belongs to the old battle
 
         # Create new monsters
         self.player1_monster = Monster(player1_choice, (200, 470), is_player=True)
         self.player2_monster = Monster(player2_choice, (1000, 200), is_player=False)
 
-        # Run loading screen again
-        loading = LoadingScreen(self.player1_monster, self.player2_monster)
+        # Run loading screen again (assets still cached from the last battle load instantly)
+        loading = LoadingScreen(self.player1_monster, self.player2_monster, AssetLoader(battle_asset_requests()))
         loading_result = None
         while loading_result is None:
             loading_result = loading.run(self.display_surface)
@@ -283,8 +314,13 @@ class Game:
         self.all_sprites.add(self.monster_group)
 
         # Create new UI and battle engine
-        self.battle_ui = BattleUI(self.player1_monster, self.player2_monster)
-        self.battle_engine = BattleEngine(self.player1_monster, self.player2_monster, self.battle_ui)
+        self.seed = new_seed()
+        self.battle_ui = BattleUI(self.player1_monster, self.player2_monster, seed=self.seed)
+        self.battle_engine = BattleEngine(self.player1_monster, self.player2_monster, self.battle_ui,
+                                          seed=self.seed, replays=self.replays)
+        if self.ai is not None:
+            self.ai.prepare(self.player1_monster.name, self.player2_monster.name)
+        self.renderer.invalidate()
 
         # Position monsters again
         try:
@@ -331,6 +367,13 @@ class Game:
         # Stop any current music
         pygame.mixer.music.stop()
         
+        if getattr(self, 'battle_engine', None) is not None:
+            self.battle_engine.close()
+        if self.ai is not None:
+            self.ai.close()
+        if self.replays is not None:
+            self.replays.close()
+
         # Launch menu.py and exit current game
         menu_py = os.path.normpath(os.path.join(os.path.dirname(__file__), 'menu.py'))
         if os.path.exists(menu_py):
@@ -365,16 +408,35 @@ class Game:
             print(f"Battle ended! Player {player_num} wins!")
 
     def draw(self):
+        # Redraw only what changed since the last frame (whole frame when disabled)
+        self.track_dirty_regions()
+        self.renderer.render(self.display_surface, self.draw_scene)
+
+    def track_dirty_regions(self):
+        """Report everything that can change between frames to the renderer"""
+        animated_rects = self.battle_ui.animated_monster_rects(self.player1_monster, self.player2_monster)
+        for i, (monster, animated_rect) in enumerate(zip([self.player1_monster, self.player2_monster], animated_rects)):
+            self.renderer.track(('monster', i), animated_rect.union(monster.rect),
+                                (monster.image, self.battle_engine.get_monster_flash_state(monster)))
+        self.battle_ui.track_dirty_regions(self.renderer)
+        self.battle_engine.track_dirty_regions(self.renderer)
+        if self.battle_ended:
+            self.renderer.track('victory', self.renderer.screen_rect,
+                                (self.winner_name, self.battle_ui.play_again_button['hover'],
+                                 self.battle_ui.exit_button['hover']))
+
+    def draw_scene(self, surface):
+        """Draw the complete battle screen (possibly clipped to a dirty rect)"""
         # Draw everything through the battle UI
-        self.battle_ui.draw(self.display_surface, self.player1_monster, self.player2_monster)
+        self.battle_ui.draw(surface, self.player1_monster, self.player2_monster)
 
         # Draw floors first (so panels can align correctly)
         if self.battle_ui.floor:
-            self.display_surface.blit(self.battle_ui.floor, self.battle_ui.player1_floor_rect)
-            self.display_surface.blit(self.battle_ui.floor, self.battle_ui.player2_floor_rect)
+            surface.blit(self.battle_ui.floor, self.battle_ui.player1_floor_rect)
+            surface.blit(self.battle_ui.floor, self.battle_ui.player2_floor_rect)
 
         # Draw UI panels behind monsters
-        self.battle_ui.draw_panels(self.display_surface)
+        self.battle_ui.draw_panels(surface)
 
         # Draw monsters with flash effects
         for monster in [self.player1_monster, self.player2_monster]:
@@ -385,21 +447,19 @@ class Game:
                 flash_surface.fill((255, 0, 0, 80))  # Light red with low opacity
                 temp_monster_surface = monster.image.copy()
                 temp_monster_surface.blit(flash_surface, (0, 0), special_flags=pygame.BLEND_ADD)
-                self.display_surface.blit(temp_monster_surface, monster.rect)
+                surface.blit(temp_monster_surface, monster.rect)
             else:
-                self.display_surface.blit(monster.image, monster.rect)
+                surface.blit(monster.image, monster.rect)
 
         # Draw UI overlays (buttons, health bars) on top of monsters
-        self.battle_ui.draw_overlay(self.display_surface)
+        self.battle_ui.draw_overlay(surface)
         
         # Draw attack animations on top of everything
-        self.battle_engine.draw_animations(self.display_surface)
+        self.battle_engine.draw_animations(surface)
         
         # Draw victory message if battle ended
         if self.battle_ended:
             self.draw_victory_message()
-        
-        pygame.display.update()
 
 
 
@@ -438,6 +498,8 @@ class Game:
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
                     self.running = False
+                elif event.type in (pygame.WINDOWEXPOSED, pygame.VIDEOEXPOSE):
+                    self.renderer.invalidate()
 
             # Input
             self.handle_input()
@@ -448,6 +510,12 @@ class Game:
             # Draw
             self.draw()
 
+        if getattr(self, 'battle_engine', None) is not None:
+            self.battle_engine.close()
+        if self.ai is not None:
+            self.ai.close()
+        if self.replays is not None:
+            self.replays.close()
         pygame.quit()
 
 if __name__ == '__main__':
@@ -0,0 +1,185 @@
+"""
+Message encodings carried over the framing layer.
+
+Every message can travel as a JSON text frame. Clients that offer it in their
+player_join handshake also get a compact struct-packed binary encoding for the
+per-turn traffic (game_state, move_selection, battle_start), sent as
+length-prefixed frames. Monsters and moves are sent as indexes into the
+MONSTER_DATA/ABILITIES_DATA order, so both ends must share the same settings;
+the schema id in the handshake guards against mismatched builds.
+
+Decoding always yields the same dicts the JSON encoding produces, including
+string player ids in 'players', so game code never sees which encoding was used.
+"""
+
+import struct
+import zlib
+from settings import MONSTER_DATA, ABILITIES_DATA
+import framing
+
+JSON = 'json'
+BINARY = 'binary'
+
+MONSTER_NAMES = list(MONSTER_DATA)
+MOVE_NAMES = list(ABILITIES_DATA)
+MONSTER_INDEX = {name: index for index, name in enumerate(MONSTER_NAMES)}
+MOVE_INDEX = {name: index for index, name in enumerate(MOVE_NAMES)}
+SCHEMA_ID = zlib.crc32(('|'.join(MONSTER_NAMES) + '#' + '|'.join(MOVE_NAMES)).encode('utf-8'))
+
+# Binary message ids (first byte of every binary payload)
+GAME_STATE = 1
+MOVE_SELECTION = 2
+BATTLE_START = 3
+
+GAME_STATE_HEADER = struct.Struct('!BHIIB')  # id, turn, version, base version (0 = full snapshot), player count
+PLAYER_STATE = struct.Struct('!BB')  # player id, field mask; followed by the fields present
+BATTLE_START_HEADER = struct.Struct('!BB')  # id, player count
+PLAYER_START = struct.Struct('!BBHH')  # player id, monster index, health, max_health
+MOVE = struct.Struct('!BB')  # id, move index
+
+# game_state carries only changed fields; the mask says which ones follow
+# (health, max_health, burn_turns as !H, !H, !B) and holds the two booleans
+HEALTH_FIELD = 1
+MAX_HEALTH_FIELD = 2
+BURN_FIELD = 4
+SHIELD_FIELD = 8
+SPECIAL_USED_FIELD = 16
+SHIELD_ON = 32
+SPECIAL_USED_ON = 64
+UINT16 = struct.Struct('!H')
+UINT8 = struct.Struct('!B')
+
+
+def handshake_offer():
+    """Fields a client adds to player_join to offer the binary encoding"""
+    return {'encodings': [BINARY, JSON], 'schema': SCHEMA_ID}
+
+
+def negotiate(join_message):
+    """Pick the encoding for a client from its player_join message"""
+    if BINARY in join_message.get('encodings', ()) and join_message.get('schema') == SCHEMA_ID:
+        return BINARY
+    return JSON
+
+
+def encode_message(message, encoding=JSON):
+    """Frame a message dict for the wire using the connection's encoding"""
+    if encoding == BINARY:
+        payload = encode_binary(message)
+        if payload is not None:
+            return framing.prefixed_frame(payload)
+    return framing.encode_json(message)
+
+
+def decode_message(kind, payload):
+    """Turn a frame into a message dict, or None if it can't be decoded"""
+    if kind == framing.TEXT:
+        return framing.decode_json(payload)
+    return decode_binary(payload)
+
+
+def encode_binary(message):
+    """Pack a message, or return None if it has no binary form (send it as JSON instead)"""
+    msg_type = message.get('type')
+    try:
+        if msg_type == 'game_state':
+            players = message['players']
+            base = 0 if message.get('full') else message['base']
+            parts = [GAME_STATE_HEADER.pack(GAME_STATE, message['turn'], message['version'],
+                                            base, len(players))]
+            for pid, state in players.items():
+                parts.append(encode_player_state(int(pid), state))
+            return b''.join(parts)
+
+        if msg_type == 'move_selection':
+            return MOVE.pack(MOVE_SELECTION, MOVE_INDEX[message['move']])
+
+        if msg_type == 'battle_start':
+            players = message['players']
+            parts = [BATTLE_START_HEADER.pack(BATTLE_START, len(players))]
+            for pid, info in players.items():
+                parts.append(PLAYER_START.pack(int(pid), MONSTER_INDEX[info['monster']],
+                                               info['health'], info['max_health']))
+            return b''.join(parts)
+    except (KeyError, ValueError, struct.error):
+        pass  # Unknown name or out-of-range number: fall back to JSON
+    return None
+
+
+def encode_player_state(player_id, state):
+    """Pack whichever game_state fields are present for one player"""
+    mask = 0
+    values = []
+    if 'health' in state:
+        mask |= HEALTH_FIELD
+        values.append(UINT16.pack(state['health']))
+    if 'max_health' in state:
+        mask |= MAX_HEALTH_FIELD
+        values.append(UINT16.pack(state['max_health']))
+    if 'burn_turns' in state:
+        mask |= BURN_FIELD
+        values.append(UINT8.pack(state['burn_turns']))
+    if 'shield_active' in state:
+        mask |= SHIELD_FIELD | (SHIELD_ON if state['shield_active'] else 0)
+    if 'special_used' in state:
+        mask |= SPECIAL_USED_FIELD | (SPECIAL_USED_ON if state['special_used'] else 0)
+    return PLAYER_STATE.pack(player_id, mask) + b''.join(values)
+
+
+def decode_player_state(payload, offset):
+    """Unpack one player's game_state fields; returns (player_id, fields, next offset)"""
+    player_id, mask = PLAYER_STATE.unpack_from(payload, offset)
+    offset += PLAYER_STATE.size
+    state = {}
+    if mask & HEALTH_FIELD:
+        state['health'], = UINT16.unpack_from(payload, offset)
+        offset += UINT16.size
+    if mask & MAX_HEALTH_FIELD:
+        state['max_health'], = UINT16.unpack_from(payload, offset)
+        offset += UINT16.size
+    if mask & BURN_FIELD:
+        state['burn_turns'], = UINT8.unpack_from(payload, offset)
+        offset += UINT8.size
+    if mask & SHIELD_FIELD:
+        state['shield_active'] = bool(mask & SHIELD_ON)
+    if mask & SPECIAL_USED_FIELD:
+        state['special_used'] = bool(mask & SPECIAL_USED_ON)
+    return player_id, state, offset
+
+
+def decode_binary(payload):
+    """Unpack a binary payload into a message dict, or None if it is malformed"""
+    try:
+        msg_id = payload[0]
+        if msg_id == GAME_STATE:
+            _, turn, version, base, count = GAME_STATE_HEADER.unpack_from(payload)
+            offset = GAME_STATE_HEADER.size
+            players = {}
+            for _ in range(count):
+                pid, state, offset = decode_player_state(payload, offset)
+                players[str(pid)] = state
+            message = {'type': 'game_state', 'turn': turn, 'version': version, 'players': players}
+            if base:
+                message['base'] = base
+            else:
+                message['full'] = True
+            return message
+
+        if msg_id == MOVE_SELECTION:
+            _, move_index = MOVE.unpack(payload)
+            return {'type': 'move_selection', 'move': MOVE_NAMES[move_index]}
+
+        if msg_id == BATTLE_START:
+            _, count = BATTLE_START_HEADER.unpack_from(payload)
+            players = {}
+            for pid, monster_index, health, max_health in PLAYER_START.iter_unpack(
+                    payload[BATTLE_START_HEADER.size:BATTLE_START_HEADER.size + count * PLAYER_START.size]):
+                players[str(pid)] = {
+                    'monster': MONSTER_NAMES[monster_index],
+                    'health': health,
+                    'max_health': max_health
+                }
+            return {'type': 'battle_start', 'players': players}
+    except (IndexError, struct.error):
+        pass
+    return None
@@ -0,0 +1,180 @@
+"""
+Asyncio front end for GameServer.
+
+Runs every connection on one selector-based event loop instead of a thread per
+socket, so a single process can keep thousands of idle connections open. The
+message protocol, matchmaking and all game logic are inherited unchanged from
+GameServer and BattleRoom; only accepting, reading and writing sockets differ. The threaded server in
+network_server.py stays available as a fallback (python network_server.py --threaded).
+"""
+
+import asyncio
+import time
+import framing
+import message_codec
+import send_queue
+from network_server import GameServer, MAX_ROOMS
+
+LISTEN_BACKLOG = 512  # Pending connections the OS queues before accept
+IDLE_PING_SECONDS = 60  # Same idle period as the threaded server's recv timeout
+HEARTBEAT_INTERVAL = 15
+
+
+class TransportSocket:
+    """Socket-like wrapper around an asyncio transport so BattleRoom.send_to_player works unchanged.
+
+    Frames sent during one pass of the event loop are joined into a single
+    transport write, and a client whose unsent data passes
+    send_queue.MAX_PENDING_BYTES is dropped.
+    """
+
+    def __init__(self, transport, max_pending=send_queue.MAX_PENDING_BYTES):
+        self.transport = transport
+        self.max_pending = max_pending
+        self.pending = []
+        self.pending_bytes = 0
+
+    def send(self, data):
+        if self.transport.is_closing():
+            raise BrokenPipeError("connection is closed")
+        if self.transport.get_write_buffer_size() + self.pending_bytes + len(data) > self.max_pending:
+            self.transport.abort()
+            raise send_queue.SendQueueFull("client is not reading its messages")
+        if not self.pending:
+            asyncio.get_running_loop().call_soon(self.flush)
+        self.pending.append(data)
+        self.pending_bytes += len(data)
+        return len(data)
+
+    sendall = send
+
+    def flush(self):
+        """Hand everything queued since the last flush to the transport in one write"""
+        if self.pending and not self.transport.is_closing():
+            # transport.write never blocks; asyncio buffers whatever the kernel doesn't take yet
+            self.transport.write(b''.join(self.pending))
+        self.pending.clear()
+        self.pending_bytes = 0
+
+    def close(self):
+        self.flush()
+        self.transport.close()
+
+
+class ClientProtocol(asyncio.Protocol):
+    """One connected client: decodes framed messages and hands them to the server"""
+
+    def __init__(self, server):
+        self.server = server
+        self.room = None
+        self.player_id = None
+        self.socket = None
+        self.address = None
+        self.decoder = framing.FrameDecoder()
+        self.last_activity = time.monotonic()
+
+    def connection_made(self, transport):
+        self.socket = TransportSocket(transport)
+        self.address = transport.get_extra_info('peername')
+        self.server.connections.add(self)
+
+    def data_received(self, data):
+        self.last_activity = time.monotonic()
+        try:
+            frames = self.decoder.feed(data)
+        except framing.FrameError as e:
+            print(f"{self.describe()} sent a bad frame: {e}")
+            self.socket.close()
+            return
+        for kind, payload in frames:
+            message = message_codec.decode_message(kind, payload)
+            if message is None:
+                print(f"{self.describe()} sent an invalid message: {payload!r}")
+                continue
+            if self.room is None:
+                # Nothing but the handshake is accepted before matchmaking
+                if message.get('type') != 'player_join':
+                    continue
+                seat = self.server.accept_player(self.socket, self.address,
+                                                 message_codec.negotiate(message),
+                                                 message.get('session'))
+                if seat is None:
+                    self.socket.close()
+                    return
+                self.room, self.player_id = seat
+            self.server.process_message(self.room, self.player_id, message)
+
+    def describe(self):
+        """Log prefix for this connection"""
+        if self.room is None:
+            return f"Client {self.address[0]}:{self.address[1]}"
+        return f"{self.room.tag} Player {self.player_id}"
+
+    def connection_lost(self, exc):
+        self.server.connections.discard(self)
+        if self.room is None:
+            return
+        # Only drop the player if this connection still owns the seat
+        player = self.room.players.get(self.player_id)
+        if player is not None and player['socket'] is self.socket:
+            self.server.disconnect_player(self.room, self.player_id)
+
+
+class AsyncGameServer(GameServer):
+    """GameServer whose sockets are driven by an asyncio event loop"""
+
+    def __init__(self, host='0.0.0.0', port=12345, max_rooms=MAX_ROOMS):
+        super().__init__(host, port, max_rooms)
+        self.connections = set()  # Open ClientProtocols
+        self.loop = None
+        self.server = None
+
+    def start(self):
+        """Start the server and run the event loop until stopped"""
+        try:
+            asyncio.run(self.serve())
+        except Exception as e:
+            print(f"❌ Server error: {e}")
+        finally:
+            self.cleanup()
+
+    async def serve(self):
+        """Accept connections and run the idle heartbeat"""
+        self.loop = asyncio.get_running_loop()
+        self.socket.bind((self.host, self.port))
+        self.socket.setblocking(False)
+        self.server = await self.loop.create_server(
+            lambda: ClientProtocol(self), sock=self.socket, backlog=LISTEN_BACKLOG)
+
+        print("=" * 50)
+        print(f"🚀 Monster Battle Server Started! (asyncio)")
+        print(f"🌐 Listening on: {self.host}:{self.port}")
+        print(f"🏠 Local IP: {self.local_ip}:{self.port}")
+        print("=" * 50)
+        print("⏳ Waiting for players to connect...")
+
+        async with self.server:
+            while self.running:
+                await asyncio.sleep(HEARTBEAT_INTERVAL)
+                self.ping_idle_connections()
+
+    def ping_idle_connections(self):
+        """Ping clients that have been silent for a while, like the threaded recv timeout"""
+        now = time.monotonic()
+        for connection in list(self.connections):
+            if connection.socket.transport.is_closing():
+                continue  # connection_lost will drop it
+            if now - connection.last_activity >= IDLE_PING_SECONDS:
+                connection.last_activity = now
+                try:
+                    connection.socket.send(framing.encode_json({'type': 'ping'}))
+                except (OSError, send_queue.SendQueueFull) as e:
+                    # One dead or stalled client must not take the event loop (and every room) down
+                    print(f"{connection.describe()} ping failed: {e}")
+                    connection.socket.close()
+
+    def cleanup(self):
+        """Clean up server resources"""
+        if self.server is not None:
+            self.server.close()
+        super().cleanup()
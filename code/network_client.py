@@ -4,6 +4,11 @@ import json
 import time
 import pygame
 from settings import *
+import framing
+import message_codec
+
+RECONNECT_ATTEMPTS = 5  # Tries to resume a battle after the connection drops
+RECONNECT_DELAY = 2  # Seconds before each try
 
 class NetworkClient:
     def __init__(self, host='localhost', port=12345):
@@ -12,6 +17,11 @@ class NetworkClient:
         self.socket = None
         self.connected = False
         self.player_id = None
+        self.room_id = None
+        self.encoding = message_codec.JSON  # Switched when the server accepts the binary offer
+        self.session = None  # Sent again on reconnect to resume the same seat
+        self.closing = False  # Set by disconnect(); a connection dropped otherwise is resumed
+        self.reconnecting = False
         
         # Game state
         self.game_state = 'waiting'  # 'waiting', 'selection', 'battle', 'finished'
@@ -19,6 +29,7 @@ class NetworkClient:
         self.my_monster = None
         self.opponent_monster = None
         self.turn = 1
+        self.state_version = 0  # Last game_state version applied to self.players
         self.waiting_for_move = False
         
         # Message queue for main thread
@@ -31,6 +42,7 @@ class NetworkClient:
         
     def connect(self):
         """Connect to the game server"""
+        self.closing = False
         try:
             print(f"Attempting to connect to {self.host}:{self.port}...")
             
@@ -81,6 +93,9 @@ class NetworkClient:
             # Send initial handshake message immediately
             try:
                 handshake = {'type': 'player_join', 'timestamp': time.time()}
+                handshake.update(message_codec.handshake_offer())
+                if self.session:
+                    handshake['session'] = self.session
                 self.send_message(handshake)
                 print("Sent initial handshake to server")
             except Exception as e:
@@ -94,7 +109,7 @@ class NetworkClient:
             listen_thread.start()
             
             # Start heartbeat thread
-            self.heartbeat_thread = threading.Thread(target=self.heartbeat_worker)
+            self.heartbeat_thread = threading.Thread(target=self.heartbeat_worker, args=(self.socket,))
             self.heartbeat_thread.daemon = True
             self.heartbeat_thread.start()
             
@@ -120,7 +135,7 @@ class NetworkClient:
             
     def listen_for_messages(self):
         """Listen for messages from server"""
-        buffer = ""
+        decoder = framing.FrameDecoder()
         
         try:
             # Remove timeout for continuous listening
@@ -128,23 +143,18 @@ class NetworkClient:
             
             while self.connected:
                 try:
-                    data = self.socket.recv(1024).decode('utf-8')
-                    if not data:
+                    frames = decoder.read_from(self.socket)
+                    if frames is None:
                         print("Server closed connection")
                         break
                         
-                    buffer += data
-                    
-                    # Process complete messages (ending with newline)
-                    while '\n' in buffer:
-                        line, buffer = buffer.split('\n', 1)
-                        if line.strip():
-                            try:
-                                message = json.loads(line)
-                                with self.queue_lock:
-                                    self.message_queue.append(message)
-                            except json.JSONDecodeError:
-                                print(f"Invalid JSON received: {line}")
+                    for kind, payload in frames:
+                        message = message_codec.decode_message(kind, payload)
+                        if message is None:
+                            print(f"Invalid message received: {payload!r}")
+                            continue
+                        with self.queue_lock:
+                            self.message_queue.append(message)
                                 
                 except socket.timeout:
                     # This shouldn't happen since we removed timeout, but just in case
@@ -159,17 +169,45 @@ class NetworkClient:
         except Exception as e:
             print(f"Connection lost: {e}")
         finally:
+            # The server keeps a battle seat for a dropped player, so try to take it back
+            if not self.closing and self.session and self.game_state == 'battle' and self.reconnect():
+                return
             self.connected = False
             print("Disconnected from server")
             
-    def heartbeat_worker(self):
-        """Send periodic heartbeat to server"""
+    def reconnect(self):
+        """Open a new connection and resume the seat with the saved session.
+
+        The server answers a resumed seat with a full game_state snapshot, so
+        the delta version starts over. Returns True once reconnected.
+        """
+        self.reconnecting = True
+        try:
+            for attempt in range(1, RECONNECT_ATTEMPTS + 1):
+                print(f"Connection lost, reconnecting ({attempt}/{RECONNECT_ATTEMPTS})...")
+                time.sleep(RECONNECT_DELAY)
+                if self.closing:
+                    return False
+                try:
+                    self.socket.close()
+                except OSError:
+                    pass
+                self.encoding = message_codec.JSON  # The handshake goes out before the server picks again
+                self.state_version = 0
+                if self.connect():
+                    return True
+            return False
+        finally:
+            self.reconnecting = False
+            
+    def heartbeat_worker(self, sock):
+        """Send periodic heartbeat to server while sock is the open connection"""
         import time
         
-        while self.connected:
+        while self.connected and self.socket is sock:
             try:
                 time.sleep(30)  # Send heartbeat every 30 seconds
-                if self.connected:
+                if self.connected and self.socket is sock:
                     self.send_message({'type': 'ping'})
             except:
                 break
@@ -189,8 +227,11 @@ class NetworkClient:
         
         if msg_type == 'player_id':
             self.player_id = message.get('player_id')
+            self.room_id = message.get('room_id')
+            self.encoding = message.get('encoding', message_codec.JSON)
+            self.session = message.get('session')
             status = message.get('status', 'assigned')
-            print(f"✅ Assigned as Player {self.player_id} (status: {status})")
+            print(f"✅ Assigned as Player {self.player_id} in room {self.room_id} (status: {status})")
             
         elif msg_type == 'game_start':
             self.game_state = 'selection'
@@ -209,7 +250,20 @@ class NetworkClient:
             self.waiting_for_move = True
             
         elif msg_type == 'game_state':
-            self.players = message.get('players', {})
+            if message.get('full') or 'version' not in message:
+                self.players = message.get('players', {})
+            elif message.get('base') == self.state_version:
+                # Delta: only the fields that changed since the version we acknowledged
+                for pid, changes in message.get('players', {}).items():
+                    self.players.setdefault(pid, {}).update(changes)
+            else:
+                print("Game state out of sync, requesting a full snapshot")
+                self.send_message({'type': 'state_resync'})
+                return
+                
+            if 'version' in message:
+                self.state_version = message['version']
+                self.send_message({'type': 'state_ack', 'version': self.state_version})
             self.turn = message.get('turn', 1)
             self.waiting_for_move = True
             print(f"Turn {self.turn} - Select your move!")
@@ -228,6 +282,9 @@ class NetworkClient:
             disconnected_id = message.get('player_id')
             print(f"Player {disconnected_id} disconnected")
             
+        elif msg_type == 'player_reconnected':
+            print(f"Player {message.get('player_id')} reconnected")
+            
         elif msg_type == 'pong':
             pass  # Heartbeat response
             
@@ -254,11 +311,12 @@ class NetworkClient:
     def send_message(self, message):
         """Send message to server"""
         try:
-            data = json.dumps(message) + '\n'
-            self.socket.send(data.encode('utf-8'))
+            data = message_codec.encode_message(message, self.encoding)
+            self.socket.sendall(data)
         except Exception as e:
             print(f"Error sending message: {e}")
-            self.connected = False
+            if not self.reconnecting:
+                self.connected = False
             
     def get_my_health(self):
         """Get my current health"""
@@ -338,8 +396,14 @@ class NetworkClient:
         
     def disconnect(self):
         """Disconnect from server"""
+        self.closing = True
         self.connected = False
         if self.socket:
+            try:
+                # shutdown wakes the listener thread blocked in recv; close alone leaves the connection open
+                self.socket.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
             try:
                 self.socket.close()
             except:
@@ -2,6 +2,7 @@ import pygame
 import sys
 import socket
 from settings import *
+from support import render_text
 from network_client import NetworkClient
 from selection_screen import SelectionScreen
 
@@ -202,7 +203,7 @@ class NetworkBattleUI:
             # Health fill
             pygame.draw.rect(self.display_surface, (0, 255, 0), (50, 50, int(bar_width * health_ratio), bar_height))
             # Text
-            text = self.small_font.render(f"You: {my_health}/{my_max_health}", True, (255, 255, 255))
+            text = render_text(self.small_font, f"You: {my_health}/{my_max_health}", (255, 255, 255))
             self.display_surface.blit(text, (50, 75))
             
         # Opponent health bar
@@ -219,7 +220,7 @@ class NetworkBattleUI:
             # Health fill
             pygame.draw.rect(self.display_surface, (255, 0, 0), (WINDOW_WIDTH - 250, 50, int(bar_width * health_ratio), bar_height))
             # Text
-            text = self.small_font.render(f"Opponent: {opp_health}/{opp_max_health}", True, (255, 255, 255))
+            text = render_text(self.small_font, f"Opponent: {opp_health}/{opp_max_health}", (255, 255, 255))
             self.display_surface.blit(text, (WINDOW_WIDTH - 250, 75))
             
     def draw_status_effects(self):
@@ -231,23 +232,23 @@ class NetworkBattleUI:
         
         # My status effects
         if my_status['shield_active']:
-            text = self.small_font.render("🛡️ SHIELD", True, (0, 255, 255))
+            text = render_text(self.small_font, "🛡️ SHIELD", (0, 255, 255))
             self.display_surface.blit(text, (50, y_offset))
             y_offset += 25
             
         if my_status['burn_turns'] > 0:
-            text = self.small_font.render(f"🔥 BURN ({my_status['burn_turns']})", True, (255, 100, 0))
+            text = render_text(self.small_font, f"🔥 BURN ({my_status['burn_turns']})", (255, 100, 0))
             self.display_surface.blit(text, (50, y_offset))
             
         # Opponent status effects
         y_offset = 100
         if opp_status['shield_active']:
-            text = self.small_font.render("🛡️ SHIELD", True, (0, 255, 255))
+            text = render_text(self.small_font, "🛡️ SHIELD", (0, 255, 255))
             self.display_surface.blit(text, (WINDOW_WIDTH - 250, y_offset))
             y_offset += 25
             
         if opp_status['burn_turns'] > 0:
-            text = self.small_font.render(f"🔥 BURN ({opp_status['burn_turns']})", True, (255, 100, 0))
+            text = render_text(self.small_font, f"🔥 BURN ({opp_status['burn_turns']})", (255, 100, 0))
             self.display_surface.blit(text, (WINDOW_WIDTH - 250, y_offset))
             
     def draw_move_buttons(self):
@@ -268,30 +269,30 @@ class NetworkBattleUI:
             
             # Button text
             text_color = (0, 0, 0) if button['is_special'] else (255, 255, 255)
-            text = self.small_font.render(button['move'], True, text_color)
+            text = render_text(self.small_font, button['move'], text_color)
             text_rect = text.get_rect(center=rect.center)
             self.display_surface.blit(text, text_rect)
             
     def draw_game_info(self):
         """Draw game information"""
         # Turn info
-        text = self.font.render(f"Turn {self.client.turn}", True, (255, 255, 255))
+        text = render_text(self.font, f"Turn {self.client.turn}", (255, 255, 255))
         self.display_surface.blit(text, (WINDOW_WIDTH // 2 - 50, 50))
         
         # Player info
         player_text = f"You are Player {self.client.player_id}"
-        text = self.small_font.render(player_text, True, (255, 255, 255))
+        text = render_text(self.small_font, player_text, (255, 255, 255))
         self.display_surface.blit(text, (WINDOW_WIDTH // 2 - 100, 100))
         
         # Waiting message
         if not self.client.waiting_for_move and self.client.game_state == 'battle':
-            text = self.font.render("Waiting for opponent...", True, (255, 255, 0))
+            text = render_text(self.font, "Waiting for opponent...", (255, 255, 0))
             text_rect = text.get_rect(center=(WINDOW_WIDTH // 2, WINDOW_HEIGHT // 2))
             self.display_surface.blit(text, text_rect)
             
         # Selected move
         if self.selected_move:
-            text = self.small_font.render(f"Selected: {self.selected_move}", True, (0, 255, 0))
+            text = render_text(self.small_font, f"Selected: {self.selected_move}", (0, 255, 0))
             self.display_surface.blit(text, (50, WINDOW_HEIGHT - 50))
 
 class NetworkGame:
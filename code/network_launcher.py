@@ -71,7 +71,12 @@ class NetworkLauncher:
             return "127.0.0.1"
             
     def start_server(self):
-        """Start the game server"""
+        """Start the game server, or reuse one already running on this machine"""
+        # One server process hosts any number of battle rooms
+        if self.check_server_running('localhost', 12345):
+            self.server_running = True
+            return True
+            
         try:
             import os
             # Get the absolute path to the network_server.py file
@@ -2,177 +2,130 @@ import socket
 import threading
 import json
 import time
+import secrets
+from collections import deque
 from settings import *
+import battle_rules
+import framing
+import message_codec
+import send_queue
+import replay_log
 
-class GameServer:
-    def __init__(self, host='0.0.0.0', port=12345):
-        self.host = host
-        self.port = port
-        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+MAX_ROOMS = 1000  # Concurrent battles one server process will host
+STATE_FIELDS = ('health', 'max_health', 'shield_active', 'burn_turns', 'special_used')
+
+class BattleRoom:
+    """One 2-player battle: its players, selected moves and turn state"""
+    
+    def __init__(self, room_id, server):
+        self.room_id = room_id
+        self.server = server
+        self.tag = f"[Room {room_id}]"
         
         # Game state
-        self.players = {}  # {player_id: {'socket': socket, 'monster': None, 'ready': False}}
+        self.players = {}  # {player_id: {'socket': socket, 'monster': None, 'ready': False, 'fighter': None}}
         self.game_state = 'waiting'  # 'waiting', 'selection', 'battle', 'finished'
         self.current_turn = 1
         self.moves = {}  # {player_id: move_name}
-        self.running = True
+        self.seed = None  # RNG seed of the battle, logged with it
+        self.battle_id = None  # Replay log id of the battle
         
-        # Get and display local IP
-        self.local_ip = self.get_local_ip()
-        print(f"Server starting on {host}:{port}")
-        print(f"Local IP address: {self.local_ip}")
-        print(f"Other devices can connect using: {self.local_ip}:{port}")
+        # Versioned game_state: each player is sent changes since the version it acknowledged
+        self.state_version = 0
+        self.state_turn = 0
+        self.snapshot = None  # {player_id: {field: value}} for state_version
         
-    def get_local_ip(self):
-        """Get the local IP address"""
-        try:
-            # Connect to a remote address to determine local IP
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            s.connect(("8.8.8.8", 80))
-            local_ip = s.getsockname()[0]
-            s.close()
-            return local_ip
-        except:
-            return "127.0.0.1"
+    def is_full(self):
+        return len(self.players) == 2
         
-    def start(self):
-        """Start the server"""
-        try:
-            self.socket.bind((self.host, self.port))
-            self.socket.listen(2)  # Only allow 2 players
-            print("=" * 50)
-            print(f"🚀 Monster Battle Server Started!")
-            print(f"🌐 Listening on: {self.host}:{self.port}")
-            print(f"🏠 Local IP: {self.local_ip}:{self.port}")
-            print("=" * 50)
-            print("📱 For other devices to connect, use:")
-            print(f"   IP Address: {self.local_ip}")
-            print(f"   Port: {self.port}")
-            print("=" * 50)
-            print("⏳ Waiting for players to connect...")
-            
-            while self.running and len(self.players) < 2:
-                try:
-                    client_socket, address = self.socket.accept()
-                    
-                    # Assign player ID based on current players
-                    available_ids = [1, 2]
-                    for existing_id in self.players.keys():
-                        if existing_id in available_ids:
-                            available_ids.remove(existing_id)
-                    
-                    if not available_ids:
-                        print(f"⚠️ Connection from {address[0]}:{address[1]} rejected - server full")
-                        client_socket.close()
-                        continue
-                    
-                    player_id = available_ids[0]
-                    
-                    # Set socket options immediately
-                    client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
-                    client_socket.settimeout(None)  # Remove timeout for normal operation
-                    
-                    self.players[player_id] = {
-                        'socket': client_socket,
-                        'address': address,
-                        'monster': None,
-                        'ready': False,
-                        'health': 0,
-                        'max_health': 0,
-                        'shield_active': False,
-                        'burn_turns': 0,
-                        'special_used': False
-                    }
-                    
-                    print(f"🎮 Player {player_id} connected from {address[0]}:{address[1]}")
-                    
-                    # Send player ID immediately
-                    welcome_msg = {
-                        'type': 'player_id',
-                        'player_id': player_id,
-                        'status': 'connected'
-                    }
-                    
-                    if self.send_to_player(player_id, welcome_msg):
-                        print(f"✅ Sent welcome message to Player {player_id}")
-                        
-                        # Start thread to handle this client AFTER successful welcome
-                        thread = threading.Thread(target=self.handle_client, args=(player_id,))
-                        thread.daemon = True
-                        thread.start()
-                        
-                        if len(self.players) == 2:
-                            print("🎯 Both players connected! Starting game...")
-                            self.game_state = 'selection'
-                            self.broadcast({
-                                'type': 'game_start',
-                                'message': 'Both players connected! Select your monsters.'
-                            })
-                    else:
-                        print(f"❌ Failed to send welcome to Player {player_id}, disconnecting")
-                        self.disconnect_player(player_id)
-                        
-                except Exception as e:
-                    print(f"❌ Error accepting connection: {e}")
-                    
-        except Exception as e:
-            print(f"❌ Server error: {e}")
-        finally:
-            self.cleanup()
-            
-    def handle_client(self, player_id):
-        """Handle messages from a specific client"""
-        client_socket = self.players[player_id]['socket']
+    def add_player(self, client_socket, address, encoding=message_codec.JSON):
+        """Seat a new connection in this room and welcome it. Returns the player ID, or None if rejected"""
+        # Assign player ID based on current players
+        available_ids = [1, 2]
+        for existing_id in self.players.keys():
+            if existing_id in available_ids:
+                available_ids.remove(existing_id)
         
-        try:
-            # Set socket options for better connection stability
-            client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
-            
-            while self.running:
-                try:
-                    # Use a reasonable timeout to detect disconnections
-                    client_socket.settimeout(60)  # 60 second timeout
-                    data = client_socket.recv(1024).decode('utf-8')
-                    
-                    if not data:
-                        print(f"Player {player_id} disconnected (no data)")
-                        break
-                        
-                    try:
-                        message = json.loads(data)
-                        self.process_message(player_id, message)
-                    except json.JSONDecodeError:
-                        print(f"Invalid JSON from player {player_id}: {data}")
-                        
-                except socket.timeout:
-                    # Check if client is still connected with a ping
-                    try:
-                        client_socket.send(b'{"type":"ping"}\n')
-                        print(f"Sent ping to player {player_id}")
-                    except:
-                        print(f"Player {player_id} timed out and is unreachable")
-                        break
-                        
-                except ConnectionResetError:
-                    print(f"Player {player_id} connection was reset")
-                    break
-                except ConnectionAbortedError:
-                    print(f"Player {player_id} connection was aborted")
-                    break
-                    
-        except Exception as e:
-            print(f"Error handling player {player_id}: {e}")
-        finally:
+        if not available_ids:
+            print(f"⚠️ {self.tag} Connection from {address[0]}:{address[1]} rejected - room full")
+            return None
+        
+        player_id = available_ids[0]
+        self.players[player_id] = {
+            'socket': client_socket,
+            'address': address,
+            'monster': None,
+            'ready': False,
+            'fighter': None,  # battle_rules.Fighter once a monster is picked
+            'encoding': encoding,  # Negotiated in the player_join handshake
+            'session': secrets.token_hex(8),  # Lets the client resume this seat after a disconnect
+            'acked_version': 0,
+            'acked_state': None,  # Snapshot the client confirmed; None means send a full snapshot
+            'pending': None  # (version, snapshot) sent but not acknowledged yet
+        }
+        
+        print(f"🎮 {self.tag} Player {player_id} connected from {address[0]}:{address[1]}")
+        
+        # Send player ID immediately
+        welcome_msg = {
+            'type': 'player_id',
+            'player_id': player_id,
+            'room_id': self.room_id,
+            'encoding': encoding,
+            'session': self.players[player_id]['session'],
+            'status': 'connected'
+        }
+        
+        if not self.send_to_player(player_id, welcome_msg):
+            print(f"❌ {self.tag} Failed to send welcome to Player {player_id}, disconnecting")
             self.disconnect_player(player_id)
+            return None
             
+        if self.is_full():
+            print(f"🎯 {self.tag} Both players connected! Starting game...")
+            self.game_state = 'selection'
+            self.broadcast({
+                'type': 'game_start',
+                'room_id': self.room_id,
+                'message': 'Both players connected! Select your monsters.'
+            })
+        return player_id
+        
+    def resume_player(self, player_id, client_socket, address, encoding=message_codec.JSON):
+        """Reattach a reconnecting client to its seat and resync it with a full snapshot"""
+        player = self.players[player_id]
+        player.update({
+            'socket': client_socket,
+            'address': address,
+            'encoding': encoding,
+            'acked_version': 0,
+            'acked_state': None,
+            'pending': None
+        })
+        print(f"🔄 {self.tag} Player {player_id} reconnected from {address[0]}:{address[1]}")
+        
+        self.send_to_player(player_id, {
+            'type': 'player_id',
+            'player_id': player_id,
+            'room_id': self.room_id,
+            'encoding': encoding,
+            'session': player['session'],
+            'status': 'resumed'
+        })
+        self.send_to_player(player_id, self.battle_info())
+        self.send_game_state_to(player_id)
+        
+        for pid in self.players:
+            if pid != player_id:
+                self.send_to_player(pid, {'type': 'player_reconnected', 'player_id': player_id})
+        
     def process_message(self, player_id, message):
         """Process incoming message from player"""
         msg_type = message.get('type')
         
         if msg_type == 'player_join':
             # Client is confirming connection
-            print(f"✅ Player {player_id} confirmed connection with handshake")
+            print(f"✅ {self.tag} Player {player_id} confirmed connection with handshake")
             
         elif msg_type == 'ping':
             # Respond to client ping
@@ -180,41 +133,53 @@ class GameServer:
             
         elif msg_type == 'pong':
             # Client responded to our ping
-            print(f"Player {player_id} responded to ping")
+            print(f"{self.tag} Player {player_id} responded to ping")
             
         elif msg_type == 'monster_selection':
             monster_name = message.get('monster')
             if monster_name in MONSTER_DATA:
                 self.players[player_id]['monster'] = monster_name
-                monster_data = MONSTER_DATA[monster_name]
-                self.players[player_id]['health'] = monster_data['health']
-                self.players[player_id]['max_health'] = monster_data['health']
+                self.players[player_id]['fighter'] = battle_rules.Fighter(monster_name)
                 self.players[player_id]['ready'] = True
                 
-                print(f"Player {player_id} selected {monster_name}")
+                print(f"{self.tag} Player {player_id} selected {monster_name}")
                 
                 # Check if both players have selected
-                if all(p['ready'] for p in self.players.values()):
+                if self.is_full() and all(p['ready'] for p in self.players.values()):
                     self.start_battle()
                     
         elif msg_type == 'move_selection':
             if self.game_state == 'battle':
                 move = message.get('move')
                 self.moves[player_id] = move
-                print(f"Player {player_id} selected move: {move}")
+                print(f"{self.tag} Player {player_id} selected move: {move}")
                 
                 # Check if both players have selected moves
                 if len(self.moves) == 2:
                     self.execute_turn()
                     
-        elif msg_type == 'ping':
-            self.send_to_player(player_id, {'type': 'pong'})
+        elif msg_type == 'state_ack':
+            self.ack_state(player_id, message.get('version'))
+            
+        elif msg_type == 'state_resync':
+            # Client lost track of the state version; start it over from a full snapshot
+            self.players[player_id]['acked_state'] = None
+            self.send_game_state_to(player_id)
             
     def start_battle(self):
         """Start the battle phase"""
         self.game_state = 'battle'
+        self.seed = replay_log.new_seed()
+        if self.server.replays is not None:
+            self.battle_id = self.server.replays.start_battle(
+                self.seed, self.players[1]['monster'], self.players[2]['monster'], replay_log.SERVER)
         
         # Send battle start info to both players
+        self.broadcast(self.battle_info())
+        print(f"{self.tag} Battle started!")
+        
+    def battle_info(self):
+        """battle_start message with both monsters and their current health"""
         battle_info = {
             'type': 'battle_start',
             'players': {}
@@ -223,54 +188,44 @@ class GameServer:
         for pid, player in self.players.items():
             battle_info['players'][pid] = {
                 'monster': player['monster'],
-                'health': player['health'],
-                'max_health': player['max_health']
+                'health': player['fighter'].health,
+                'max_health': player['fighter'].max_health
             }
-            
-        self.broadcast(battle_info)
-        print("Battle started!")
+        return battle_info
         
     def execute_turn(self):
         """Execute a turn with both players' moves"""
-        print(f"\n--- Turn {self.current_turn} ---")
+        print(f"\n{self.tag} --- Turn {self.current_turn} ---")
         
         # Apply burn damage first
         for pid, player in self.players.items():
-            if player['burn_turns'] > 0:
-                burn_damage = max(1, player['max_health'] // 10)
-                player['health'] -= burn_damage
-                player['burn_turns'] -= 1
-                print(f"Player {pid} takes {burn_damage} burn damage ({player['burn_turns']} turns left)")
+            fighter = player['fighter']
+            burn_damage = battle_rules.apply_burn(fighter)
+            if burn_damage:
+                print(f"{self.tag} Player {pid} takes {burn_damage} burn damage ({fighter.burn_turns} turns left)")
                 
-                if player['health'] <= 0:
-                    player['health'] = 0
+                if fighter.health <= 0:
+                    self.log_turn()
                     self.end_battle(3 - pid)  # Other player wins
                     return
         
-        # Determine turn order (alternating)
-        if self.current_turn % 2 == 1:
-            first_player, second_player = 1, 2
-        else:
-            first_player, second_player = 2, 1
-            
-        # Execute moves in order
-        for attacker_id in [first_player, second_player]:
+        # Execute moves in order (alternating first player)
+        for attacker_id in battle_rules.turn_order(self.current_turn):
             if attacker_id not in self.moves:
                 continue
                 
             defender_id = 3 - attacker_id  # 1->2, 2->1
-            move = self.moves[attacker_id]
-            
-            result = self.execute_move(attacker_id, defender_id, move)
+            self.execute_move(attacker_id, defender_id, self.moves[attacker_id])
             
-            # Check for winner
-            if self.players[defender_id]['health'] <= 0:
-                self.end_battle(attacker_id)
-                return
-            elif self.players[attacker_id]['health'] <= 0:  # Reflected damage
-                self.end_battle(defender_id)
+            # Check for winner (the attacker can faint from reflected damage)
+            winner = battle_rules.check_winner(self.players[1]['fighter'], self.players[2]['fighter'])
+            if winner:
+                self.log_turn()
+                self.end_battle(winner)
                 return
         
+        self.log_turn()
+        
         # Send updated game state
         self.send_game_state()
         
@@ -280,105 +235,94 @@ class GameServer:
         
     def execute_move(self, attacker_id, defender_id, move):
         """Execute a single move"""
-        if move not in ABILITIES_DATA:
-            return
+        attacker = self.players[attacker_id]['fighter']
+        defender = self.players[defender_id]['fighter']
+        outcome, amount = battle_rules.execute_move(attacker, defender, move)
+        
+        if outcome == battle_rules.INVALID:
+            print(f"{self.tag} Player {attacker_id} sent an invalid move: {move}")
+        elif outcome == battle_rules.SPENT:
+            print(f"{self.tag} Player {attacker_id} already used their special move!")
+        elif outcome == battle_rules.SHIELDED:
+            print(f"{self.tag} Player {attacker_id} activates Reflect Shield!")
+        elif outcome == battle_rules.HEALED:
+            print(f"{self.tag} Player {attacker_id} heals for {amount} HP!")
+        elif outcome == battle_rules.REFLECTED:
+            print(f"{self.tag} Player {defender_id}'s shield reflects {amount} damage!")
+        else:
+            print(f"{self.tag} Player {attacker_id} uses {move} for {amount} damage!")
             
-        move_data = ABILITIES_DATA[move]
-        attacker = self.players[attacker_id]
-        defender = self.players[defender_id]
-        
-        # Handle special moves
-        if move_data.get('type') == 'special':
-            if attacker['special_used']:
-                print(f"Player {attacker_id} already used their special move!")
-                return
-                
-            attacker['special_used'] = True
+        if move == 'burning_fury' and outcome in (battle_rules.HIT, battle_rules.REFLECTED):
+            print(f"{self.tag} Player {defender_id} is burned!")
+        return outcome
             
-            if move == 'reflect_shield':
-                attacker['shield_active'] = True
-                print(f"Player {attacker_id} activates Reflect Shield!")
-                
-            elif move == 'healing_wave':
-                heal_amount = abs(move_data['damage'])
-                old_health = attacker['health']
-                attacker['health'] = min(attacker['max_health'], attacker['health'] + heal_amount)
-                healed = attacker['health'] - old_health
-                print(f"Player {attacker_id} heals for {healed} HP!")
-                
-            elif move == 'burning_fury':
-                damage = self.calculate_damage(attacker_id, defender_id, move_data)
-                reflected = self.apply_damage(attacker_id, defender_id, damage)
-                defender['burn_turns'] = 2
-                print(f"Player {attacker_id} uses Burning Fury! Player {defender_id} is burned!")
-                
-        else:
-            # Regular move
-            damage = self.calculate_damage(attacker_id, defender_id, move_data)
-            reflected = self.apply_damage(attacker_id, defender_id, damage)
-            print(f"Player {attacker_id} uses {move} for {damage} damage!")
+    def log_turn(self):
+        """Append this turn's moves and resulting state to the server's replay log"""
+        if self.battle_id is None:
+            return
+        fighter1, fighter2 = self.players[1]['fighter'], self.players[2]['fighter']
+        self.server.replays.log_turn(self.battle_id, self.current_turn, self.moves.get(1), self.moves.get(2),
+                                     replay_log.state_hash(fighter1, fighter2, self.current_turn + 1))
             
-    def calculate_damage(self, attacker_id, defender_id, move_data):
+    def abandon_battle(self):
+        """Stop logging a battle torn down before it ended"""
+        if self.battle_id is not None:
+            self.server.replays.abandon_battle(self.battle_id)
+            self.battle_id = None
+            
+    def calculate_damage(self, attacker_id, defender_id, move):
         """Calculate damage with type effectiveness"""
-        attacker_monster = self.players[attacker_id]['monster']
-        defender_monster = self.players[defender_id]['monster']
-        
-        base_damage = move_data['damage']
-        move_element = move_data['element']
-        
-        # Get type effectiveness
-        attacker_element = MONSTER_DATA[attacker_monster]['element']
-        defender_element = MONSTER_DATA[defender_monster]['element']
-        
-        effectiveness = 1.0
-        if move_element in ELEMENT_DATA and defender_element in ELEMENT_DATA[move_element]:
-            effectiveness = ELEMENT_DATA[move_element][defender_element]
-        
-        # Get stats
-        attack_stat = MONSTER_DATA[attacker_monster]['attack']
-        defense_stat = MONSTER_DATA[defender_monster]['defense']
-        
-        # Calculate final damage
-        damage = int(base_damage * effectiveness * (attack_stat / defense_stat))
-        return max(1, damage)
-        
-    def apply_damage(self, attacker_id, defender_id, damage):
-        """Apply damage, handling shield reflection"""
-        defender = self.players[defender_id]
-        attacker = self.players[attacker_id]
-        
-        # Check shield
-        if defender['shield_active'] and damage > 0:
-            print(f"Player {defender_id}'s shield reflects {damage} damage!")
-            defender['shield_active'] = False
-            attacker['health'] -= damage
-            if attacker['health'] < 0:
-                attacker['health'] = 0
-            return True
-        else:
-            defender['health'] -= damage
-            if defender['health'] < 0:
-                defender['health'] = 0
-            return False
+        return battle_rules.calculate_damage(self.players[attacker_id]['monster'],
+                                             self.players[defender_id]['monster'], move)
             
     def send_game_state(self):
         """Send current game state to both players"""
+        self.state_version += 1
+        self.state_turn = self.current_turn
+        self.snapshot = {
+            pid: {field: getattr(player['fighter'], field) for field in STATE_FIELDS}
+            for pid, player in self.players.items()
+        }
+        
+        for pid in list(self.players.keys()):
+            self.send_game_state_to(pid)
+            
+    def send_game_state_to(self, player_id):
+        """Send the latest state to one player: a full snapshot, or only the
+        fields that changed since the version it last acknowledged"""
+        player = self.players.get(player_id)
+        if player is None or player['socket'] is None or self.snapshot is None:
+            return
+            
         state = {
             'type': 'game_state',
-            'turn': self.current_turn,
-            'players': {}
+            'turn': self.state_turn,
+            'version': self.state_version
         }
         
-        for pid, player in self.players.items():
-            state['players'][pid] = {
-                'health': player['health'],
-                'max_health': player['max_health'],
-                'shield_active': player['shield_active'],
-                'burn_turns': player['burn_turns'],
-                'special_used': player['special_used']
-            }
-            
-        self.broadcast(state)
+        acked_state = player['acked_state']
+        if acked_state is None:
+            state['full'] = True
+            state['players'] = self.snapshot
+        else:
+            state['base'] = player['acked_version']
+            state['players'] = {}
+            for pid, fields in self.snapshot.items():
+                old_fields = acked_state.get(pid, {})
+                changed = {field: value for field, value in fields.items() if old_fields.get(field) != value}
+                if changed:
+                    state['players'][pid] = changed
+                    
+        player['pending'] = (self.state_version, self.snapshot)
+        self.send_to_player(player_id, state)
+        
+    def ack_state(self, player_id, version):
+        """Record that a player applied a game_state version"""
+        player = self.players[player_id]
+        pending = player['pending']
+        if pending is not None and pending[0] == version:
+            player['acked_version'], player['acked_state'] = pending
+            player['pending'] = None
         
     def end_battle(self, winner_id):
         """End the battle"""
@@ -388,31 +332,49 @@ class GameServer:
             'winner': winner_id,
             'winner_monster': self.players[winner_id]['monster']
         })
-        print(f"Battle ended! Player {winner_id} wins!")
+        print(f"{self.tag} Battle ended! Player {winner_id} wins!")
+        if self.battle_id is not None:
+            self.server.replays.end_battle(self.battle_id, winner_id, self.current_turn)
+            self.battle_id = None
         
     def send_to_player(self, player_id, message):
         """Send message to specific player"""
         if player_id not in self.players:
-            print(f"Cannot send to player {player_id}: player not found")
+            print(f"{self.tag} Cannot send to player {player_id}: player not found")
             return False
-            
+        return self.send_data(player_id, message_codec.encode_message(message, self.players[player_id]['encoding']))
+        
+    def send_data(self, player_id, data):
+        """Send an already-encoded frame to a player"""
+        client_socket = self.players[player_id]['socket']
+        if client_socket is None:
+            return False  # Seat kept for a player who may reconnect
         try:
-            data = json.dumps(message) + '\n'
-            self.players[player_id]['socket'].send(data.encode('utf-8'))
+            client_socket.send(data)
             return True
+        except send_queue.SendQueueFull:
+            print(f"{self.tag} Player {player_id} stopped reading messages, disconnecting")
+            self.disconnect_player(player_id)
+            return False
         except (ConnectionResetError, ConnectionAbortedError, BrokenPipeError):
-            print(f"Player {player_id} connection lost while sending message")
+            print(f"{self.tag} Player {player_id} connection lost while sending message")
             self.disconnect_player(player_id)
             return False
         except Exception as e:
-            print(f"Error sending to player {player_id}: {e}")
+            print(f"{self.tag} Error sending to player {player_id}: {e}")
             return False
             
     def broadcast(self, message):
         """Send message to all connected players"""
         disconnected_players = []
-        for player_id in list(self.players.keys()):
-            if not self.send_to_player(player_id, message):
+        encoded = {}  # Encode once per encoding, not once per player
+        for player_id, player in list(self.players.items()):
+            if player['socket'] is None:
+                continue
+            encoding = player['encoding']
+            if encoding not in encoded:
+                encoded[encoding] = message_codec.encode_message(message, encoding)
+            if not self.send_data(player_id, encoded[encoding]):
                 disconnected_players.append(player_id)
         
         # Clean up disconnected players
@@ -422,13 +384,21 @@ class GameServer:
             
     def disconnect_player(self, player_id):
         """Handle player disconnection"""
-        if player_id in self.players:
-            print(f"Player {player_id} disconnected")
+        player = self.players.get(player_id)
+        if player is not None and player['socket'] is not None:
+            print(f"{self.tag} Player {player_id} disconnected")
             try:
-                self.players[player_id]['socket'].close()
+                player['socket'].close()
             except:
                 pass
-            del self.players[player_id]
+                
+            if self.game_state == 'battle':
+                # Keep the seat so the client can resume the battle with its session
+                player['socket'] = None
+                session = None
+            else:
+                del self.players[player_id]
+                session = player['session']
             
             # Notify other player
             if self.players:
@@ -437,23 +407,248 @@ class GameServer:
                     'player_id': player_id
                 })
                 
+            self.server.player_left(self, session)
+                
+class GameServer:
+    """Lobby that pairs incoming clients into independent BattleRooms"""
+    
+    def __init__(self, host='0.0.0.0', port=12345, max_rooms=MAX_ROOMS):
+        self.host = host
+        self.port = port
+        self.socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.socket.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        
+        # Rooms and matchmaking
+        self.rooms = {}  # {room_id: BattleRoom}
+        self.waiting_rooms = deque()  # Matchmaking queue: rooms with one player waiting for an opponent
+        self.next_room_id = 1
+        self.max_rooms = max_rooms
+        self.sessions = {}  # {session token: (room, player_id)} for resuming after a disconnect
+        self.lock = threading.RLock()  # Guards rooms and game state across client threads
+        self.replays = replay_log.ReplayLog(replay_log.SERVER_LOG) if SERVER_REPLAY_LOGGING else None
+        self.running = True
+        
+        # Get and display local IP
+        self.local_ip = self.get_local_ip()
+        print(f"Server starting on {host}:{port}")
+        print(f"Local IP address: {self.local_ip}")
+        print(f"Other devices can connect using: {self.local_ip}:{port}")
+        
+    def get_local_ip(self):
+        """Get the local IP address"""
+        try:
+            # Connect to a remote address to determine local IP
+            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            s.connect(("8.8.8.8", 80))
+            local_ip = s.getsockname()[0]
+            s.close()
+            return local_ip
+        except:
+            return "127.0.0.1"
+        
+    def start(self):
+        """Start the server"""
+        try:
+            self.socket.bind((self.host, self.port))
+            self.socket.listen(64)
+            print("=" * 50)
+            print(f"🚀 Monster Battle Server Started!")
+            print(f"🌐 Listening on: {self.host}:{self.port}")
+            print(f"🏠 Local IP: {self.local_ip}:{self.port}")
+            print("=" * 50)
+            print("📱 For other devices to connect, use:")
+            print(f"   IP Address: {self.local_ip}")
+            print(f"   Port: {self.port}")
+            print("=" * 50)
+            print("⏳ Waiting for players to connect...")
+            
+            while self.running:
+                try:
+                    client_socket, address = self.socket.accept()
+                    
+                    # Set socket options immediately
+                    client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+                    client_socket.settimeout(None)  # Remove timeout for normal operation
+                    
+                    # The client is seated in a room once its player_join handshake arrives
+                    thread = threading.Thread(target=self.handle_client, args=(client_socket, address))
+                    thread.daemon = True
+                    thread.start()
+                        
+                except Exception as e:
+                    print(f"❌ Error accepting connection: {e}")
+                    
+        except Exception as e:
+            print(f"❌ Server error: {e}")
+        finally:
+            self.cleanup()
+            
+    def accept_player(self, client_socket, address, encoding=message_codec.JSON, session=None):
+        """Seat a client that sent player_join in the oldest waiting room, or open a new one.
+
+        A client presenting the session of a seat it dropped from mid-battle gets
+        that seat back. Returns (room, player_id), or None if the connection was rejected.
+        """
+        with self.lock:
+            seat = self.sessions.get(session)
+            if seat is not None:
+                room, player_id = seat
+                if room.game_state == 'battle' and room.players[player_id]['socket'] is None:
+                    room.resume_player(player_id, client_socket, address, encoding)
+                    return room, player_id
+                    
+            if self.waiting_rooms:
+                room = self.waiting_rooms[0]
+            elif len(self.rooms) >= self.max_rooms:
+                print(f"⚠️ Connection from {address[0]}:{address[1]} rejected - server full")
+                return None
+            else:
+                room = BattleRoom(self.next_room_id, self)
+                self.next_room_id += 1
+                self.rooms[room.room_id] = room
+                self.waiting_rooms.append(room)
+                
+            player_id = room.add_player(client_socket, address, encoding)
+            if player_id is None:
+                return None
+            self.sessions[room.players[player_id]['session']] = (room, player_id)
+            if room.is_full() and room in self.waiting_rooms:
+                self.waiting_rooms.remove(room)
+            return room, player_id
+            
+    def process_message(self, room, player_id, message):
+        """Hand a client message to its room"""
+        with self.lock:
+            if room.players.get(player_id) is not None:
+                room.process_message(player_id, message)
+                
+    def disconnect_player(self, room, player_id):
+        """Drop a client from its room"""
+        with self.lock:
+            room.disconnect_player(player_id)
+            
+    def player_left(self, room, session=None):
+        """Called by a room after a player disconnects; session is the token of a seat it freed.
+
+        Rooms with nobody connected are closed; a player left alone before the
+        battle started goes back into the matchmaking queue.
+        """
+        with self.lock:
+            self.sessions.pop(session, None)
+            if all(player['socket'] is None for player in room.players.values()):
+                self.rooms.pop(room.room_id, None)
+                room.abandon_battle()
+                if room in self.waiting_rooms:
+                    self.waiting_rooms.remove(room)
+                for player in room.players.values():
+                    self.sessions.pop(player['session'], None)
+            elif room.game_state == 'selection':
+                room.game_state = 'waiting'
+                # The next opponent starts selection from scratch, so the remaining player picks again too
+                for player in room.players.values():
+                    player['monster'] = None
+                    player['fighter'] = None
+                    player['ready'] = False
+                self.waiting_rooms.append(room)
+                    
+    def handle_client(self, client_socket, address):
+        """Handle messages from a specific client"""
+        room = None
+        player_id = None
+        who = f"Client {address[0]}:{address[1]}"
+        
+        # All writes go through a queue drained by its own thread, so a slow
+        # client never blocks the thread resolving its room's turn
+        writer = send_queue.QueuedSocket(client_socket)
+        
+        try:
+            # Set socket options for better connection stability
+            client_socket.setsockopt(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)
+            
+            decoder = framing.FrameDecoder()
+            while self.running:
+                try:
+                    # Use a reasonable timeout to detect disconnections
+                    client_socket.settimeout(60)  # 60 second timeout
+                    frames = decoder.read_from(client_socket)
+                    
+                    if frames is None:
+                        print(f"{who} disconnected (no data)")
+                        break
+                        
+                    for kind, payload in frames:
+                        message = message_codec.decode_message(kind, payload)
+                        if message is None:
+                            print(f"{who} sent an invalid message: {payload!r}")
+                            continue
+                        if room is None:
+                            # Nothing but the handshake is accepted before matchmaking
+                            if message.get('type') != 'player_join':
+                                continue
+                            seat = self.accept_player(writer, address,
+                                                      message_codec.negotiate(message),
+                                                      message.get('session'))
+                            if seat is None:
+                                return
+                            room, player_id = seat
+                            who = f"{room.tag} Player {player_id}"
+                        self.process_message(room, player_id, message)
+                        
+                except socket.timeout:
+                    # Check if client is still connected with a ping
+                    try:
+                        writer.send(b'{"type":"ping"}\n')
+                        print(f"Sent ping to {who}")
+                    except:
+                        print(f"{who} timed out and is unreachable")
+                        break
+                        
+                except ConnectionResetError:
+                    print(f"{who} connection was reset")
+                    break
+                except ConnectionAbortedError:
+                    print(f"{who} connection was aborted")
+                    break
+                except framing.FrameError as e:
+                    print(f"{who} sent a bad frame: {e}")
+                    break
+                    
+        except Exception as e:
+            print(f"Error handling {who}: {e}")
+        finally:
+            if room is not None and room.players.get(player_id, {}).get('socket') is writer:
+                self.disconnect_player(room, player_id)
+            else:
+                writer.close()
+            
     def cleanup(self):
         """Clean up server resources"""
         self.running = False
-        for player in self.players.values():
-            try:
-                player['socket'].close()
-            except:
-                pass
+        with self.lock:
+            for room in list(self.rooms.values()):
+                room.abandon_battle()
+                for player in room.players.values():
+                    if player['socket'] is None:
+                        continue
+                    try:
+                        player['socket'].close()
+                    except:
+                        pass
         try:
             self.socket.close()
         except:
             pass
+        if self.replays is not None:
+            self.replays.close()
         print("Server shut down")
 
-def start_server():
-    """Start the game server"""
-    server = GameServer()
+def start_server(threaded=False):
+    """Start the game server (asyncio by default, thread-per-client as a fallback)"""
+    if threaded:
+        server = GameServer()
+    else:
+        from network_async_server import AsyncGameServer
+        server = AsyncGameServer()
     try:
         server.start()
     except KeyboardInterrupt:
@@ -461,4 +656,5 @@ def start_server():
         server.cleanup()
 
 if __name__ == '__main__':
-    start_server()
\ No newline at end of file
+    import sys
+    start_server(threaded='--threaded' in sys.argv)
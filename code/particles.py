@@ -0,0 +1,130 @@
+"""
+Pooled particle system shared by the menu campfire and the battle screen embers.
+
+Particles live in preallocated parallel arrays (struct-of-arrays) instead of a
+list of dicts: spawning writes into the next free slot, and a dead particle is
+removed by moving the last live one into its slot, so nothing is allocated or
+shifted per frame. Each particle draws one of a few sprite variants, and every
+variant is pre-rendered at ALPHA_LEVELS fade levels, so drawing is a single
+Surface.blits call with no per-particle Surface creation.
+"""
+
+import pygame
+from array import array
+
+ALPHA_LEVELS = 32  # Pre-rendered fade steps per sprite variant
+
+
+def circle_sprite(radius, color):
+    """Opaque filled circle, for use as a particle variant"""
+    surf = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(surf, color, (radius, radius), radius)
+    return surf
+
+
+def rect_sprite(width, height, color):
+    """Opaque filled rectangle, for use as a particle variant"""
+    surf = pygame.Surface((width, height), pygame.SRCALPHA)
+    surf.fill(color)
+    return surf
+
+
+class ParticleSystem:
+    """Fixed-capacity particle pool; a particle's alpha fades with its remaining life"""
+
+    def __init__(self, variants, capacity=4096, centered=False, bounds=None, alpha_levels=ALPHA_LEVELS):
+        self.capacity = capacity
+        self.count = 0
+        self.bounds = bounds  # Particles leaving this rect die (None = no bounds)
+        self.alpha_levels = alpha_levels
+
+        # One slot per particle in each array
+        self.x = array('f', bytes(4 * capacity))
+        self.y = array('f', bytes(4 * capacity))
+        self.vx = array('f', bytes(4 * capacity))
+        self.vy = array('f', bytes(4 * capacity))
+        self.life = array('f', bytes(4 * capacity))
+        self.fade = array('f', bytes(4 * capacity))  # alpha_levels / max_life, so level = int(life * fade)
+        self.variant = array('H', bytes(2 * capacity))
+
+        # sprites[variant][level]: the variant baked at alpha (level + 1) / alpha_levels;
+        # level alpha_levels (a particle at full life) repeats the opaque sprite
+        self.sprites = []
+        self.offsets = []
+        for base in variants:
+            levels = []
+            for level in range(alpha_levels):
+                sprite = base.copy()
+                alpha = round(255 * (level + 1) / alpha_levels)
+                sprite.fill((255, 255, 255, alpha), special_flags=pygame.BLEND_RGBA_MULT)
+                levels.append(sprite)
+            levels.append(levels[-1])
+            self.sprites.append(levels)
+            self.offsets.append((base.get_width() // 2, base.get_height() // 2) if centered else (0, 0))
+
+    def __len__(self):
+        return self.count
+
+    def emit(self, x, y, vx, vy, life, variant=0, max_life=None):
+        """Spawn a particle; returns False (and drops it) when the pool is full"""
+        i = self.count
+        if i >= self.capacity:
+            return False
+        ox, oy = self.offsets[variant]
+        self.x[i] = x - ox  # Positions are stored as the sprite's top left corner
+        self.y[i] = y - oy
+        self.vx[i] = vx
+        self.vy[i] = vy
+        self.life[i] = life
+        self.fade[i] = self.alpha_levels / (max_life or life)
+        self.variant[i] = variant
+        self.count = i + 1
+        return True
+
+    def clear(self):
+        self.count = 0
+
+    def update(self):
+        """Advance every particle one frame and swap-remove the dead ones"""
+        x, y, vx, vy, life = self.x, self.y, self.vx, self.vy, self.life
+        bounds = self.bounds
+        n = self.count
+        i = 0
+        while i < n:
+            remaining = life[i] - 1
+            px = x[i] + vx[i]
+            py = y[i] + vy[i]
+            if remaining <= 0 or (bounds is not None and not bounds.collidepoint(px, py)):
+                n -= 1
+                self.move(n, i)
+                continue  # Slot i now holds the former last particle
+            life[i] = remaining
+            x[i] = px
+            y[i] = py
+            i += 1
+        self.count = n
+
+    def move(self, src, dst):
+        """Copy the particle in slot src into slot dst"""
+        self.x[dst] = self.x[src]
+        self.y[dst] = self.y[src]
+        self.vx[dst] = self.vx[src]
+        self.vy[dst] = self.vy[src]
+        self.life[dst] = self.life[src]
+        self.fade[dst] = self.fade[src]
+        self.variant[dst] = self.variant[src]
+
+    def blit_list(self):
+        """(sprite, position) pairs for every live particle, ready for Surface.blits"""
+        n = self.count
+        sprites = self.sprites
+        return [(sprites[v][int(life * fade)], (int(x), int(y)))
+                for v, life, fade, x, y in zip(self.variant[:n], self.life[:n], self.fade[:n], self.x[:n], self.y[:n])]
+
+    def rects(self):
+        """(rect, fade level) of every live particle, for dirty rectangle tracking"""
+        return [(sprite.get_rect(topleft=pos), int(self.life[i] * self.fade[i]))
+                for i, (sprite, pos) in enumerate(self.blit_list())]
+
+    def draw(self, surface):
+        surface.blits(self.blit_list(), doreturn=False)
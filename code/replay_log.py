@@ -0,0 +1,247 @@
+"""
+Append-only replay logs of battles, and a headless replayer.
+
+Battle turns are deterministic given both moves, so a battle is fully described
+by its monsters and the moves played each turn. The local BattleEngine and the
+network BattleRoom both append compact binary records to a log:
+
+  start  battle id, RNG seed, source (local/server), wall clock time, both monster names
+  turn   battle id, turn number, both moves (as ability slots), hash of the state after the turn
+  end    battle id, winner, turns played
+
+Records are written with one unbuffered append each, so battles running side by
+side (server rooms, one process) can share a file, and a crash loses at most
+the record being written. Once a log grows past REPLAY_LOG_MAX_BYTES it is
+renamed to <log>.1 when the next battle starts, and a fresh log is begun. Each battle has its own seed for the randomness
+in it (AI choices, effects); the log keeps it so a battle can be set up again.
+
+The replayer re-simulates every logged battle with battle_rules and reports any
+turn whose state hash differs, which catches both engine bugs (the engine
+disagreeing with the rules) and rule changes that alter recorded games:
+  python code/replay_log.py [log ...] [--show BATTLE_ID]
+Logs are read in the order given (by default the rotated and current local and
+server logs), so a battle running across a rotation is replayed whole.
+"""
+
+import os
+import sys
+import time
+import zlib
+import struct
+import secrets
+import threading
+from settings import REPLAY_LOG_MAX_BYTES
+import battle_rules
+from battle_ai import state_of, pack_state
+
+MAGIC = b'MBRL'
+VERSION = 1
+FILE_HEADER = struct.Struct('<4sH')
+START = struct.Struct('<cQQBd16s16s')  # kind, battle id, seed, source, unix time, monster 1, monster 2
+TURN = struct.Struct('<cQHBBI')  # kind, battle id, turn, move 1, move 2, state hash
+END = struct.Struct('<cQBH')  # kind, battle id, winner, turns
+RECORDS = {b'S': START, b'T': TURN, b'E': END}
+
+LOCAL, SERVER = 0, 1  # Battle sources
+NO_MOVE = 255  # The player had no move this turn
+INVALID_MOVE = 254  # A move the monster doesn't have (only the server can receive one)
+
+BASE_DIR = os.path.dirname(__file__)
+REPLAY_DIR = os.path.normpath(os.path.join(BASE_DIR, '..', 'replays'))
+LOCAL_LOG = os.path.join(REPLAY_DIR, 'local.replay')
+SERVER_LOG = os.path.join(REPLAY_DIR, 'server.replay')
+
+
+def new_seed():
+    """Fresh random seed for a battle"""
+    return secrets.randbits(63)
+
+
+def state_hash(fighter1, fighter2, turn_number):
+    """32-bit hash of the battle state going into turn_number"""
+    return zlib.crc32(pack_state(state_of(fighter1, fighter2, turn_number)).to_bytes(8, 'little'))
+
+
+def encode_move(name, move):
+    if move is None:
+        return NO_MOVE
+    abilities = battle_rules.abilities_for(name)
+    return abilities.index(move) if move in abilities else INVALID_MOVE
+
+
+def decode_move(name, slot):
+    """Ability name for a logged slot; None for no move or an invalid one (neither has any effect)"""
+    abilities = battle_rules.abilities_for(name)
+    return abilities[slot] if slot < len(abilities) else None
+
+
+class ReplayLog:
+    """Appends battle records to a log file; safe to share between threads"""
+
+    def __init__(self, path=LOCAL_LOG, max_bytes=REPLAY_LOG_MAX_BYTES):
+        self.path = path
+        self.max_bytes = max_bytes  # Rotate past this size; None to never rotate
+        self.file = None
+        self.lock = threading.Lock()
+        self.names = {}  # {battle id: (monster 1, monster 2)} for battles still running
+
+    def write(self, record):
+        with self.lock:
+            if self.file is None:
+                os.makedirs(os.path.dirname(self.path), exist_ok=True)
+                self.file = open(self.path, 'ab', buffering=0)
+                if self.file.tell() == 0:
+                    self.file.write(FILE_HEADER.pack(MAGIC, VERSION))
+            self.file.write(record)
+
+    def rotate_if_full(self):
+        """Move a log past max_bytes aside to <path>.1, replacing the last rotated log"""
+        with self.lock:
+            if self.max_bytes is None:
+                return
+            size = self.file.tell() if self.file is not None else (
+                os.path.getsize(self.path) if os.path.exists(self.path) else 0)
+            if size < self.max_bytes:
+                return
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+            os.replace(self.path, self.path + '.1')
+
+    def start_battle(self, seed, name1, name2, source=LOCAL):
+        """Log a new battle; returns its battle id"""
+        self.rotate_if_full()
+        battle_id = secrets.randbits(64)
+        self.names[battle_id] = (name1, name2)
+        self.write(START.pack(b'S', battle_id, seed, source, time.time(), name1.encode(), name2.encode()))
+        return battle_id
+
+    def log_turn(self, battle_id, turn, move1, move2, state_hash):
+        name1, name2 = self.names[battle_id]
+        self.write(TURN.pack(b'T', battle_id, turn, encode_move(name1, move1), encode_move(name2, move2), state_hash))
+
+    def end_battle(self, battle_id, winner, turns):
+        self.names.pop(battle_id, None)
+        self.write(END.pack(b'E', battle_id, winner, turns))
+
+    def abandon_battle(self, battle_id):
+        """Forget a battle that stops without a result; the log keeps it as unfinished"""
+        self.names.pop(battle_id, None)
+
+    def close(self):
+        with self.lock:
+            if self.file is not None:
+                self.file.close()
+                self.file = None
+
+
+class LoggedBattle:
+    """Everything logged about one battle"""
+
+    def __init__(self, battle_id, seed, source, started, name1, name2):
+        self.battle_id = battle_id
+        self.seed = seed
+        self.source = source
+        self.started = started
+        self.names = (name1, name2)
+        self.turns = []  # (turn, move slot 1, move slot 2, state hash)
+        self.winner = None  # None while the battle has no end record
+        self.turn_count = None
+
+
+def read_log(path, battles=None):
+    """{battle id: LoggedBattle} for every battle in a log, in the order they started.
+
+    Pass the battles read from the log before it (a rotated one) to continue them.
+    A record cut short at the end of the file (a crash mid-write) is ignored.
+    """
+    battles = {} if battles is None else battles
+    with open(path, 'rb') as f:
+        data = f.read()
+    if len(data) < FILE_HEADER.size:
+        return battles
+    magic, version = FILE_HEADER.unpack_from(data)
+    if magic != MAGIC or version != VERSION:
+        raise ValueError(f"{path} is not a version {VERSION} replay log")
+
+    offset = FILE_HEADER.size
+    while offset < len(data):
+        record = RECORDS.get(data[offset:offset + 1])
+        if record is None:
+            raise ValueError(f"{path}: unknown record at byte {offset}")
+        if offset + record.size > len(data):
+            break
+        fields = record.unpack_from(data, offset)
+        offset += record.size
+        if record is START:
+            _, battle_id, seed, source, started, name1, name2 = fields
+            battles[battle_id] = LoggedBattle(battle_id, seed, source, started,
+                                              name1.rstrip(b'\0').decode(), name2.rstrip(b'\0').decode())
+        elif fields[1] in battles:
+            battle = battles[fields[1]]
+            if record is TURN:
+                battle.turns.append(fields[2:])
+            else:
+                battle.winner, battle.turn_count = fields[2:]
+    return battles
+
+
+def replay(battle, show=False):
+    """Re-simulate a logged battle with battle_rules.
+
+    Returns a list of problems: turns whose state hash differs and a winner that doesn't match.
+    """
+    name1, name2 = battle.names
+    fighter1, fighter2 = battle_rules.Fighter(name1), battle_rules.Fighter(name2)
+    problems = []
+    winner = 0
+    for turn, slot1, slot2, logged_hash in battle.turns:
+        move1, move2 = decode_move(name1, slot1), decode_move(name2, slot2)
+        winner = battle_rules.run_turn(fighter1, fighter2, move1, move2, turn)
+        if show:
+            print(f"  turn {turn}: {move1} / {move2} -> {fighter1.health}/{fighter2.health} HP"
+                  + (f", player {winner} wins" if winner else ""))
+        if state_hash(fighter1, fighter2, turn + 1) != logged_hash:
+            problems.append(f"turn {turn}: state differs from the log")
+        if winner:
+            break
+    if battle.winner is not None and battle.winner != winner:
+        problems.append(f"logged winner {battle.winner}, replay gives {winner or 'no winner'}")
+    return problems
+
+
+def main():
+    args = sys.argv[1:]
+    show = None
+    if '--show' in args:
+        i = args.index('--show')
+        show = int(args[i + 1], 16)
+        del args[i:i + 2]
+    paths = args or [path for log in (LOCAL_LOG, SERVER_LOG) for path in (log + '.1', log) if os.path.exists(path)]
+
+    start = time.perf_counter()
+    logged = {}
+    for path in paths:
+        read_log(path, logged)
+    battles = turns = unfinished = failed = 0
+    for battle in logged.values():
+        if show is not None and battle.battle_id != show:
+            continue
+        if show is not None:
+            print(f"Battle {battle.battle_id:016x}: {battle.names[0]} vs {battle.names[1]}, seed {battle.seed}")
+        problems = replay(battle, show is not None)
+        battles += 1
+        turns += len(battle.turns)
+        unfinished += battle.winner is None
+        if problems:
+            failed += 1
+            print(f"Battle {battle.battle_id:016x} ({battle.names[0]} vs {battle.names[1]}): "
+                  + '; '.join(problems))
+    elapsed = time.perf_counter() - start
+    print(f"Replayed {battles} battles ({turns} turns, {unfinished} unfinished) in {elapsed:.2f}s: "
+          f"{failed} mismatched")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -3,20 +3,21 @@ import random
 import math
 import os
 from settings import *
+from support import load_image, scaled_image, render_text
 
 class MonsterCard:
     def __init__(self, name, position):
         self.name = name
         self.stats = MONSTER_DATA[name]
         # Load simple sprite
-        self.image = pygame.image.load(f'images/simple/{name.lower()}.png').convert_alpha()
+        self.image = load_image('images', 'simple', f'{name}.png')
         self.rect = self.image.get_rect(topleft=position)
         # Card dimensions
         self.card_width = 220
         self.card_height = 270
         self.card_rect = pygame.Rect(position[0], position[1], self.card_width, self.card_height)
         # Wood texture for box background
-        self.wood_texture = pygame.image.load('images/other/wood_sign.png').convert_alpha()
+        self.wood_texture = load_image('images/other/wood_sign.png')
         # Colors
         self.normal_color = (120, 100, 80)  # fallback for logic, not drawn
         self.hover_color = (160, 130, 110)
@@ -35,6 +36,24 @@ class MonsterCard:
         self.anim_pulse = 0.0
         self.selected = False
 
+    def scaled_rect(self, scale):
+        """Card rect grown by scale around its center"""
+        card_rect = self.card_rect.copy()
+        if scale != 1.0:
+            card_rect = card_rect.inflate(int(card_rect.width * (scale - 1)), int(card_rect.height * (scale - 1)))
+            card_rect.center = self.card_rect.center
+        return card_rect
+
+    def prescale_textures(self):
+        """Scale the wood texture for every size the hover pulse reaches, and the sprite for both sizes"""
+        samples = 200
+        for step in range(samples + 1):
+            scale = 1.08 + 0.04 * (2 * step / samples - 1)
+            scaled_image(self.wood_texture, self.scaled_rect(scale).size)
+        scaled_image(self.wood_texture, self.card_rect.size)
+        for sprite_size in (80, 100):
+            scaled_image(self.image, (sprite_size, sprite_size))
+
     def draw(self, surface, animate=False):
         # Animate scale if hovered/selected
         scale = 1.0
@@ -44,25 +63,22 @@ class MonsterCard:
         else:
             self.anim_pulse = 0.0
         # Card background with wood texture
-        card_rect = self.card_rect.copy()
-        if scale != 1.0:
-            card_rect = card_rect.inflate(int(card_rect.width * (scale - 1)), int(card_rect.height * (scale - 1)))
-            card_rect.center = self.card_rect.center
-        wood_bg = pygame.transform.smoothscale(self.wood_texture, (card_rect.width, card_rect.height))
+        card_rect = self.scaled_rect(scale)
+        wood_bg = scaled_image(self.wood_texture, card_rect.size)
         surface.blit(wood_bg, card_rect)
         # Glowing border
         border_color = self.selected_glow_color if self.selected else self.glow_color if animate else (80, 0, 80)
         pygame.draw.rect(surface, border_color, card_rect, 6, border_radius=18)
         # Monster sprite (larger, with shadow)
         sprite_size = 100 if animate or self.selected else 80
-        sprite = pygame.transform.smoothscale(self.image, (sprite_size, sprite_size))
+        sprite = scaled_image(self.image, (sprite_size, sprite_size))
         sprite_rect = sprite.get_rect(center=(card_rect.centerx, card_rect.top + 75))
         shadow = pygame.Surface((sprite_size, sprite_size), pygame.SRCALPHA)
         pygame.draw.ellipse(shadow, (0,0,0,80), shadow.get_rect())
         surface.blit(shadow, (sprite_rect.x+4, sprite_rect.y+8))
         surface.blit(sprite, sprite_rect)
         # Monster name
-        name_text = self.font.render(self.name, True, COLORS['white'])
+        name_text = render_text(self.font, self.name, COLORS['white'])
         name_rect = name_text.get_rect(center=(card_rect.centerx, card_rect.top + 145))
         surface.blit(name_text, name_rect)
         # Stats (left-aligned, larger font, padding)
@@ -70,7 +86,7 @@ class MonsterCard:
         x_offset = card_rect.left + 24
         stats_to_show = ['element', 'health', 'attack', 'defense']
         for stat in stats_to_show:
-            stat_text = self.stats_font.render(f"{stat}: {self.stats[stat]}", True, COLORS['white'])
+            stat_text = render_text(self.stats_font, f"{stat}: {self.stats[stat]}", COLORS['white'])
             stat_rect = stat_text.get_rect(topleft=(x_offset, y_offset))
             surface.blit(stat_text, stat_rect)
             y_offset += 28
@@ -114,7 +130,9 @@ class SelectionScreen:
             row = i // cards_per_row
             col = i % cards_per_row
             pos = (x_spacing * (col + 1) - 100, 150 + row * y_spacing)
-            self.cards.append(MonsterCard(name, pos))
+            card = MonsterCard(name, pos)
+            card.prescale_textures()
+            self.cards.append(card)
 
     def run(self):
         while self.running:
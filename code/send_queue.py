@@ -0,0 +1,101 @@
+"""
+Per-connection outbound queues for the game server.
+
+Turn resolution only appends encoded frames to the queue of each player; a
+writer drains the queue with sendall, joining everything queued since its last
+write into a single syscall. A client that stops reading can hold back only its
+own queue, and once its unsent bytes (queued plus the batch the writer is
+still sending) exceed MAX_PENDING_BYTES the connection is dropped instead of
+growing memory or stalling the room.
+"""
+
+import socket
+import threading
+from collections import deque
+
+MAX_PENDING_BYTES = 256 * 1024  # Unsent bytes tolerated before a client is considered stuck
+
+
+class SendQueueFull(ConnectionAbortedError):
+    """A client fell too far behind reading its messages and was disconnected"""
+
+
+class QueuedSocket:
+    """Socket-like wrapper whose send() queues data for a background writer thread"""
+
+    def __init__(self, sock, max_pending=MAX_PENDING_BYTES):
+        self.sock = sock
+        self.max_pending = max_pending
+        self.pending = deque()
+        self.pending_bytes = 0
+        self.in_flight = 0  # Bytes of the batch the writer is sending; they count until sendall returns
+        self.closed = False
+        self.condition = threading.Condition()
+
+        self.thread = threading.Thread(target=self.write_loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def send(self, data):
+        """Queue data to be sent; never blocks on the network"""
+        with self.condition:
+            if self.closed:
+                raise BrokenPipeError("connection is closed")
+            if self.pending_bytes + self.in_flight + len(data) > self.max_pending:
+                pending_bytes = self.pending_bytes + self.in_flight
+                self.abort()
+                raise SendQueueFull(f"{pending_bytes} bytes already waiting to be sent")
+            self.pending.append(data)
+            self.pending_bytes += len(data)
+            self.condition.notify()
+        return len(data)
+
+    sendall = send
+
+    def write_loop(self):
+        """Send queued data until the queue is closed and drained"""
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if not self.pending:
+                    break
+                # Coalesce everything queued so far into one write
+                data = b''.join(self.pending)
+                self.pending.clear()
+                self.pending_bytes = 0
+                self.in_flight = len(data)
+            try:
+                self.sock.sendall(data)
+            except OSError:
+                self.abort()
+                return
+            with self.condition:
+                self.in_flight = 0
+        self.shutdown()
+
+    def close(self):
+        """Close once the data already queued has been sent"""
+        with self.condition:
+            self.closed = True
+            self.condition.notify()
+
+    def abort(self):
+        """Drop queued data and close immediately"""
+        with self.condition:
+            self.closed = True
+            self.pending.clear()
+            self.pending_bytes = 0
+            self.condition.notify()
+        self.shutdown()
+
+    def shutdown(self):
+        # shutdown also wakes the reader thread blocked in recv on this socket
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        try:
+            self.sock.close()
+        except OSError:
+            pass
@@ -4,6 +4,26 @@ from os import walk
 
 WINDOW_WIDTH, WINDOW_HEIGHT = 1280,720 
 
+# Battle screen redraws and updates only changed regions; False falls back to full-frame flips
+DIRTY_RECT_RENDERING = True
+
+# Single-player: the computer plays player 2, searching for up to AI_TIME_BUDGET seconds
+# per move (leaving room to draw the frame at 60 FPS) and at most AI_MAX_DEPTH turns ahead
+PLAYER2_AI = False
+AI_TIME_BUDGET = 0.008
+AI_MAX_DEPTH = 12
+# 'normal' uses the search above; 'hard' runs MCTS on every core, at most MCTS_ROLLOUTS
+# playouts or MCTS_TIME_BUDGET seconds per move, while the game keeps running
+AI_DIFFICULTY = 'normal'
+MCTS_ROLLOUTS = 200000
+MCTS_TIME_BUDGET = 1.0
+# Append every battle (seed, moves per turn, state hashes) to replays/; check them with python code/replay_log.py.
+# Off for local games by default, on for the server. A log past REPLAY_LOG_MAX_BYTES is rotated to
+# <log>.1 (replacing the previous one) when the next battle starts, so each log stays under about twice that.
+REPLAY_LOGGING = False
+SERVER_REPLAY_LOGGING = True
+REPLAY_LOG_MAX_BYTES = 16 * 1024 * 1024
+
 COLORS = {
     'black': '#000000',
     'red': '#ee1a0f',
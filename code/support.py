@@ -1,16 +1,179 @@
-from settings import * 
+from settings import *
+import os
+import threading
+from os.path import normpath
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+# Process-wide asset cache: each image/sound file is decoded once and shared by
+# every object that asks for it. Cached surfaces are shared, so never draw on
+# them in place; copy first.
+ASSET_CACHE_LIMIT = None  # Max cached assets, least recently used dropped first; None = unlimited
+_asset_cache = OrderedDict()  # {(path, conversion mode): Surface or Sound}
+_asset_lock = threading.Lock()  # AssetLoader fills the cache from worker threads
+
+def set_asset_cache_limit(limit):
+    """Cap the asset cache at limit entries (None for no cap)"""
+    global ASSET_CACHE_LIMIT
+    with _asset_lock:
+        ASSET_CACHE_LIMIT = limit
+        _trim_asset_cache()
+
+def clear_asset_cache():
+    with _asset_lock:
+        _asset_cache.clear()
+    _scaled_cache.clear()
+    _text_cache.clear()
+
+def _trim_asset_cache():
+    if ASSET_CACHE_LIMIT is not None:
+        while len(_asset_cache) > ASSET_CACHE_LIMIT:
+            _asset_cache.popitem(last=False)
+
+def _cached(key):
+    """Cached asset for key, or None"""
+    with _asset_lock:
+        asset = _asset_cache.get(key)
+        if asset is not None:
+            _asset_cache.move_to_end(key)
+        return asset
+
+def _store(key, asset):
+    with _asset_lock:
+        _asset_cache[key] = asset
+        _trim_asset_cache()
+
+def _cached_asset(key, loader):
+    asset = _cached(key)
+    if asset is None:
+        # Decode outside the lock so workers load in parallel
+        asset = loader()
+        _store(key, asset)
+    return asset
+
+def _convert(surf, mode):
+    """Convert a decoded surface to the display format; main thread only, SDL conversion isn't thread-safe"""
+    return surf.convert_alpha() if mode == 'alpha' else surf.convert()
+
+def load_image(*path, mode='alpha'):
+    """Load an image through the asset cache.
+
+    mode picks the conversion: 'alpha' (convert_alpha) or 'opaque' (convert).
+    """
+    full_path = normpath(join(*path))  # One key per file, however the caller spelled the path
+    return _cached_asset((full_path, mode), lambda: _convert(pygame.image.load(full_path), mode))
+
+def sound_file(*path):
+    """Path of a sound given without extension: the .wav if there is one, otherwise the .mp3"""
+    stem = join(*path)
+    return stem + '.wav' if os.path.exists(stem + '.wav') else stem + '.mp3'
+
+def load_sound(*path):
+    """Load a sound through the asset cache"""
+    full_path = normpath(join(*path))
+    return _cached_asset((full_path, 'sound'), lambda: pygame.mixer.Sound(full_path))
+
+# Scaled copies of textures, keyed by (texture, size); Surfaces hash by identity
+SCALED_CACHE_LIMIT = 512
+_scaled_cache = OrderedDict()
+
+def scaled_image(surf, size):
+    """Return surf smoothscaled to size, scaling each (texture, size) pair only once"""
+    key = (surf, tuple(size))
+    scaled = _scaled_cache.get(key)
+    if scaled is None:
+        scaled = pygame.transform.smoothscale(surf, key[1])
+        _scaled_cache[key] = scaled
+        while len(_scaled_cache) > SCALED_CACHE_LIMIT:
+            _scaled_cache.popitem(last=False)
+    else:
+        _scaled_cache.move_to_end(key)
+    return scaled
+
+# Rendered text, keyed by (font, string, color, antialias), so static labels are rasterized once
+TEXT_CACHE_LIMIT = 1024
+_text_cache = OrderedDict()
+
+def render_text(font, text, color, antialias=True):
+    """font.render through an LRU cache; only strings not seen recently are rendered"""
+    if isinstance(color, pygame.Color):
+        color = tuple(color)  # pygame.Color isn't hashable
+    key = (font, text, color, antialias)
+    surf = _text_cache.get(key)
+    if surf is None:
+        surf = font.render(text, antialias, color)
+        _text_cache[key] = surf
+        while len(_text_cache) > TEXT_CACHE_LIMIT:
+            _text_cache.popitem(last=False)
+    else:
+        _text_cache.move_to_end(key)
+    return surf
+
+class AssetLoader:
+    """Loads images and sounds into the asset cache on worker threads, tracking progress.
+
+    requests are ('image', path, mode) or ('sound', path) tuples; once done, the
+    load_image/load_sound calls for the same paths are served from the cache.
+    Workers only decode images; the owner calls poll() on the main thread to
+    convert them to the display format and cache them.
+    """
+    def __init__(self, requests, workers=4):
+        self.total = len(requests)
+        self.completed = 0
+        self.errors = []  # (path, exception); the synchronous loaders report them again on use
+        self.decoded = []  # (cache key, decoded surface) waiting for poll() to convert them
+        self.lock = threading.Lock()
+        executor = ThreadPoolExecutor(max_workers=workers)
+        for request in requests:
+            executor.submit(self.load, request)
+        executor.shutdown(wait=False)
+
+    def load(self, request):
+        try:
+            if request[0] == 'image':
+                key = (normpath(request[1]), request[2])
+                if _cached(key) is None:
+                    surf = pygame.image.load(key[0])
+                    with self.lock:
+                        self.decoded.append((key, surf))
+                    return  # Completed once poll() has converted it
+            else:
+                load_sound(request[1])
+        except Exception as e:
+            with self.lock:
+                self.errors.append((request[1], e))
+        with self.lock:
+            self.completed += 1
+
+    def poll(self):
+        """Convert and cache the images decoded so far; call from the main thread"""
+        with self.lock:
+            decoded, self.decoded = self.decoded, []
+        for key, surf in decoded:
+            _store(key, _convert(surf, key[1]))
+        with self.lock:
+            self.completed += len(decoded)
+
+    @property
+    def progress(self):
+        """Fraction of the requests finished, 0.0 to 1.0"""
+        return self.completed / self.total if self.total else 1.0
+
+    @property
+    def done(self):
+        return self.completed >= self.total
 
 def folder_importer(*path):
     surfs = {}
     for folder_path, _, file_names in walk(join(*path)):
         for file_name in file_names:
             full_path = join(folder_path, file_name)
-            surfs[file_name.split('.')[0]] = pygame.image.load(full_path).convert_alpha()
+            surfs[file_name.split('.')[0]] = load_image(full_path)
     return surfs
 
 def audio_importer(*path):
     audio_dict = {}
     for folder_path, _, file_names in walk(join(*path)):
         for file_name in file_names:
-            audio_dict[file_name.split('.')[0]] = pygame.mixer.Sound(join(folder_path, file_name))
-    return audio_dict
\ No newline at end of file
+            audio_dict[file_name.split('.')[0]] = load_sound(folder_path, file_name)
+    return audio_dict
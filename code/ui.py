@@ -3,9 +3,97 @@ import os
 import math
 import random
 from settings import *
+from support import load_image, load_sound, sound_file, scaled_image, render_text
+from particles import ParticleSystem, circle_sprite
+
+EMBER_LIFE = 213  # Frames for an ember to fade out (alpha 255 -> 0 at 1.2 per frame)
+EMBER_RADII = range(2, 6)
+ATTACK_TYPES = ['fire', 'ice', 'scratch', 'explosion', 'green', 'splash']
+HEALTH_BAR_BUCKET = 2  # Fill width granularity (px) of the cached health bar layers
+
+def battle_asset_requests():
+    """Images and sounds the battle screen loads, as AssetLoader requests (only files that exist)"""
+    requests = [
+        ('image', os.path.normpath(os.path.join('background', 'Battle-Ground.jpg')), 'opaque'),
+        ('image', 'images/other/bg.png', 'opaque'),
+        ('image', 'images/other/floor.png', 'alpha'),
+        ('image', 'images/other/Wood_sign2.png', 'alpha'),
+        ('image', 'images/other/skull.png', 'alpha'),
+    ]
+    for attack in ATTACK_TYPES:
+        requests.append(('image', os.path.join('images', 'attacks', f'{attack}.png'), 'alpha'))
+        requests.append(('sound', sound_file('audio', attack)))  # The file load_attack_effects plays
+    return [request for request in requests if os.path.exists(request[1])]
+
+class HealthBar:
+    """Themed pumpkin/blood health bar with drips, skull icon and HP text.
+
+    The bar with its drips is pre-rendered once per fill width bucket and color
+    and only looked up again when the health changes; drawing is a few blits.
+    """
+    def __init__(self, x, y, font, icon=None, width=200, height=22, rng=random):
+        self.font = font
+        self.width = width
+        self.height = height
+        self.bar_rect = pygame.Rect(x, y, width, height)
+        self.icon = scaled_image(icon, (height + 6, height + 6)) if icon else None
+        # Whole widget: icon pokes 3px above the bar, HP text sits below it
+        self.rect = pygame.Rect(x, y - 3, width + 8 + height + 6, 3 + height + 6 + font.get_height())
+        self.health = None
+        self.max_health = None
+        self.layer = None
+        self.label = ''
+        self.bar_layers = {}  # {(fill width, color): bar surface}
+
+        # Drip sizes are picked once per bar, so the drips don't jitter
+        self.drips = [(i, rng.randint(6, 12), rng.randint(4, 10)) for i in range(0, width, 20)]
+
+    def set_health(self, health, max_health):
+        if (health, max_health) == (self.health, self.max_health):
+            return
+        self.health = health
+        self.max_health = max_health
+        fill_w = int(self.width * (health / max(1, max_health)))
+        fill_w -= fill_w % HEALTH_BAR_BUCKET
+        self.layer = self.bar_layer(fill_w, self.fill_color())
+        self.label = f"{int(health)}/{max_health}"
+
+    def fill_color(self):
+        # Pumpkin orange; blood red when low
+        if self.health / max(1, self.max_health) < 0.25:
+            return (180, 30, 30)
+        return (255, 140, 0)
+
+    def bar_layer(self, fill_w, color):
+        """Background, fill and drips for one fill width bucket"""
+        key = (fill_w, color)
+        layer = self.bar_layers.get(key)
+        if layer is None:
+            layer = pygame.Surface((self.width, self.height + 6), pygame.SRCALPHA)
+            pygame.draw.rect(layer, (40, 30, 30), (0, 0, self.width, self.height), border_radius=6)
+            if fill_w > 0:
+                pygame.draw.rect(layer, color, (0, 0, fill_w, self.height), border_radius=6)
+                # Dripping effect along the filled part
+                drip_surf = pygame.Surface((fill_w, 12), pygame.SRCALPHA)
+                for i, w, h in self.drips:
+                    if i < fill_w:
+                        pygame.draw.ellipse(drip_surf, (255,120,20,180), (i, 6, w, h))
+                layer.blit(drip_surf, (0, self.height - 6))
+            self.bar_layers[key] = layer
+        return layer
+
+    def draw(self, surface):
+        surface.blit(self.layer, self.bar_rect)
+        if self.icon:
+            surface.blit(self.icon, (self.bar_rect.right + 8, self.bar_rect.top - 3))
+
+        # HP text with outline for readability
+        surface.blit(render_text(self.font, self.label, (0,0,0)), (self.bar_rect.x + 2, self.bar_rect.bottom + 6))
+        surface.blit(render_text(self.font, self.label, (255,255,255)), (self.bar_rect.x, self.bar_rect.bottom + 4))
 
 class BattleUI:
-    def __init__(self, player1_monster, player2_monster):
+    def __init__(self, player1_monster, player2_monster, seed=None):
+        self.rng = random.Random(seed)  # The battle's seed, so effects play out the same in a replay
         # Theme colors map
         self.colors = {
             'white': COLORS['white'],
@@ -25,7 +113,7 @@ class BattleUI:
         for p in bg_candidates:
             try:
                 if os.path.exists(p):
-                    self.background = pygame.image.load(p).convert()
+                    self.background = load_image(p, mode='opaque')
                     self.background = pygame.transform.scale(self.background, (WINDOW_WIDTH, WINDOW_HEIGHT))
                     break
             except Exception:
@@ -33,7 +121,7 @@ class BattleUI:
 
         # Load floor image (optional)
         try:
-            self.floor = pygame.image.load('images/other/floor.png').convert_alpha()
+            self.floor = load_image('images/other/floor.png')
             self.player1_floor_rect = self.floor.get_rect(midtop=(200, 480))
             self.player2_floor_rect = self.floor.get_rect(midtop=(1000, 210))
         except Exception:
@@ -114,21 +202,25 @@ class BattleUI:
 
         # Load wood texture for UI panels/buttons if present
         try:
-            self.wood_texture = pygame.image.load('images/other/Wood_sign2.png').convert_alpha()
+            self.wood_texture = load_image('images/other/Wood_sign2.png')
         except Exception:
             self.wood_texture = None
+        self.prescale_textures()
 
         # Optional skull/pumpkin icon for HP bar ends
         if os.path.exists('images/other/skull.png'):
             try:
-                self.skull_icon = pygame.image.load('images/other/skull.png').convert_alpha()
+                self.skull_icon = load_image('images/other/skull.png')
             except Exception:
                 self.skull_icon = None
         else:
             self.skull_icon = None
+        self.player1_health_bar = HealthBar(50, 50, self.hp_font, self.skull_icon, rng=self.rng)
+        self.player2_health_bar = HealthBar(WINDOW_WIDTH - 250, 50, self.hp_font, self.skull_icon, rng=self.rng)
 
-        # Particles (embers / mist)
-        self.particles = []
+        # Particles (embers / mist); one ember sprite variant per radius
+        self.particles = ParticleSystem([circle_sprite(r, (255, 140, 20)) for r in EMBER_RADII], capacity=1024,
+                                        centered=True, bounds=pygame.Rect(-8, -8, WINDOW_WIDTH + 16, WINDOW_HEIGHT + 16))
         self.mist = []
         
         # Setup the ability buttons last (after loading fonts and textures)
@@ -165,7 +257,7 @@ class BattleUI:
         for p in bg_candidates:
             try:
                 if os.path.exists(p):
-                    self.background = pygame.image.load(p).convert()
+                    self.background = load_image(p, mode='opaque')
                     self.background = pygame.transform.scale(self.background, (WINDOW_WIDTH, WINDOW_HEIGHT))
                     break
             except Exception:
@@ -173,7 +265,7 @@ class BattleUI:
 
         # Load floor image (optional)
         try:
-            self.floor = pygame.image.load('images/other/floor.png').convert_alpha()
+            self.floor = load_image('images/other/floor.png')
             self.player1_floor_rect = self.floor.get_rect(midtop=(200, 480))
             self.player2_floor_rect = self.floor.get_rect(midtop=(1000, 210))
         except Exception:
@@ -216,21 +308,16 @@ class BattleUI:
     def load_attack_effects(self):
         """Load all attack images and sounds"""
         # Load attack sprites
-        attack_types = ['fire', 'ice', 'scratch', 'explosion', 'green', 'splash']
-        for attack in attack_types:
+        for attack in ATTACK_TYPES:
             try:
-                img_path = os.path.join('images', 'attacks', f'{attack}.png')
-                self.attack_sprites[attack] = pygame.image.load(img_path).convert_alpha()
+                self.attack_sprites[attack] = load_image('images', 'attacks', f'{attack}.png')
             except Exception as e:
                 print(f"Failed to load attack sprite {attack}: {e}")
         
         # Load attack sounds
-        for attack in attack_types:
+        for attack in ATTACK_TYPES:
             try:
-                sound_path = os.path.join('audio', f'{attack}.wav')
-                if not os.path.exists(sound_path):
-                    sound_path = os.path.join('audio', f'{attack}.mp3')
-                self.attack_sounds[attack] = pygame.mixer.Sound(sound_path)
+                self.attack_sounds[attack] = load_sound(sound_file('audio', attack))
             except Exception as e:
                 print(f"Failed to load attack sound {attack}: {e}")
                 
@@ -254,6 +341,17 @@ class BattleUI:
                 self.is_animating = False
                 self.show_move_bar = True
                 self.animation_timer = 0
+
+        self.update_particles()
+
+    def update_particles(self):
+        """Spawn and move embers (kept out of draw so a frame can be drawn in several clipped passes)"""
+        # Spawn ember occasionally
+        rng = self.rng
+        if rng.random() < 0.02:
+            self.particles.emit(rng.randint(0, WINDOW_WIDTH), rng.randint(0, WINDOW_HEIGHT//2),
+                                0, rng.uniform(0.1, 0.6), EMBER_LIFE, variant=rng.randrange(len(EMBER_RADII)))
+        self.particles.update()
                 
     def play_attack_animation(self, attacker_is_player1, move_name):
         """Start an attack animation sequence"""
@@ -306,6 +404,19 @@ class BattleUI:
             self.player2_monster_ref.get_available_abilities()
         )
 
+    def scaled_wood(self, size):
+        """Wood texture scaled to size (None without a texture)"""
+        if self.wood_texture is None:
+            return None
+        return scaled_image(self.wood_texture, size)
+
+    def prescale_textures(self):
+        """Scale the wood texture for the panels and end game buttons once, not every frame"""
+        self.left_panel_bg = self.scaled_wood(self.left_rect.size)
+        self.right_panel_bg = self.scaled_wood(self.right_rect.size)
+        for button in (self.play_again_button, self.exit_button):
+            button['background'] = self.scaled_wood(button['rect'].size)
+
     def setup_ability_buttons(self, player1_abilities, player2_abilities):
         # Calculate button dimensions for 2x2 grid with more space
         padding = 30  # Increased padding
@@ -324,6 +435,7 @@ class BattleUI:
             
             self.player1_buttons.append({
                 'rect': pygame.Rect(x, y, grid_width, grid_height),
+                'background': self.scaled_wood((grid_width, grid_height)),
                 'ability': ability,
                 'color': self.colors['white'],
                 'hover': False,
@@ -343,6 +455,7 @@ class BattleUI:
             
             self.player2_buttons.append({
                 'rect': pygame.Rect(x, y, grid_width, grid_height),
+                'background': self.scaled_wood((grid_width, grid_height)),
                 'ability': ability,
                 'color': self.colors['white'],
                 'hover': False,
@@ -438,18 +551,9 @@ class BattleUI:
             surface.blit(self.floor, self.player1_floor_rect)
             surface.blit(self.floor, self.player2_floor_rect)
 
-        # Apply animation offsets to monster positions
-        monster1_rect = player1_monster.rect.copy()
-        monster2_rect = player2_monster.rect.copy()
-        
-        # Apply bobbing animation
-        monster1_rect.y += self.monster1_offset_y
-        monster2_rect.y += self.monster2_offset_y
-        
-        # Apply hit reactions
-        monster1_rect.x -= self.monster1_hit_offset
-        monster2_rect.x += self.monster2_hit_offset
-        
+        # Apply animation offsets (bobbing, hit reactions) to monster positions
+        monster1_rect, monster2_rect = self.animated_monster_rects(player1_monster, player2_monster)
+
         # Draw monsters with current positions
         surface.blit(player1_monster.image, monster1_rect)
         surface.blit(player2_monster.image, monster2_rect)
@@ -461,36 +565,50 @@ class BattleUI:
         if self.show_move_bar:
             self.draw_overlay(surface)
 
+    def animated_monster_rects(self, player1_monster, player2_monster):
+        """Monster rects with the bobbing and hit reaction offsets applied"""
+        monster1_rect = player1_monster.rect.copy()
+        monster2_rect = player2_monster.rect.copy()
+        monster1_rect.y += self.monster1_offset_y
+        monster2_rect.y += self.monster2_offset_y
+        monster1_rect.x -= self.monster1_hit_offset
+        monster2_rect.x += self.monster2_hit_offset
+        return monster1_rect, monster2_rect
+
+    def track_dirty_regions(self, renderer):
+        """Report the changing parts of the battle UI to a DirtyRectRenderer"""
+        for i, (rect, level) in enumerate(self.particles.rects()):
+            renderer.track(('ember', i), rect, level)
+
+        if not self.show_move_bar:
+            return  # Overlay hidden: its regions drop out and get repainted once
+
+        renderer.track('label1', (self.left_rect.left, self.left_rect.bottom - 40, self.left_rect.width, 40),
+                       self.player1_selection)
+        renderer.track('label2', (self.right_rect.left, self.right_rect.bottom - 40, self.right_rect.width, 40),
+                       self.player2_selection)
+        for side, buttons in (('p1', self.player1_buttons), ('p2', self.player2_buttons)):
+            for i, button in enumerate(buttons):
+                renderer.track((side, 'button', i), button['rect'],
+                               (button['ability'], button['locked'], button['hover']))
+
+        # Health bar with drips, skull icon and HP text; status effects below it
+        for key, bar, x, health, max_health, monster in (
+                ('p1', self.player1_health_bar, 50, self.player1_health, self.player1_max_health, self.player1_monster_ref),
+                ('p2', self.player2_health_bar, WINDOW_WIDTH - 250, self.player2_health, self.player2_max_health, self.player2_monster_ref)):
+            renderer.track((key, 'health'), bar.rect, (health, max_health))
+            renderer.track((key, 'status'), (x, 100, 250, 50),
+                           (getattr(monster, 'shield_active', False), getattr(monster, 'burn_turns', 0)))
+
     def draw_panels(self, surface):
         """Draw background UI panels behind monsters (wood panels, particles)."""
-        # Draw subtle particles (embers/mist)
-        # Spawn ember occasionally
-        if random.random() < 0.02:
-            self.particles.append({
-                'x': random.randint(0, WINDOW_WIDTH),
-                'y': random.randint(0, WINDOW_HEIGHT//2),
-                'r': random.randint(2, 5),
-                'vy': random.uniform(0.1, 0.6),
-                'alpha': 255
-            })
-        # Update and draw embers
-        for p in list(self.particles):
-            p['y'] += p['vy']
-            p['alpha'] -= 1.2
-            if p['alpha'] <= 0 or p['y'] > WINDOW_HEIGHT:
-                self.particles.remove(p)
-                continue
-            s = pygame.Surface((p['r']*2, p['r']*2), pygame.SRCALPHA)
-            s.fill((0,0,0,0))
-            pygame.draw.circle(s, (255, 140, 20, int(p['alpha'])), (p['r'], p['r']), p['r'])
-            surface.blit(s, (p['x']-p['r'], p['y']-p['r']))
+        # Draw subtle particles (embers/mist), moved by update_particles
+        self.particles.draw(surface)
 
         # Draw bottom rectangles (UI panels) - use wood texture if available
         if self.wood_texture:
-            left_bg = pygame.transform.smoothscale(self.wood_texture, (self.left_rect.width, self.left_rect.height))
-            right_bg = pygame.transform.smoothscale(self.wood_texture, (self.right_rect.width, self.right_rect.height))
-            surface.blit(left_bg, self.left_rect.topleft)
-            surface.blit(right_bg, self.right_rect.topleft)
+            surface.blit(self.left_panel_bg, self.left_rect.topleft)
+            surface.blit(self.right_panel_bg, self.right_rect.topleft)
             # subtle frame
             pygame.draw.rect(surface, (30,20,10), self.left_rect, 6, border_radius=8)
             pygame.draw.rect(surface, (30,20,10), self.right_rect, 6, border_radius=8)
@@ -510,21 +628,20 @@ class BattleUI:
         p1_label = "Player 1" + (" (Locked)" if self.player1_selection else "")
         p2_label = "Player 2" + (" (Locked)" if self.player2_selection else "")
         # outline / shadow
-        p1_shadow = self.name_font.render(p1_label, True, (0,0,0))
-        p2_shadow = self.name_font.render(p2_label, True, (0,0,0))
+        p1_shadow = render_text(self.name_font, p1_label, (0,0,0))
+        p2_shadow = render_text(self.name_font, p2_label, (0,0,0))
         surface.blit(p1_shadow, (self.left_rect.centerx - p1_shadow.get_width()//2 + 2, self.left_rect.bottom - 38))
         surface.blit(p2_shadow, (self.right_rect.centerx - p2_shadow.get_width()//2 + 2, self.right_rect.bottom - 38))
-        p1_text = self.name_font.render(p1_label, True, (255,180,80))
-        p2_text = self.name_font.render(p2_label, True, (255,180,80))
+        p1_text = render_text(self.name_font, p1_label, (255,180,80))
+        p2_text = render_text(self.name_font, p2_label, (255,180,80))
         surface.blit(p1_text, (self.left_rect.centerx - p1_text.get_width()//2, self.left_rect.bottom - 40))
         surface.blit(p2_text, (self.right_rect.centerx - p2_text.get_width()//2, self.right_rect.bottom - 40))
 
         # Draw player 1 buttons
         for button in self.player1_buttons:
             rect = button['rect']
-            if self.wood_texture:
-                btn_bg = pygame.transform.smoothscale(self.wood_texture, (rect.width, rect.height))
-                surface.blit(btn_bg, rect.topleft)
+            if button['background']:
+                surface.blit(button['background'], rect.topleft)
             else:
                 pygame.draw.rect(surface, self.colors['white'], rect, border_radius=10)
             # glow if hover/locked, special color for special moves
@@ -536,17 +653,16 @@ class BattleUI:
                 pygame.draw.rect(surface, (255,215,0), rect, 3, border_radius=10)  # Gold border for special moves
             # ability text
             text_color = (255,255,100) if button.get('is_special', False) else (250,240,200)  # Golden text for special moves
-            text_shadow = self.ability_font.render(button['ability'], True, (0,0,0))
+            text_shadow = render_text(self.ability_font, button['ability'], (0,0,0))
             surface.blit(text_shadow, (rect.centerx - text_shadow.get_width()//2 + 1, rect.centery - text_shadow.get_height()//2 + 1))
-            text = self.ability_font.render(button['ability'], True, text_color)
+            text = render_text(self.ability_font, button['ability'], text_color)
             surface.blit(text, (rect.centerx - text.get_width()//2, rect.centery - text.get_height()//2))
 
         # Draw player 2 buttons
         for button in self.player2_buttons:
             rect = button['rect']
-            if self.wood_texture:
-                btn_bg = pygame.transform.smoothscale(self.wood_texture, (rect.width, rect.height))
-                surface.blit(btn_bg, rect.topleft)
+            if button['background']:
+                surface.blit(button['background'], rect.topleft)
             else:
                 pygame.draw.rect(surface, self.colors['white'], rect, border_radius=10)
             if button['locked']:
@@ -556,74 +672,17 @@ class BattleUI:
             elif button.get('is_special', False):
                 pygame.draw.rect(surface, (255,215,0), rect, 3, border_radius=10)  # Gold border for special moves
             text_color = (255,255,100) if button.get('is_special', False) else (250,240,200)  # Golden text for special moves
-            text_shadow = self.ability_font.render(button['ability'], True, (0,0,0))
+            text_shadow = render_text(self.ability_font, button['ability'], (0,0,0))
             surface.blit(text_shadow, (rect.centerx - text_shadow.get_width()//2 + 1, rect.centery - text_shadow.get_height()//2 + 1))
-            text = self.ability_font.render(button['ability'], True, text_color)
+            text = render_text(self.ability_font, button['ability'], text_color)
             surface.blit(text, (rect.centerx - text.get_width()//2, rect.centery - text.get_height()//2))
 
         # Draw health bars (themed pumpkin/blood style)
-        health_width = 200
-        health_height = 22
-        # Player 1
-        p1_x = 50
-        p1_y = 50
-        p1_bg = pygame.Rect(p1_x, p1_y, health_width, health_height)
-        p1_fill_w = int(health_width * (self.player1_health / max(1, self.player1_max_health)))
-        p1_fill = pygame.Rect(p1_x, p1_y, p1_fill_w, health_height)
-        # Player 2
-        p2_x = WINDOW_WIDTH - 250
-        p2_y = 50
-        p2_bg = pygame.Rect(p2_x, p2_y, health_width, health_height)
-        p2_fill_w = int(health_width * (self.player2_health / max(1, self.player2_max_health)))
-        p2_fill = pygame.Rect(p2_x, p2_y, p2_fill_w, health_height)
-
-        # Backgrounds
-        pygame.draw.rect(surface, (40, 30, 30), p1_bg, border_radius=6)
-        pygame.draw.rect(surface, (40, 30, 30), p2_bg, border_radius=6)
-
-        # Fill colors (pumpkin orange); if low HP use blood red
-        def fill_color(health, max_h):
-            ratio = health / max(1, max_h)
-            if ratio < 0.25:
-                return (180, 30, 30)
-            return (255, 140, 0)
-
-        pygame.draw.rect(surface, fill_color(self.player1_health, self.player1_max_health), p1_fill, border_radius=6)
-        pygame.draw.rect(surface, fill_color(self.player2_health, self.player2_max_health), p2_fill, border_radius=6)
-
-        # Simple dripping effect along the filled part
-        def draw_drips(fill_rect):
-            if fill_rect.width <= 0:
-                return
-            drip_surf = pygame.Surface((fill_rect.width, 12), pygame.SRCALPHA)
-            for i in range(0, fill_rect.width, 20):
-                w = random.randint(6, 12)
-                h = random.randint(4, 10)
-                pygame.draw.ellipse(drip_surf, (255,120,20,180), (i, 6, w, h))
-            surface.blit(drip_surf, (fill_rect.x, fill_rect.bottom - 6))
-
-        draw_drips(p1_fill)
-        draw_drips(p2_fill)
-
-        # Draw skull/pumpkin icon at the end of the bar if available
-        if self.skull_icon:
-            icon_h = health_height + 6
-            icon = pygame.transform.smoothscale(self.skull_icon, (icon_h, icon_h))
-            surface.blit(icon, (p1_bg.right + 8, p1_bg.top - 3))
-            surface.blit(icon, (p2_bg.right + 8, p2_bg.top - 3))
-
-        # Draw HP text with outline for readability
-        hp1_label = f"{int(self.player1_health)}/{self.player1_max_health}"
-        hp2_label = f"{int(self.player2_health)}/{self.player2_max_health}"
-        shadow1 = self.hp_font.render(hp1_label, True, (0,0,0))
-        shadow2 = self.hp_font.render(hp2_label, True, (0,0,0))
-        surface.blit(shadow1, (p1_x + 2, p1_y + health_height + 6))
-        surface.blit(shadow2, (p2_x + 2, p2_y + health_height + 6))
-        hp1_text = self.hp_font.render(hp1_label, True, (255,255,255))
-        hp2_text = self.hp_font.render(hp2_label, True, (255,255,255))
-        surface.blit(hp1_text, (p1_x, p1_y + health_height + 4))
-        surface.blit(hp2_text, (p2_x, p2_y + health_height + 4))
-        
+        self.player1_health_bar.set_health(self.player1_health, self.player1_max_health)
+        self.player2_health_bar.set_health(self.player2_health, self.player2_max_health)
+        self.player1_health_bar.draw(surface)
+        self.player2_health_bar.draw(surface)
+
         # Draw status effect indicators
         self.draw_status_effects(surface)
 
@@ -638,23 +697,23 @@ class BattleUI:
         # Player 1 status effects
         status_offset = 0
         if hasattr(self.player1_monster_ref, 'shield_active') and self.player1_monster_ref.shield_active:
-            shield_text = self.hp_font.render("🛡️ SHIELD", True, (0, 255, 255))
+            shield_text = render_text(self.hp_font, "🛡️ SHIELD", (0, 255, 255))
             surface.blit(shield_text, (p1_status_x, p1_status_y + status_offset))
             status_offset += 25
             
         if hasattr(self.player1_monster_ref, 'burn_turns') and self.player1_monster_ref.burn_turns > 0:
-            burn_text = self.hp_font.render(f"🔥 BURN ({self.player1_monster_ref.burn_turns})", True, (255, 100, 0))
+            burn_text = render_text(self.hp_font, f"🔥 BURN ({self.player1_monster_ref.burn_turns})", (255, 100, 0))
             surface.blit(burn_text, (p1_status_x, p1_status_y + status_offset))
             
         # Player 2 status effects
         status_offset = 0
         if hasattr(self.player2_monster_ref, 'shield_active') and self.player2_monster_ref.shield_active:
-            shield_text = self.hp_font.render("🛡️ SHIELD", True, (0, 255, 255))
+            shield_text = render_text(self.hp_font, "🛡️ SHIELD", (0, 255, 255))
             surface.blit(shield_text, (p2_status_x, p2_status_y + status_offset))
             status_offset += 25
             
         if hasattr(self.player2_monster_ref, 'burn_turns') and self.player2_monster_ref.burn_turns > 0:
-            burn_text = self.hp_font.render(f"🔥 BURN ({self.player2_monster_ref.burn_turns})", True, (255, 100, 0))
+            burn_text = render_text(self.hp_font, f"🔥 BURN ({self.player2_monster_ref.burn_turns})", (255, 100, 0))
             surface.blit(burn_text, (p2_status_x, p2_status_y + status_offset))
 
     def draw_end_game_buttons(self, surface):
@@ -663,9 +722,8 @@ class BattleUI:
             rect = button['rect']
             
             # Draw button background with wood texture if available
-            if self.wood_texture:
-                btn_bg = pygame.transform.smoothscale(self.wood_texture, (rect.width, rect.height))
-                surface.blit(btn_bg, rect.topleft)
+            if button['background']:
+                surface.blit(button['background'], rect.topleft)
             else:
                 pygame.draw.rect(surface, self.colors['white'], rect, border_radius=10)
             
@@ -674,9 +732,9 @@ class BattleUI:
             pygame.draw.rect(surface, border_color, rect, 4, border_radius=10)
             
             # Draw button text with shadow
-            text_shadow = self.ability_font.render(button['text'], True, (0, 0, 0))
+            text_shadow = render_text(self.ability_font, button['text'], (0, 0, 0))
             surface.blit(text_shadow, (rect.centerx - text_shadow.get_width()//2 + 2, rect.centery - text_shadow.get_height()//2 + 2))
             
             text_color = (255, 255, 255) if button['hover'] else (250, 240, 200)
-            text = self.ability_font.render(button['text'], True, text_color)
+            text = render_text(self.ability_font, button['text'], text_color)
             surface.blit(text, (rect.centerx - text.get_width()//2, rect.centery - text.get_height()//2))
\ No newline at end of file
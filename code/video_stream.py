@@ -0,0 +1,107 @@
+"""
+Background video decoding for the menu.
+
+VideoDecoder runs a clip's get_frame (moviepy/ffmpeg) on a worker thread and
+scales each frame into one of a few preallocated screen-sized Surfaces.
+Decoded frames wait in a bounded ring buffer, so the decoder stays at most
+buffer_size frames ahead and the main loop only ever blits a ready Surface;
+it never waits for the decoder.
+"""
+
+import threading
+from collections import deque
+import pygame
+
+BUFFER_SIZE = 6  # Decoded frames kept ready ahead of playback
+DEFAULT_FPS = 30
+
+
+def frame_to_surface(frame):
+    """Wrap an RGB frame array (H x W x 3) in a Surface without copying when possible"""
+    import numpy as np
+    if frame.dtype != np.uint8:
+        # moviepy can hand back float frames in 0..1 (or 0..255)
+        frame = frame * 255 if frame.max() <= 1.0 else frame
+        frame = frame.astype(np.uint8)
+    frame = np.ascontiguousarray(frame)
+    return pygame.image.frombuffer(frame, (frame.shape[1], frame.shape[0]), 'RGB')
+
+
+class VideoDecoder:
+    """Prefetches a looping clip into a ring buffer of pre-scaled Surfaces"""
+
+    def __init__(self, clip, size, buffer_size=BUFFER_SIZE):
+        self.clip = clip
+        self.size = size
+        self.fps = getattr(clip, 'fps', None) or DEFAULT_FPS
+        self.duration = max(0.001, clip.duration)
+        self.error = None  # Set if decoding failed; the caller should fall back
+
+        # Ring buffer: free slots wait for the decoder, ready ones for playback
+        slots = []
+        for _ in range(buffer_size):
+            surf = pygame.Surface(size)
+            slots.append(surf.convert() if pygame.display.get_surface() else surf)
+        self.free = deque(slots)
+        self.ready = deque()  # (timestamp, Surface), oldest first
+        self.current = None  # Surface on screen; returned to free once replaced
+        self.scaled = None  # Reused scale target in the decoded frames' pixel format
+        self.condition = threading.Condition()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.decode_loop)
+        self.thread.daemon = True
+        self.thread.start()
+
+    def stop(self):
+        with self.condition:
+            self.running = False
+            self.condition.notify_all()
+        if self.thread:
+            self.thread.join(timeout=1.0)
+
+    def decode_loop(self):
+        """Decode frames in order, looping the clip, until stopped"""
+        index = 0
+        try:
+            while True:
+                with self.condition:
+                    while self.running and not self.free:
+                        self.condition.wait()
+                    if not self.running:
+                        return
+                    slot = self.free.popleft()
+
+                timestamp = index / self.fps  # Playback time; keeps growing across loops
+                frame = frame_to_surface(self.clip.get_frame(timestamp % self.duration))
+                if self.scaled is None:
+                    self.scaled = pygame.Surface(self.size, 0, frame)
+                # Scale into the reused surface, then convert into the display-format slot
+                pygame.transform.scale(frame, self.size, self.scaled)
+                slot.blit(self.scaled, (0, 0))
+
+                with self.condition:
+                    self.ready.append((timestamp, slot))
+                index += 1
+        except Exception as e:
+            self.error = e
+
+    def get_frame(self, elapsed):
+        """Latest decoded frame due at elapsed seconds, or None until the first one is ready.
+
+        Never blocks: if the decoder is behind, the current frame is shown again.
+        """
+        with self.condition:
+            while self.ready and self.ready[0][0] <= elapsed:
+                _, surf = self.ready.popleft()
+                if self.current is not None:
+                    self.free.append(self.current)
+                self.current = surf
+                self.condition.notify()
+            if self.current is None and self.ready:
+                self.current = self.ready.popleft()[1]  # Show the first frame right away
+                self.condition.notify()
+            return self.current
@@ -112,6 +112,11 @@ def main():
             print("3. If that fails, try: python -m pip install --user pygame")
             return False
     
+    # numpy is only used by the simulation tools (batch_sim, balance_report)
+    if not check_module_installed('numpy'):
+        print("\nℹ️ numpy is not installed; it's only needed for the simulation tools")
+        print("   Install it with: python -m pip install -r requirements.txt")
+
     print("\n" + "=" * 50)
     print("🚀 How to play Monster Battle:")
     print("=" * 50)